@@ -55,7 +55,12 @@ a = Analysis(
         'utils',
         'config',
         'assets',
-        'core'
+        'core',
+        # Loaded through utils.lazy_import (DEFERRED_MODULES), so analysis cannot see them
+        'pandas',
+        'bs4',
+        'requests',
+        'urllib3'
     ],
     hookspath=[],
     hooksconfig={},
@@ -14,6 +14,9 @@ SLOTS = [
     "Primary", "Secondary", "Fingers", "Chest", "Legs", "Feet", "Waist"
 ]
 
+# Position of each slot when saved gear is listed
+SLOT_ORDER = {slot: i for i, slot in enumerate(SLOTS)}
+
 # Augmentation slots
 AUGMENTATION_SLOTS = ['SLOT 1', 'SLOT 2', 'SLOT 3', 'SLOT 4', 'SLOT 5']
 
@@ -9,10 +9,45 @@ LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 # Cache settings
 CACHE_DURATION = 24 * 60 * 60  # 24 hours in seconds
 SPELL_CACHE_FILE = 'spell_cache.json'
+CACHE_BACKEND = 'sqlite'       # 'sqlite', 'journal' (append-only log) or 'json' (full rewrite)
+CACHE_COMPACT_THRESHOLD = 500  # Journal records before the snapshot is rewritten
+CACHE_SWEEP_INTERVAL = 15 * 60 # Seconds between background purges of expired entries
+CACHE_STALE_DURATION = 7 * 24 * 60 * 60  # Expired item entries kept this long for revalidation
+VALIDATOR_CACHE_FILE = 'validator_cache.json'  # ETag/Last-Modified/content hash per item page
+PAGE_STORE_ENABLED = True     # Keep compressed copies of fetched pages for offline reparsing
+PAGE_STORE_DIR = 'page_store'
+PAGE_STORE_MAX_MB = 200       # Oldest pages are pruned when the store's objects pass this size
 
 # Web settings
 BASE_URL = "https://www.lazaruseq.com/Alla/"
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+MAX_CONNECTIONS_PER_HOST = 4  # Concurrent requests allowed to a single host
+HTTP_POOL_SIZE = 8            # Pooled connections kept per host by the shared session
+HTTP_KEEP_ALIVE = True        # Reuse connections between requests (False sends Connection: close)
+
+# Parser settings
+PARSER_ENGINE = 'soup'        # Item page engine: 'soup' (BeautifulSoup) or 'lxml' (single-pass)
+ITEM_BLOCK_CLASS = 'display_table'  # Class of the element holding an item's stats; stats are read only from it
+STAT_NAME_MEMO_SIZE = 512    # Stat/header names memoized beyond the precomputed vocabulary
+
+# Search pipeline settings
+SEARCH_WORKERS = 2           # Background threads for search/item/spell fetches
+SEARCH_POLL_INTERVAL_MS = 50 # How often the UI drains pipeline events
+BATCH_WORKERS = 4            # Items of a batch lookup resolved at once
+
+# Gear file settings
+GEAR_STORE_BACKEND = 'csv'    # 'csv' (a file per class) or 'sqlite' (every class in GEAR_DB_FILE)
+GEAR_DB_FILE = 'gear.db'
+GEAR_INDEX_SUFFIX = '.index.jsonl'  # Duplicate index log kept next to each class CSV
+SAVE_COALESCE_MS = 500       # Saves queued within this window are written together
+SAVE_RETRY_MAX_MS = 30000    # Longest wait between retries of a failed save
+SAVE_FAILURES_REPORTED = 3   # Failed writes in a row before the user is told
+SAVE_ERROR_POLL_MS = 1000    # How often the UI checks the save queue for failures
+SPELL_TABLE_FILE = 'gear_spells.jsonl'  # Effect spells of saved gear, next to the class CSVs
+
+# Startup settings
+STARTUP_BUDGET_MS = 1500     # Cold start to first paint allowed by main.py --profile-startup
+CLI_IMPORT_BUDGET_MS = 500   # Import time allowed for lazgearcompare.cli, checked by the tests
 
 # UI Base Colors
 DARK_MODE_COLORS = {
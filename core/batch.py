@@ -0,0 +1,225 @@
+# core/batch.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config.constraints import SLOTS
+from config.settings import BATCH_WORKERS
+from utils.decorators import debug_log
+
+# Lookup statuses that leave an item ready to save
+RESOLVED_STATUSES = ('cached', 'found', 'revalidated')
+
+
+class BatchEntry:
+    """One line of a gear list: an item name and the slot it is saved under"""
+
+    def __init__(self, item_name, slot=None, line_number=None):
+        self.item_name = item_name
+        self.slot = slot
+        self.line_number = line_number
+
+    def __repr__(self):
+        return f"BatchEntry({self.item_name!r}, slot={self.slot!r})"
+
+
+def parse_gear_list(text, default_slot=None):
+    """Parse a pasted gear list into batch entries
+
+    Each non-blank line is either ``<slot>: <item name>`` or just an item
+    name, which is saved under ``default_slot``. Lines starting with '#'
+    are skipped.
+
+    Returns:
+        tuple: (entries, errors) where errors are messages for lines
+            that could not be used
+    """
+    slots = {slot.lower(): slot for slot in SLOTS}
+    entries = []
+    errors = []
+    seen = set()
+
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        slot = default_slot
+        prefix, separator, rest = line.partition(':')
+        if separator and prefix.strip().lower() in slots:
+            slot = slots[prefix.strip().lower()]
+            line = rest.strip()
+
+        if not line:
+            errors.append(f"Line {line_number}: missing item name")
+            continue
+        if not slot:
+            errors.append(f"Line {line_number}: no slot given for {line}")
+            continue
+        if line.lower() in seen:
+            errors.append(f"Line {line_number}: {line} is listed more than once")
+            continue
+
+        seen.add(line.lower())
+        entries.append(BatchEntry(line, slot, line_number))
+
+    return entries, errors
+
+
+class BatchResult:
+    """Outcome of looking up one batch entry"""
+
+    def __init__(self, entry, status, stats=None, similar_items=None, error=None, seconds=0.0):
+        self.entry = entry
+        self.status = status
+        self.stats = stats
+        self.similar_items = similar_items or []
+        self.error = error
+        self.seconds = seconds
+
+    @property
+    def resolved(self):
+        return self.status in RESOLVED_STATUSES
+
+
+class BatchLookup:
+    """Resolves a whole gear list concurrently through the cache and web layers
+
+    Fresh cache entries are used as they are, expired ones are revalidated
+    and everything else goes through ``SearchPipeline.lookup``. Requests to
+    Alla are still limited per host by WebUtils, so ``max_workers`` only
+    bounds how many items are in flight.
+    """
+
+    def __init__(self, search_pipeline, item_cache, max_workers=BATCH_WORKERS):
+        logging.debug("Initializing BatchLookup")
+        self.search_pipeline = search_pipeline
+        self.item_cache = item_cache
+        self.max_workers = max_workers
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop starting new lookups; items already in flight finish
+
+        A cancel is never undone, even one made before run() starts, so
+        use a new BatchLookup for each batch.
+        """
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    # Lookup Methods
+    @debug_log
+    def run(self, entries, on_progress=None):
+        """Look up every entry, reporting each result as it completes
+
+        ``on_progress(result, done, total)`` is called from worker threads.
+
+        Returns:
+            dict: results in entry order, resolved, failed, seconds and
+                items_per_second
+        """
+        start = time.perf_counter()
+        results = {}
+        done = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='batch') as executor:
+            futures = {executor.submit(self._resolve, entry): entry for entry in entries}
+            for future in as_completed(futures):
+                result = future.result()
+                results[id(futures[future])] = result
+                done += 1
+                logging.debug("Batch %s/%s: %s -> %s", done, len(entries),
+                              result.entry.item_name, result.status)
+                if on_progress:
+                    try:
+                        on_progress(result, done, len(entries))
+                    except Exception as e:
+                        logging.error("Error reporting batch progress: %s", e, exc_info=True)
+
+        elapsed = time.perf_counter() - start
+        ordered = [results[id(entry)] for entry in entries]
+        resolved = sum(1 for result in ordered if result.resolved)
+        summary = {
+            'results': ordered,
+            'resolved': resolved,
+            'failed': len(ordered) - resolved,
+            'seconds': elapsed,
+            'items_per_second': len(ordered) / elapsed if elapsed else 0.0
+        }
+        logging.info("Batch lookup of %s items finished in %.2fs: %s resolved, %s failed",
+                     len(ordered), elapsed, resolved, summary['failed'])
+        return summary
+
+    def _resolve(self, entry):
+        """Resolve one entry; never raises"""
+        start = time.perf_counter()
+        item_name = entry.item_name
+        if self.cancelled:
+            return BatchResult(entry, 'cancelled')
+
+        try:
+            cached_item = self.item_cache.get(item_name)
+            if cached_item:
+                return BatchResult(entry, 'cached', stats=cached_item,
+                                   seconds=time.perf_counter() - start)
+
+            stale_item = self.item_cache.get_stale(item_name)
+            if stale_item:
+                result = self.search_pipeline.revalidate(item_name, stale_item)
+            else:
+                result = self.search_pipeline.lookup(item_name)
+
+            status = result['status']
+            if status == 'revalidated':
+                self.item_cache.touch(item_name)
+            elif status == 'found':
+                self.item_cache.set(item_name, result['stats'])
+
+            return BatchResult(entry, status, stats=result.get('stats'),
+                               similar_items=result.get('similar_items'),
+                               seconds=time.perf_counter() - start)
+        except Exception as e:
+            logging.error("Batch lookup failed for %s: %s", item_name, e, exc_info=True)
+            return BatchResult(entry, 'error', error=e, seconds=time.perf_counter() - start)
+
+
+# Saving
+@debug_log
+def save_batch(data_manager, class_name, results):
+    """Save every resolved batch result for a class in one transaction
+
+    Returns:
+        dict: filename plus saved and duplicates item name lists, or None
+            if the write failed
+    """
+    items = [(result.stats, result.entry.slot) for result in results if result.resolved]
+    saved = data_manager.save_gear_items(class_name, items)
+    if saved is None:
+        return None
+    saved['filename'] = data_manager.gear_location(class_name)
+    return saved
+
+
+def format_summary(summary, saved=None):
+    """One-paragraph throughput and failure summary of a batch run"""
+    lines = [f"Resolved {summary['resolved']} of {len(summary['results'])} items in "
+             f"{summary['seconds']:.2f}s ({summary['items_per_second']:.1f} items/s)"]
+    if saved is not None:
+        line = f"Saved {len(saved['saved'])} items to {saved['filename']}"
+        if saved['duplicates']:
+            line += f"; {len(saved['duplicates'])} already present"
+        lines.append(line)
+    for result in summary['results']:
+        if result.resolved:
+            continue
+        reason = result.status
+        if result.similar_items:
+            reason += f" (did you mean: {', '.join(result.similar_items[:3])}?)"
+        elif result.error is not None:
+            reason += f" ({result.error})"
+        lines.append(f"  {result.entry.item_name}: {reason}")
+    return '\n'.join(lines)
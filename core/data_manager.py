@@ -3,12 +3,19 @@ import logging
 import json
 import os
 import csv
+import io
+import threading
 from datetime import datetime
 
 from utils.decorators import debug_log
 from utils.cache import CacheManager
+from config.settings import (CACHE_DURATION, CACHE_STALE_DURATION, VALIDATOR_CACHE_FILE,
+                             GEAR_STORE_BACKEND, GEAR_DB_FILE)
+from config.constraints import SLOT_ORDER
 from core.item_parser import ItemParser
-from core.spell_parser import SpellParser
+from core.gear_index import GearIndex, gear_csv_headers, normalize_id, normalize_name
+from core.gear_store import SqliteGearStore
+from core.spell_table import SpellTable, normalize_effects, resolve_effect, spell_table_filename
 
 class DataManager:
     @debug_log
@@ -19,15 +26,33 @@ class DataManager:
                 cache_file='item_cache.json',
                 cache_duration=24 * 60 * 60,
                 is_item_cache=True,
-                max_size_mb=10.0
+                max_size_mb=10.0,
+                stale_duration=CACHE_STALE_DURATION
             )
             self.spell_cache_manager = CacheManager(
                 cache_file='spell_cache.json',
                 cache_duration=24 * 60 * 60,
                 is_item_cache=False
             )
-            self.item_parser = ItemParser()
-            self.spell_parser = SpellParser()
+            # HTTP validators must outlive the stale item entries they revalidate
+            self.validator_cache_manager = CacheManager(
+                cache_file=VALIDATOR_CACHE_FILE,
+                cache_duration=CACHE_DURATION + CACHE_STALE_DURATION,
+                max_size_mb=1.0
+            )
+            # Parsers read through the shared spell cache before fetching
+            self.item_parser = ItemParser(spell_cache=self.spell_cache_manager)
+            self.spell_parser = self.item_parser.spell_parser
+            # Duplicate indexes of the class CSVs, opened on first use
+            self._gear_indexes = {}
+            # Effect spell tables next to the class CSVs, opened on first use
+            self._spell_tables = {}
+            self._gear_indexes_lock = threading.Lock()
+            # The save queue and batch saves write from their own threads
+            self._csv_write_lock = threading.Lock()
+            # Optional database replacing the per-class CSV files
+            self.gear_store = SqliteGearStore(GEAR_DB_FILE) if GEAR_STORE_BACKEND == 'sqlite' else None
+            self._imported_classes = set()
             logging.debug("DataManager initialization complete")
         except Exception as e:
             logging.error(f"Error initializing DataManager: {e}", exc_info=True)
@@ -39,25 +64,32 @@ class DataManager:
         """Get high-level statistics about cache contents"""
         try:
             if cache_type == 'all':
-                logging.debug(f"Spell cache data: {self.spell_cache_manager.cache_data}")
+                spell_counters = self.spell_parser.get_cache_counters()
                 stats = {
-                    'items': len(self.cache_manager.cache_data),
-                    'spells': len(self.spell_cache_manager.cache_data),
-                    'total': len(self.cache_manager.cache_data) + 
-                            len(self.spell_cache_manager.cache_data)
+                    'items': len(self.cache_manager),
+                    'spells': len(self.spell_cache_manager),
+                    'total': len(self.cache_manager) + 
+                            len(self.spell_cache_manager),
+                    'spell_hits': spell_counters['hits'],
+                    'spell_misses': spell_counters['misses'],
+                    'evictions': {
+                        'items': self.cache_manager.get_eviction_stats(),
+                        'spells': self.spell_cache_manager.get_eviction_stats()
+                    }
                 }
                 logging.debug(f"Cache stats - Items: {stats['items']}, "
-                                f"Spells: {stats['spells']}, Total: {stats['total']}")
+                                f"Spells: {stats['spells']}, Total: {stats['total']}, "
+                                f"Spell hits: {stats['spell_hits']}, Spell misses: {stats['spell_misses']}")
                 return stats
                 
             # Individual cache stats
             current_time = datetime.now()
             cache = (self.cache_manager if cache_type == 'item' 
                     else self.spell_cache_manager)
-            count = len(cache.cache_data)
+            count = len(cache)
             
             if count > 0:
-                oldest = min(entry['timestamp'] for entry in cache.cache_data.values())
+                oldest = cache.oldest_timestamp()
                 age = (current_time - datetime.fromtimestamp(oldest)).total_seconds() / 3600
                 logging.debug(f"{cache_type} cache: {count} entries, oldest: {age:.1f} hours")
                 return count, age
@@ -65,7 +97,20 @@ class DataManager:
                         
         except Exception as e:
             logging.error(f"Error getting cache stats: {e}", exc_info=True)
-            return {'items': 0, 'spells': 0, 'total': 0} if cache_type == 'all' else (0, 0)
+            return ({'items': 0, 'spells': 0, 'total': 0, 'spell_hits': 0, 'spell_misses': 0,
+                     'evictions': {'items': {'expired': 0, 'evicted': 0},
+                                   'spells': {'expired': 0, 'evicted': 0}}}
+                    if cache_type == 'all' else (0, 0))
+
+    @debug_log
+    def close(self):
+        """Flush and close both caches"""
+        logging.debug("Closing DataManager caches")
+        self.cache_manager.close()
+        self.spell_cache_manager.close()
+        self.validator_cache_manager.close()
+        if self.gear_store is not None:
+            self.gear_store.close()
 
     @debug_log
     def clear_spell_cache(self):
@@ -83,6 +128,7 @@ class DataManager:
         """Clear item cache and return success status and count"""
         try:
             cleared = self.cache_manager.clear()
+            self.validator_cache_manager.clear()
             logging.info(f"Cleared {cleared} item cache entries")
             return True, cleared
         except Exception as e:
@@ -95,6 +141,7 @@ class DataManager:
         try:
             items_cleared = self.cache_manager.clear()
             spells_cleared = self.spell_cache_manager.clear()
+            self.validator_cache_manager.clear()
             
             results = {
                 'items': items_cleared,
@@ -110,76 +157,364 @@ class DataManager:
             logging.error(f"Error clearing caches: {e}", exc_info=True)
             return False, {'items': 0, 'spells': 0, 'total': 0}
 
+    # Gear Methods
+    # Saving, duplicate checks and loads by class, through the gear store
+    # when it is enabled and the class CSV otherwise
+    def gear_location(self, class_name):
+        """File a class's gear is saved to, for messages"""
+        return self.gear_store.db_file if self.gear_store else class_csv_filename(class_name)
+
+    @debug_log
+    def check_duplicate_gear(self, class_name, item_name, item_id=None):
+        """Check if an item is already saved for a class, by name or item ID"""
+        if self.gear_store is None:
+            return self.check_duplicate_entry(class_csv_filename(class_name), item_name, item_id)
+        try:
+            existing = self._class_gear_store(class_name).find(class_name, item_name, item_id)
+            logging.debug(f"Duplicate check for {item_name} in {class_name}: {existing}")
+            return existing is not None
+        except Exception as e:
+            logging.error(f"Error checking for duplicate gear: {e}", exc_info=True)
+            return False
+
+    @debug_log
+    def save_gear_item(self, class_name, item_data, slot):
+        """Save one item for a class; returns True on success"""
+        if self.gear_store is None:
+            return self.save_item_to_csv(class_csv_filename(class_name), item_data, slot)
+        return self.save_gear_items(class_name, [(item_data, slot)]) is not None
+
+    @debug_log
+    def save_gear_items(self, class_name, items):
+        """Save (item_data, slot) pairs for a class, skipping items already saved
+
+        Returns:
+            dict: saved and duplicates item name lists, or None on failure
+        """
+        if self.gear_store is None:
+            return self.save_items_to_csv(class_csv_filename(class_name), items)
+        try:
+            return self._class_gear_store(class_name).save_items(class_name, items)
+        except Exception as e:
+            logging.error(f"Failed to save gear for {class_name}: {e}", exc_info=True)
+            return None
+
+    @debug_log
+    def load_gear_rows(self, class_name, resolve_effects=False):
+        """Rows saved for a class in slot order, or None if none were ever saved
+
+        Effect details are spell ID references into the spell table unless
+        resolve_effects is set, which joins them back into detail dicts.
+        """
+        rows, spells = self._load_gear(class_name)
+        if rows and resolve_effects:
+            for row in rows:
+                for column in [column for column in row if column.endswith('_DETAILS')]:
+                    details = resolve_effect(row, column[:-len('_DETAILS')], spells)
+                    if details is None:
+                        del row[column]
+                    else:
+                        row[column] = details
+        return rows
+
+    def _load_gear(self, class_name):
+        """(rows, spell ID -> spell record) saved for a class; rows is None if there are none"""
+        if self.gear_store is not None:
+            store = self._class_gear_store(class_name)
+            return store.load_rows(class_name) or None, store.load_spells()
+        filename = class_csv_filename(class_name)
+        try:
+            with open(filename, 'r', newline='') as file:
+                rows = list(csv.DictReader(file))
+        except FileNotFoundError:
+            return None, {}
+        # Rows saved before the spell table still hold their details; convert them here
+        spells = dict(self.get_spell_table(filename).spells)
+        rows, legacy_spells = self._normalize_rows(rows)
+        spells.update((spell['id'], spell) for spell in legacy_spells)
+        return sort_rows_by_slot(rows), spells
+
+    @debug_log
+    def import_gear_csv(self, class_name, filename=None):
+        """Copy a class CSV into the gear store
+
+        Returns:
+            dict: saved and duplicates item name lists
+
+        Raises:
+            RuntimeError: The gear store is not enabled
+        """
+        if self.gear_store is None:
+            raise RuntimeError("Importing a class CSV needs GEAR_STORE_BACKEND = 'sqlite'")
+        filename = filename or class_csv_filename(class_name)
+        self._imported_classes.add(class_name)
+        return self.gear_store.import_csv(class_name, filename)
+
+    @debug_log
+    def export_gear_csv(self, class_name, filename=None):
+        """Write a class's gear to a CSV in the class file layout; returns the row count
+
+        The spells its effects reference are added to the spell table next
+        to the file.
+        """
+        filename = filename or class_csv_filename(class_name)
+        rows, spells = self._load_gear(class_name)
+        if self.gear_store is not None:
+            count = self.gear_store.export_csv(class_name, filename)
+        else:
+            count = write_gear_csv(rows or [], filename)
+        references = {row[column] for row in rows or [] for column in row
+                      if column.endswith('_DETAILS') and row[column]}
+        self.get_spell_table(filename).add(
+            [spells[reference] for reference in references if reference in spells])
+        return count
+
+    def _class_gear_store(self, class_name):
+        """The gear store, after importing the class CSV the first time the class is used"""
+        if class_name not in self._imported_classes:
+            self._imported_classes.add(class_name)
+            filename = class_csv_filename(class_name)
+            if os.path.exists(filename) and not self.gear_store.was_imported(class_name):
+                logging.info(f"Migrating {filename} into {self.gear_store.db_file}")
+                self.gear_store.import_csv(class_name, filename)
+        return self.gear_store
+
     # CSV File Operations
+    def get_gear_index(self, filename):
+        """Get the duplicate index of a class CSV, loading it once"""
+        with self._gear_indexes_lock:
+            gear_index = self._gear_indexes.get(filename)
+            if gear_index is None:
+                gear_index = GearIndex(filename)
+                self._gear_indexes[filename] = gear_index
+            return gear_index
+
+    def get_spell_table(self, filename):
+        """Get the spell table shared by a class CSV and its neighbours, loading it once"""
+        table_file = spell_table_filename(filename)
+        with self._gear_indexes_lock:
+            spell_table = self._spell_tables.get(table_file)
+            if spell_table is None:
+                spell_table = SpellTable(table_file)
+                self._spell_tables[table_file] = spell_table
+            return spell_table
+
     @debug_log
-    def check_duplicate_entry(self, filename, item_name):
-        """Check if an item already exists in the CSV"""
+    def check_duplicate_entry(self, filename, item_name, item_id=None):
+        """Check if an item already exists in the CSV, by name or item ID"""
         try:
             logging.debug(f"Checking for duplicate entry: {item_name} in {filename}")
-            if os.path.exists(filename):
-                logging.debug(f"CSV file found, searching for duplicate")
-                with open(filename, 'r', newline='') as file:
-                    reader = csv.DictReader(file)
-                    for row in reader:
-                        if row.get('Name') == item_name:
-                            logging.debug(f"Duplicate found for item: {item_name}")
-                            return True
-                logging.debug(f"No duplicate found for item: {item_name}")
-            else:
-                logging.debug(f"CSV file does not exist: {filename}")
+            existing = self.get_gear_index(filename).find(item_name, item_id)
+            if existing:
+                logging.debug(f"Duplicate found for item: {item_name} (saved as {existing[0]} in {existing[2]})")
+                return True
+            logging.debug(f"No duplicate found for item: {item_name}")
             return False
         except Exception as e:
             logging.error(f"Error checking for duplicate entry: {e}", exc_info=True)
             return False
 
     @debug_log
-    def save_item_to_csv(self, filename, item_data, slot, slot_order):
-        """Save item data to CSV file"""
+    def save_item_to_csv(self, filename, item_data, slot):
+        """Save item data to CSV file
+
+        The row is appended; the file is only rewritten when the item has a
+        column the file does not. Rows are kept in save order and sorted by
+        slot when read (see sort_rows_by_slot). Effect details are stored
+        in the spell table and the row references them by spell ID.
+        """
         try:
             logging.debug(f"Starting save operation for item: {item_data.get('Name', 'Unknown')} in slot: {slot}")
-            
-            # Read existing data and headers
-            existing_data = []
-            headers = set()
-            if os.path.exists(filename):
-                logging.debug(f"Reading existing CSV file: {filename}")
-                with open(filename, 'r', newline='') as file:
-                    reader = csv.DictReader(file)
-                    headers = set(reader.fieldnames)
-                    existing_data = list(reader)
-                    logging.debug(f"Found {len(existing_data)} existing entries")
-
-            # Update headers
-            logging.debug("Updating headers with new item data")
-            headers.add('Slot')
-            headers.update(item_data.keys())
-            ordered_headers = ['Slot'] + sorted(list(headers - {'Slot'}))
-            logging.debug(f"Final header count: {len(ordered_headers)}")
-
-            # Prepare new row
-            logging.debug("Preparing new row data")
-            new_row = {'Slot': slot}
-            new_row.update(item_data)
-
-            if 'URL' in new_row and 'ID' in new_row:
-                new_row['URL'] = f"{new_row['URL']} "
-                logging.debug("Added space after ID in URL")
-
-            # Update data
-            existing_data.append(new_row)
-            logging.debug("Sorting data by slot order")
-            existing_data.sort(key=lambda x: slot_order.get(x['Slot'], float('inf')))
-
-            # Write to file
-            logging.debug(f"Writing {len(existing_data)} entries to CSV")
-            with open(filename, 'w', newline='') as file:
+            row, spells = self._prepare_row(item_data, slot)
+            mode = self._write_rows(filename, [row], spells)
+            logging.info(f"Successfully saved data to {filename} ({mode})")
+            return True
+
+        except Exception as e:
+            logging.error(f"Failed to save to CSV: {e}", exc_info=True)
+            return False
+
+    @debug_log
+    def save_items_to_csv(self, filename, items):
+        """Save several items to a CSV file in one write
+
+        Items already in the file, by name or ID, are skipped. New rows are
+        appended in a single write, or the whole file is replaced through
+        a temporary file when they add columns, so either every new row
+        lands or none do.
+
+        Args:
+            filename (str): Class CSV file
+            items (list): (item_data, slot) pairs
+
+        Returns:
+            dict: saved and duplicates item name lists, or None on failure
+        """
+        try:
+            logging.debug("Starting batch save of %s items to %s", len(items), filename)
+
+            gear_index = self.get_gear_index(filename)
+            names = set()
+            ids = set()
+            rows = []
+            spells = []
+            saved = []
+            duplicates = []
+            # Another save could add the same item between the check and the write
+            with self._csv_write_lock:
+                for item_data, slot in items:
+                    item_name = item_data.get('Name')
+                    item_id = normalize_id(item_data.get('ID'))
+                    name_key = normalize_name(item_name)
+                    if (gear_index.find(item_name, item_id) or name_key in names
+                            or (item_id and item_id in ids)):
+                        duplicates.append(item_name)
+                        continue
+                    names.add(name_key)
+                    if item_id:
+                        ids.add(item_id)
+                    row, item_spells = self._prepare_row(item_data, slot)
+                    rows.append(row)
+                    spells.extend(item_spells)
+                    saved.append(item_name)
+
+                if rows:
+                    self._write_rows_locked(filename, rows, spells)
+
+            logging.info("Saved %s items to %s (%s duplicates skipped)", len(saved), filename, len(duplicates))
+            return {'saved': saved, 'duplicates': duplicates}
+
+        except Exception as e:
+            logging.error("Failed to save batch to CSV: %s", e, exc_info=True)
+            return None
+
+    @staticmethod
+    def _prepare_row(item_data, slot):
+        """Build the CSV row for an item saved under a slot
+
+        Returns:
+            tuple: (row, spell records its effects reference)
+        """
+        item_data, spells = normalize_effects(item_data)
+        new_row = {'Slot': slot}
+        new_row.update(item_data)
+        if 'URL' in new_row and 'ID' in new_row:
+            new_row['URL'] = f"{new_row['URL']} "
+        return new_row, spells
+
+    @staticmethod
+    def _normalize_rows(rows):
+        """Convert effect details left in saved rows to spell ID references
+
+        Returns:
+            tuple: (rows, spell records they reference)
+        """
+        normalized = []
+        spells = []
+        for row in rows:
+            row, row_spells = normalize_effects(row)
+            normalized.append(row)
+            spells.extend(row_spells)
+        return normalized, spells
+
+    @staticmethod
+    def _read_csv_header(filename):
+        """Column names of a CSV file, or None if it is missing or empty"""
+        try:
+            with open(filename, 'r', newline='') as file:
+                return next(csv.reader(file), None)
+        except FileNotFoundError:
+            return None
+
+    def _write_rows(self, filename, rows, spells=()):
+        """Write rows to a class CSV and record them in its gear index
+
+        The index is brought up to date before the write, so edits made
+        outside the application are not lost when the new rows are added.
+        Spells are added to the spell table first, so every reference in
+        the CSV resolves.
+
+        Returns:
+            str: 'appended' or 'rewritten'
+        """
+        with self._csv_write_lock:
+            return self._write_rows_locked(filename, rows, spells)
+
+    def _write_rows_locked(self, filename, rows, spells=()):
+        """_write_rows for callers already holding _csv_write_lock"""
+        gear_index = self.get_gear_index(filename)
+        spell_table = self.get_spell_table(filename)
+        spell_table.add(spells)
+        gear_index.refresh()
+        mode = self._write_csv_rows(filename, rows, spell_table)
+        gear_index.record_saved(rows, rewritten=mode == 'rewritten')
+        return mode
+
+    def _write_csv_rows(self, filename, rows, spell_table):
+        """Append rows to a CSV file, rewriting it only for new columns
+
+        A rewrite also moves effect details left in older rows into the
+        spell table.
+        """
+        headers = self._read_csv_header(filename)
+        columns = set().union(*(row.keys() for row in rows))
+        if headers and columns.issubset(headers):
+            # Common case: only the header line is read, whatever the file size
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=headers, quoting=csv.QUOTE_MINIMAL)
+            writer.writerows(rows)
+            with open(filename, 'rb') as file:
+                file.seek(-1, os.SEEK_END)
+                needs_newline = file.read(1) != b'\n'
+            with open(filename, 'a', newline='') as file:
+                file.write(('\r\n' if needs_newline else '') + buffer.getvalue())
+            logging.debug("Appended %s rows to %s", len(rows), filename)
+            return 'appended'
+
+        existing_data = []
+        if headers:
+            with open(filename, 'r', newline='') as file:
+                existing_data, legacy_spells = self._normalize_rows(csv.DictReader(file))
+            spell_table.add(legacy_spells)
+            columns |= set().union(*(row.keys() for row in existing_data))
+        new_headers = set(headers or []) | columns | {'Slot'}
+        ordered_headers = gear_csv_headers(new_headers)
+        logging.debug("Rewriting %s with %s columns (%s new)", filename, len(ordered_headers),
+                      len(new_headers) - len(headers or []))
+
+        temp_filename = f"{filename}.tmp"
+        try:
+            with open(temp_filename, 'w', newline='') as file:
                 writer = csv.DictWriter(file, fieldnames=ordered_headers, quoting=csv.QUOTE_MINIMAL)
                 writer.writeheader()
                 writer.writerows(existing_data)
+                writer.writerows(rows)
+            os.replace(temp_filename, filename)
+        finally:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+        return 'rewritten'
 
-            logging.info(f"Successfully saved data to {filename}")
-            return True
 
-        except Exception as e:
-            logging.error(f"Failed to save to CSV: {e}", exc_info=True)
-            return False
\ No newline at end of file
+def class_csv_filename(class_name):
+    """CSV file a class's gear is saved to"""
+    return f"{class_name.lower().replace(' ', '_')}_gear_comparison.csv"
+
+
+def write_gear_csv(rows, filename):
+    """Write gear rows to a CSV file in the class CSV layout
+
+    Returns:
+        int: Number of rows written
+    """
+    headers = gear_csv_headers(set().union(*(row.keys() for row in rows)))
+    with open(filename, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=headers, quoting=csv.QUOTE_MINIMAL)
+        writer.writeheader()
+        writer.writerows(rows)
+    return len(rows)
+
+
+def sort_rows_by_slot(rows):
+    """Order gear rows by slot as listed in SLOTS, keeping save order within a slot"""
+    return sorted(rows, key=lambda row: SLOT_ORDER.get(row.get('Slot'), len(SLOT_ORDER)))
@@ -0,0 +1,162 @@
+# core/gear_index.py
+import csv
+import json
+import logging
+import os
+import threading
+
+from config.settings import GEAR_INDEX_SUFFIX
+
+
+def normalize_name(name):
+    """Name key for duplicate checks, ignoring case and spacing"""
+    return ' '.join((name or '').split()).lower()
+
+
+def normalize_id(item_id):
+    """ID key for duplicate checks, or None when the item has no ID"""
+    item_id = str(item_id or '').strip()
+    return item_id or None
+
+
+def gear_csv_headers(columns):
+    """Header of a class CSV holding the given columns: Slot, then the rest sorted"""
+    return ['Slot'] + sorted(set(columns) - {'Slot'})
+
+
+class GearIndex:
+    """Name, ID and slot of every item in a class CSV, for O(1) duplicate checks
+
+    The index is kept next to the CSV as an append-only log of JSON lines:
+    one record per saved item, each batch followed by a record of the CSV's
+    mtime and size after the write. When the CSV's current mtime or size
+    differs from the last record (an edit outside the application, or a
+    torn write) the index is rebuilt from the CSV.
+    """
+
+    def __init__(self, csv_filename):
+        self.csv_filename = csv_filename
+        self.index_file = f"{csv_filename}{GEAR_INDEX_SUFFIX}"
+        self.names = {}  # normalized name -> (name, id, slot)
+        self.ids = {}    # item ID -> (name, id, slot)
+        self._signature = None
+        self._lock = threading.Lock()
+        self._load()
+
+    # Index Methods
+    def _csv_signature(self):
+        """(mtime_ns, size) of the CSV, or None when it does not exist"""
+        try:
+            stat = os.stat(self.csv_filename)
+        except FileNotFoundError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _load(self):
+        """Replay the index log, rebuilding it if it does not match the CSV"""
+        signature = None
+        if os.path.exists(self.index_file):
+            valid_bytes = 0
+            with open(self.index_file, 'rb') as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b'\n'):
+                            raise ValueError("incomplete record")
+                        record = json.loads(line)
+                    except ValueError:
+                        logging.warning(f"Dropping partial record at byte {valid_bytes} of {self.index_file}")
+                        break
+                    valid_bytes += len(line)
+                    if 'csv' in record:
+                        signature = record['csv']
+                    elif record.get('name') or record.get('id'):
+                        self._add(record.get('name'), record.get('id'), record.get('slot'))
+
+            # Cut a torn tail so the next append starts on a fresh line
+            if valid_bytes < os.path.getsize(self.index_file):
+                with open(self.index_file, 'r+b') as f:
+                    f.truncate(valid_bytes)
+        self._signature = signature
+        if signature != self._csv_signature():
+            self._rebuild()
+        else:
+            logging.debug(f"Loaded gear index for {self.csv_filename} with {len(self.names)} items")
+
+    def _rebuild(self):
+        """Scan the CSV and rewrite the index log from it"""
+        self.names.clear()
+        self.ids.clear()
+        entries = []
+        if os.path.exists(self.csv_filename):
+            with open(self.csv_filename, 'r', newline='') as file:
+                for row in csv.DictReader(file):
+                    entries.append(self._add(row.get('Name'), row.get('ID'), row.get('Slot')))
+        self._signature = self._csv_signature()
+
+        if self._signature is None:
+            if os.path.exists(self.index_file):
+                os.remove(self.index_file)
+        else:
+            temp_file = f"{self.index_file}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.writelines(self._records(entries))
+            os.replace(temp_file, self.index_file)
+        logging.debug(f"Rebuilt gear index for {self.csv_filename} with {len(self.names)} items")
+
+    def _add(self, name, item_id, slot):
+        entry = (name, normalize_id(item_id), slot)
+        self.names[normalize_name(name)] = entry
+        if entry[1]:
+            self.ids[entry[1]] = entry
+        return entry
+
+    def _records(self, entries):
+        for name, item_id, slot in entries:
+            yield json.dumps({'name': name, 'id': item_id, 'slot': slot}) + '\n'
+        yield json.dumps({'csv': self._signature}) + '\n'
+
+    def refresh(self):
+        """Rebuild the index if the CSV changed since it was last recorded"""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        if self._signature != self._csv_signature():
+            logging.debug(f"{self.csv_filename} changed on disk, rebuilding gear index")
+            self._rebuild()
+
+    # Lookup Methods
+    def find(self, item_name, item_id=None):
+        """Get the saved (name, id, slot) matching an item's name or ID, or None
+
+        Names match ignoring case and spacing; the ID catches the same item
+        saved under a different spelling.
+        """
+        with self._lock:
+            self._refresh()
+            entry = self.names.get(normalize_name(item_name))
+            if entry is None and normalize_id(item_id):
+                entry = self.ids.get(normalize_id(item_id))
+            return entry
+
+    def __contains__(self, item_name):
+        return self.find(item_name) is not None
+
+    def __len__(self):
+        return len(self.names)
+
+    def record_saved(self, rows, rewritten=False):
+        """Add rows the application just wrote to the CSV
+
+        Call refresh() before the write and this right after it. A rewrite
+        of the whole CSV rebuilds the index; an append only appends to the
+        log.
+        """
+        with self._lock:
+            if rewritten:
+                self._rebuild()
+                return
+            entries = [self._add(row.get('Name'), row.get('ID'), row.get('Slot')) for row in rows]
+            self._signature = self._csv_signature()
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.writelines(self._records(entries))
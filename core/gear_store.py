@@ -0,0 +1,315 @@
+# core/gear_store.py
+import csv
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from config.constraints import STAT_CATEGORIES, SLOT_ORDER
+from core.gear_index import gear_csv_headers, normalize_name
+from core.spell_table import SpellTable, normalize_effects, spell_table_filename
+
+# Fixed item columns; any other key of an item dict is kept in items.extra
+STAT_COLUMNS = list(dict.fromkeys(
+    stat for stats in STAT_CATEGORIES.values() for stat in stats if stat not in ('Name', 'ID')
+))
+
+
+def _quote(column):
+    return '"' + column.replace('"', '""') + '"'
+
+
+class SqliteGearStore:
+    """Saved gear of every class in one SQLite database
+
+    ``items`` holds each item once, with a column per stat in
+    STAT_CATEGORIES; ``class_gear`` links items to the classes and slots
+    they were saved under, in save order. Effect spells are stored once in
+    ``spells`` and items reference them by spell ID. Lookups by class and
+    slot, item ID and name are indexed. The database uses a rollback
+    journal so its mtime changes on every commit, which the CSV viewer
+    watches.
+    """
+
+    # PRAGMA user_version of the current layout
+    SCHEMA_VERSION = 1
+
+    def __init__(self, db_file):
+        logging.debug(f"Opening gear database: {db_file}")
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        stat_columns = ''.join(f"{_quote(column)}, " for column in STAT_COLUMNS)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS items ("
+                "id INTEGER PRIMARY KEY, "
+                "item_id TEXT, "
+                "name TEXT NOT NULL, "
+                "name_key TEXT NOT NULL, "
+                f"{stat_columns}"
+                "extra TEXT NOT NULL DEFAULT '{}')"
+            )
+            self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_items_item_id ON items (item_id)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_items_name_key ON items (name_key)")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS class_gear ("
+                "id INTEGER PRIMARY KEY, "
+                "class TEXT NOT NULL, "
+                "slot TEXT NOT NULL, "
+                "item INTEGER NOT NULL REFERENCES items (id), "
+                "saved_at REAL NOT NULL, "
+                "UNIQUE (class, item))"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_class_gear_class_slot ON class_gear (class, slot)")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS csv_imports ("
+                "class TEXT PRIMARY KEY, "
+                "filename TEXT NOT NULL, "
+                "imported_at REAL NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS spells ("
+                "spell_id TEXT PRIMARY KEY, "
+                "name TEXT NOT NULL, "
+                "url TEXT, "
+                "effects TEXT NOT NULL DEFAULT '[]')"
+            )
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+                self._migrate_effect_details()
+                self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def _migrate_effect_details(self):
+        """Move effect details saved inside items.extra into the spells table"""
+        migrated = 0
+        for key, extra in self.conn.execute("SELECT id, extra FROM items WHERE extra != '{}'").fetchall():
+            item_data, spells = normalize_effects(json.loads(extra))
+            if not spells:
+                continue
+            self._save_spells(spells)
+            self.conn.execute("UPDATE items SET extra = ? WHERE id = ?", (json.dumps(item_data), key))
+            migrated += 1
+        if migrated:
+            logging.info(f"Moved effect details of {migrated} items into the spells table")
+
+    # Lookup Methods
+    def find(self, class_name, item_name, item_id=None):
+        """Get the saved (name, id, slot) matching an item's name or ID in a class, or None"""
+        with self._lock:
+            return self._find(class_name, item_name, item_id)
+
+    def _find(self, class_name, item_name, item_id):
+        item_id = str(item_id).strip() if item_id else None
+        # Candidates come from the name and item ID indexes, then (class, item)
+        return self.conn.execute(
+            "SELECT items.name, items.item_id, class_gear.slot FROM items "
+            "JOIN class_gear ON class_gear.class = ? AND class_gear.item = items.id "
+            "WHERE items.id IN (SELECT id FROM items WHERE name_key = ? "
+            "UNION SELECT id FROM items WHERE item_id = ?)",
+            (class_name, normalize_name(item_name), item_id)
+        ).fetchone()
+
+    def load_rows(self, class_name):
+        """Rows saved for a class, ordered by slot and then save order
+
+        Returns:
+            list: dicts with Slot, Name, ID and every stat the item has
+        """
+        columns = ', '.join(f"items.{_quote(column)}" for column in STAT_COLUMNS)
+        with self._lock:
+            cursor = self.conn.execute(
+                f"SELECT class_gear.slot, items.name, items.item_id, {columns}, items.extra "
+                "FROM class_gear JOIN items ON items.id = class_gear.item "
+                "WHERE class_gear.class = ? ORDER BY class_gear.id",
+                (class_name,)
+            )
+            records = cursor.fetchall()
+
+        rows = []
+        for slot, name, item_id, *values in records:
+            row = {'Slot': slot, 'Name': name}
+            if item_id is not None:
+                row['ID'] = item_id
+            row.update((column, value) for column, value in zip(STAT_COLUMNS, values[:-1])
+                       if value is not None)
+            row.update(json.loads(values[-1]))
+            rows.append(row)
+        rows.sort(key=lambda row: SLOT_ORDER.get(row['Slot'], len(SLOT_ORDER)))
+        return rows
+
+    def load_spells(self):
+        """Every stored spell, keyed by spell ID
+
+        Returns:
+            dict: spell ID -> id, name, url and effects
+        """
+        with self._lock:
+            records = self.conn.execute("SELECT spell_id, name, url, effects FROM spells").fetchall()
+        spells = {}
+        for spell_id, name, url, effects in records:
+            spell = {'id': spell_id, 'name': name, 'effects': json.loads(effects)}
+            if url is not None:
+                spell['url'] = url
+            spells[spell_id] = spell
+        return spells
+
+    def count(self, class_name):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM class_gear WHERE class = ?", (class_name,)
+            ).fetchone()[0]
+
+    # Save Methods
+    def save_items(self, class_name, items):
+        """Save (item_data, slot) pairs for a class in one transaction
+
+        Items already saved for the class, by name or ID, are skipped.
+        Effect details go to the spells table; the item keeps the spell ID.
+
+        Returns:
+            dict: saved and duplicates item name lists
+        """
+        saved = []
+        duplicates = []
+        now = time.time()
+        with self._lock, self.conn:
+            for item_data, slot in items:
+                item_name = item_data.get('Name')
+                if self._find(class_name, item_name, item_data.get('ID')):
+                    duplicates.append(item_name)
+                    continue
+                item_data, spells = normalize_effects(item_data)
+                self._save_spells(spells)
+                self.conn.execute(
+                    "INSERT INTO class_gear (class, slot, item, saved_at) VALUES (?, ?, ?, ?)",
+                    (class_name, slot, self._upsert_item(item_data), now)
+                )
+                saved.append(item_name)
+        logging.debug("Saved %s gear items for %s (%s duplicates)", len(saved), class_name, len(duplicates))
+        return {'saved': saved, 'duplicates': duplicates}
+
+    def _save_spells(self, spells):
+        """Store spell records; a spell seen again keeps its latest details"""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO spells (spell_id, name, url, effects) VALUES (?, ?, ?, ?)",
+            [(spell['id'], spell.get('name') or '', spell.get('url'), json.dumps(spell['effects']))
+             for spell in spells]
+        )
+
+    def _upsert_item(self, item_data):
+        """Store an item's stats and get the key of its row
+
+        An item already stored (by ID, or by name when it has no ID) is
+        updated to the stats it was saved with last; every class that saved
+        it shares the row.
+        """
+        item_id = str(item_data['ID']).strip() if item_data.get('ID') else None
+        name = item_data.get('Name') or ''
+        # Values are stored as the CSV would hold them; URLs lose the CSV's trailing space
+        values = [None if item_data.get(column) in (None, '') else str(item_data[column]).strip()
+                  for column in STAT_COLUMNS]
+        extra = json.dumps({key: value for key, value in item_data.items()
+                            if key not in ('Name', 'ID', 'Slot') and key not in STAT_COLUMNS
+                            and value not in (None, '')})
+        columns = ', '.join(_quote(column) for column in STAT_COLUMNS)
+        placeholders = ', '.join('?' for _ in STAT_COLUMNS)
+        updates = ', '.join(f"{column} = excluded.{column}"
+                            for column in ['name', 'name_key', *map(_quote, STAT_COLUMNS), 'extra'])
+
+        if item_id:
+            self.conn.execute(
+                f"INSERT INTO items (item_id, name, name_key, {columns}, extra) "
+                f"VALUES (?, ?, ?, {placeholders}, ?) "
+                f"ON CONFLICT (item_id) DO UPDATE SET {updates}",
+                [item_id, name, normalize_name(name), *values, extra]
+            )
+            return self.conn.execute("SELECT id FROM items WHERE item_id = ?", (item_id,)).fetchone()[0]
+
+        # Items without an ID are matched by name; NULL IDs never conflict
+        existing = self.conn.execute(
+            "SELECT id FROM items WHERE name_key = ? AND item_id IS NULL", (normalize_name(name),)
+        ).fetchone()
+        if existing is not None:
+            assignments = ', '.join(f"{_quote(column)} = ?" for column in STAT_COLUMNS)
+            self.conn.execute(
+                f"UPDATE items SET name = ?, {assignments}, extra = ? WHERE id = ?",
+                [name, *values, extra, existing[0]]
+            )
+            return existing[0]
+        return self.conn.execute(
+            f"INSERT INTO items (item_id, name, name_key, {columns}, extra) "
+            f"VALUES (?, ?, ?, {placeholders}, ?)",
+            [None, name, normalize_name(name), *values, extra]
+        ).lastrowid
+
+    # CSV Compatibility Methods
+    def import_csv(self, class_name, filename):
+        """Add the rows of a class CSV, and the spells they reference, to the database
+
+        Returns:
+            dict: saved and duplicates item name lists
+        """
+        with open(filename, 'r', newline='') as file:
+            items = []
+            for row in csv.DictReader(file):
+                slot = row.pop('Slot', None) or ''
+                items.append(({key: value.strip() for key, value in row.items()
+                               if key is not None and value and value.strip()}, slot))
+        spells = SpellTable(spell_table_filename(filename)).spells
+        with self._lock, self.conn:
+            self._save_spells(spells.values())
+        result = self.save_items(class_name, items)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO csv_imports (class, filename, imported_at) VALUES (?, ?, ?)",
+                (class_name, filename, time.time())
+            )
+        logging.info(f"Imported {len(result['saved'])} items for {class_name} from {filename}")
+        return result
+
+    def was_imported(self, class_name):
+        with self._lock:
+            return self.conn.execute(
+                "SELECT 1 FROM csv_imports WHERE class = ?", (class_name,)
+            ).fetchone() is not None
+
+    def export_csv(self, class_name, filename):
+        """Write a class's gear to a CSV file in the per-class file layout
+
+        Returns:
+            int: Number of rows written
+        """
+        temp_filename = f"{filename}.tmp"
+        try:
+            with open(temp_filename, 'w', newline='') as file:
+                count = self.write_csv(class_name, file)
+            os.replace(temp_filename, filename)
+        finally:
+            if os.path.exists(temp_filename):
+                os.remove(temp_filename)
+        logging.info(f"Exported {count} items for {class_name} to {filename}")
+        return count
+
+    def write_csv(self, class_name, file):
+        """Write a class's gear as CSV to an open file, as save_item_to_csv lays it out
+
+        Returns:
+            int: Number of rows written
+        """
+        rows = self.load_rows(class_name)
+        headers = gear_csv_headers(set().union(*(row.keys() for row in rows)))
+        writer = csv.DictWriter(file, fieldnames=headers, quoting=csv.QUOTE_MINIMAL)
+        writer.writeheader()
+        for row in rows:
+            if 'URL' in row and 'ID' in row:
+                row['URL'] = f"{row['URL']} "
+            writer.writerow(row)
+        return len(rows)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,179 @@
+# core/lxml_engine.py
+import logging
+import re
+
+import lxml.etree
+import lxml.html
+
+from utils.decorators import debug_log
+from config.settings import ITEM_BLOCK_CLASS
+
+EFFECT_LABELS = ['Focus Effect', 'Worn Effect', 'Proc Effect', 'Click Effect']
+NAME_TAGS = {'h2', 'h1', 'strong'}
+NAME_IGNORE_WORDS = ['search', 'result', 'menu', 'navigation']
+
+# Elements whose text BeautifulSoup's get_text() leaves out
+_SKIPPED_TEXT_TAGS = {'script', 'style', 'template'}
+
+_find_bold = lxml.etree.XPath('.//b')
+_find_first_link = lxml.etree.XPath('(.//a)[1]')
+_effect_label_patterns = [(label, re.compile(f"^{label}:")) for label in EFFECT_LABELS]
+_cast_time_pattern = re.compile(r'\(Cast Time:\s*([\d.]+\s*\w+)\)')
+_charges_pattern = re.compile(r'Charges:\s*(\w+)')
+_spell_id_pattern = re.compile(r'id=(\d+)')
+
+
+class LxmlItemScanner:
+    """Single-pass item page scanner built directly on lxml
+
+    Produces the same (name, item text, effects) the BeautifulSoup path
+    in ItemParser derives from separate tree walks: one walk over the
+    document collects the visible text of the page and of the item block,
+    the first usable heading and every ``td[colspan=2]`` effect cell.
+    """
+
+    @debug_log
+    def scan(self, html_content):
+        """Scan an item page
+
+        Returns:
+            tuple: (item name or None, item block text, effects in label
+                order, whether the item block was found). Without an item
+                block the text of the whole page is returned.
+
+        Raises:
+            lxml.etree.ParserError: If lxml cannot parse the document
+        """
+        root = lxml.html.document_fromstring(html_content)
+
+        item_name = None
+        effect_cells = []
+
+        def on_element(element):
+            nonlocal item_name
+            tag = element.tag
+            if item_name is None and tag in NAME_TAGS:
+                item_name = self._heading_name(element)
+            if tag == 'td' and element.get('colspan') == '2':
+                effect_cells.append(element)
+            return ITEM_BLOCK_CLASS in (element.get('class') or '').split()
+
+        page_text, block_text = self._collect_text(root, on_element)
+        effects = self._find_effects(effect_cells)
+        logging.debug("lxml scan found name=%r, %s effects, item block %s", item_name, len(effects),
+                      'found' if block_text is not None else 'missing')
+        if block_text is None:
+            return item_name, page_text, effects, False
+        return item_name, block_text, effects, True
+
+    # Helper Methods
+    @staticmethod
+    def _walk(element):
+        """Like lxml.etree.iterwalk, but also yields comments and processing instructions"""
+        yield 'start', element
+        stack = [(element, iter(element))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield 'end', node
+            else:
+                yield 'start', child
+                stack.append((child, iter(child)))
+
+    @classmethod
+    def _collect_text(cls, element, on_element=None):
+        """Visible text of a subtree, matching BeautifulSoup's get_text()
+
+        ``on_element`` is called for every element whose text is visible,
+        letting a caller gather other data during the same walk. The text
+        of the first element it returns True for is returned as well.
+
+        Returns:
+            tuple: (subtree text, marked element text or None)
+        """
+        parts = []
+        skip_depth = 0
+        marked = None
+        marked_start = marked_end = 0
+        for event, node in cls._walk(element):
+            tag = node.tag
+            if not isinstance(tag, str):
+                # Comments and processing instructions: only their tail is text
+                if event == 'end' and node.tail and not skip_depth:
+                    parts.append(node.tail)
+                continue
+
+            if event == 'start':
+                if tag in _SKIPPED_TEXT_TAGS:
+                    skip_depth += 1
+                elif not skip_depth:
+                    if on_element is not None and on_element(node) and marked is None:
+                        marked = node
+                        marked_start = len(parts)
+                    if node.text:
+                        parts.append(node.text)
+            else:
+                if tag in _SKIPPED_TEXT_TAGS:
+                    skip_depth -= 1
+                if node is marked:
+                    marked_end = len(parts)
+                if node is not element and node.tail and not skip_depth:
+                    parts.append(node.tail)
+
+        marked_text = ''.join(parts[marked_start:marked_end]) if marked is not None else None
+        return ''.join(parts), marked_text
+
+    @classmethod
+    def _text_of(cls, element):
+        return cls._collect_text(element)[0]
+
+    def _heading_name(self, element):
+        text = self._text_of(element).strip()
+        if text and not any(ignore in text.lower() for ignore in NAME_IGNORE_WORDS):
+            return text
+        return None
+
+    @staticmethod
+    def _single_string(element):
+        """Mirror bs4's Tag.string: the only string beneath a chain of single children"""
+        while True:
+            children = list(element)
+            if not children:
+                return element.text
+            if len(children) == 1 and not element.text and not children[0].tail:
+                element = children[0]
+                if not isinstance(element.tag, str):
+                    return element.text
+                continue
+            return None
+
+    def _find_effects(self, effect_cells):
+        """Find effect links in Focus, Worn, Proc, Click order
+
+        As in the BeautifulSoup path, the last matching cell for a label wins.
+        """
+        found = {}
+        for td in effect_cells:
+            bold_strings = [self._single_string(b) for b in _find_bold(td)]
+            for label, label_pattern in _effect_label_patterns:
+                if not any(s and label_pattern.search(s) for s in bold_strings):
+                    continue
+                links = _find_first_link(td)
+                if not links:
+                    continue
+                spell_id_match = _spell_id_pattern.search(links[0].get('href', ''))
+                if not spell_id_match:
+                    continue
+                td_text = self._text_of(td)
+                cast_time_match = _cast_time_pattern.search(td_text)
+                charges_match = _charges_pattern.search(td_text)
+                found[label] = {
+                    'label': label,
+                    'spell_name': self._text_of(links[0]).strip(),
+                    'spell_id': spell_id_match.group(1),
+                    'cast_time': cast_time_match.group(1) if cast_time_match else None,
+                    'charges': charges_match.group(1) if charges_match else None
+                }
+        return [found[label] for label in EFFECT_LABELS if label in found]
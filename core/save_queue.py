@@ -0,0 +1,157 @@
+# core/save_queue.py
+import logging
+import queue
+import threading
+import time
+
+from config.settings import SAVE_COALESCE_MS, SAVE_RETRY_MAX_MS, SAVE_FAILURES_REPORTED
+
+
+class SaveQueue:
+    """Write-behind queue for gear saves
+
+    Saves are accepted immediately and written by a background thread.
+    Everything queued within ``window_ms`` of the first pending save is
+    written together, one DataManager.save_gear_items call per class, so
+    a run of auto-saves costs one write instead of one per search. close()
+    writes whatever is still pending.
+
+    A failed write is queued again and retried after a delay that doubles
+    with each failure in a row, up to ``retry_max_ms``. Once
+    ``failures_reported`` writes in a row have failed, a (class_name,
+    item names) entry is put on ``errors`` for the UI to show.
+    """
+
+    def __init__(self, data_manager, window_ms=SAVE_COALESCE_MS, retry_max_ms=SAVE_RETRY_MAX_MS,
+                 failures_reported=SAVE_FAILURES_REPORTED):
+        logging.debug("Initializing SaveQueue")
+        self.data_manager = data_manager
+        self.window = window_ms / 1000
+        self.retry_max = retry_max_ms / 1000
+        self.failures_reported = failures_reported
+        # (class_name, item names) of saves that keep failing, drained by the UI
+        self.errors = queue.Queue()
+        self._pending = []  # (class_name, item_data, slot) in save order
+        self._writing = []  # Saves taken from _pending and being written
+        self._deadline = None
+        self._failures = 0  # Failed writes in a row
+        self._closed = False
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self.stats = {'queued': 0, 'flushed': 0, 'duplicates': 0, 'writes': 0, 'failed': 0}
+        self._thread = threading.Thread(target=self._run, name='save-queue', daemon=True)
+        self._thread.start()
+
+    # Queue Methods
+    def enqueue(self, class_name, item_data, slot):
+        """Queue an item to be saved for a class; returns at once"""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("SaveQueue is closed")
+            self._pending.append((class_name, dict(item_data), slot))
+            self.stats['queued'] += 1
+            if self._deadline is None:
+                self._deadline = time.monotonic() + self.window
+                self._condition.notify()
+
+    def contains(self, class_name, item_name, item_id=None):
+        """Check if a matching item is waiting to be written for a class"""
+        item_name = (item_name or '').lower()
+        with self._condition:
+            return any(pending_class == class_name and
+                       ((item_data.get('Name') or '').lower() == item_name or
+                        (item_id and item_data.get('ID') == item_id))
+                       for pending_class, item_data, _ in self._pending + self._writing)
+
+    def get_stats(self):
+        """Counts of queued, flushed and duplicate items, writes and failed items"""
+        with self._condition:
+            stats = dict(self.stats)
+            stats['pending'] = len(self._pending)
+            return stats
+
+    def flush(self):
+        """Write everything pending now, from the calling thread"""
+        with self._condition:
+            batch = self._take()
+        self._write(batch)
+
+    def close(self):
+        """Write everything pending and stop the background thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+        stats = self.get_stats()
+        logging.info("Save queue closed: %(queued)s queued, %(flushed)s flushed in %(writes)s writes, "
+                     "%(duplicates)s duplicates", stats)
+        if stats['pending']:
+            logging.error("Save queue closed with %s items that could not be saved", stats['pending'])
+
+    # Background Writer
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._deadline is not None:
+                        remaining = self._deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+                batch = self._take()
+            self._write(batch)
+
+    def _take(self):
+        """Remove and return the pending saves; caller holds the condition"""
+        batch = self._pending
+        self._pending = []
+        self._writing = self._writing + batch
+        self._deadline = None
+        return batch
+
+    def _write(self, batch):
+        """Save a batch with one write per class
+
+        Items that fail to save are queued again and retried after a
+        backoff delay.
+        """
+        if not batch:
+            return
+        by_class = {}
+        for class_name, item_data, slot in batch:
+            by_class.setdefault(class_name, []).append((item_data, slot))
+
+        with self._write_lock:
+            for class_name, items in by_class.items():
+                result = self.data_manager.save_gear_items(class_name, items)
+                with self._condition:
+                    if result is None:
+                        self._requeue_locked(class_name, items)
+                        continue
+                    self._failures = 0
+                    self.stats['flushed'] += len(result['saved'])
+                    self.stats['duplicates'] += len(result['duplicates'])
+                    self.stats['writes'] += 1
+                logging.info("Save queue wrote %s items for %s (%s duplicates skipped)",
+                             len(result['saved']), class_name, len(result['duplicates']))
+        written = {id(save) for save in batch}
+        with self._condition:
+            self._writing = [save for save in self._writing if id(save) not in written]
+
+    def _requeue_locked(self, class_name, items):
+        """Put a failed write back in front of the queue and schedule its retry"""
+        self.stats['failed'] += len(items)
+        self._pending[:0] = [(class_name, item_data, slot) for item_data, slot in items]
+        self._failures += 1
+        delay = min(self.window * 2 ** self._failures, self.retry_max)
+        self._deadline = time.monotonic() + delay
+        self._condition.notify()
+        logging.error("Save queue could not write %s items for %s; retrying in %.1fs",
+                      len(items), class_name, delay)
+        if self._failures == self.failures_reported:
+            self.errors.put((class_name, [item_data.get('Name') for item_data, _ in items]))
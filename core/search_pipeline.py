@@ -0,0 +1,194 @@
+# core/search_pipeline.py
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import SEARCH_WORKERS
+from utils.decorators import debug_log
+
+
+class SearchTask:
+    """Handle for a single submitted search"""
+
+    def __init__(self, task_id, item_name, stale_stats=None):
+        self.task_id = task_id
+        self.item_name = item_name
+        self.stale_stats = stale_stats
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Mark the search as superseded so no further events are published"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+
+class SearchPipeline:
+    """Runs the search -> item -> spell fetch chain off the UI thread
+
+    Workers never touch Tk widgets. Each step publishes a
+    (task, kind, payload) tuple on ``events`` which the UI drains with
+    ``root.after``. Event kinds are 'partial', 'found', 'revalidated',
+    'similar', 'failed' and 'error'.
+    """
+
+    def __init__(self, item_parser, web_utils, max_workers=SEARCH_WORKERS):
+        logging.debug("Initializing SearchPipeline")
+        self.item_parser = item_parser
+        self.web_utils = web_utils
+        self.events = queue.Queue()
+        self.current_task = None
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='search'
+        )
+        logging.debug(f"SearchPipeline initialized with {max_workers} workers")
+
+    # Task Management Methods
+    @debug_log
+    def submit(self, item_name, stale_stats=None):
+        """Start a background search, cancelling any search it supersedes
+
+        When expired cached stats are given, their item page is revalidated
+        instead of repeating the search.
+        """
+        with self._lock:
+            if self.current_task:
+                logging.debug(f"Cancelling superseded search: {self.current_task.item_name}")
+                self.current_task.cancel()
+            self._next_id += 1
+            task = SearchTask(self._next_id, item_name, stale_stats)
+            self.current_task = task
+
+        logging.debug(f"Submitting search #{task.task_id} for: {item_name}")
+        self._executor.submit(self._run, task)
+        return task
+
+    @debug_log
+    def cancel(self):
+        """Cancel the current search, if any"""
+        with self._lock:
+            if self.current_task:
+                logging.debug(f"Cancelling search: {self.current_task.item_name}")
+                self.current_task.cancel()
+                self.current_task = None
+
+    def shutdown(self):
+        """Cancel outstanding work and stop the worker threads"""
+        try:
+            logging.debug("Shutting down SearchPipeline")
+            self.cancel()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        except Exception as e:
+            logging.error(f"Error shutting down search pipeline: {e}", exc_info=True)
+
+    # Lookup Methods
+    @debug_log
+    def lookup(self, item_name, task=None, emit=None):
+        """Resolve an item by name through the search, item and spell pages
+
+        Safe to call from any thread. Partial stats are reported through
+        ``emit('partial', stats)`` while effects are still being resolved.
+
+        Returns:
+            dict: Result with a 'status' of 'found', 'similar', 'failed'
+                or 'cancelled' plus the matching payload keys
+        """
+        def cancelled():
+            return task is not None and task.cancelled
+
+        search_url = self.web_utils.format_search_url(item_name)
+        logging.debug(f"Formatted search URL: {search_url}")
+        html_content = self.web_utils.get_page_content(search_url)
+        logging.debug("Retrieved search page content")
+        if cancelled():
+            return {'status': 'cancelled', 'item_name': item_name}
+
+        item_id = self.item_parser.extract_item_id(html_content, item_name)
+        if not item_id:
+            logging.warning(f"No exact item match found for: {item_name}")
+            similar_items = self.item_parser.process_similar_items(html_content)
+            return {'status': 'similar', 'item_name': item_name, 'similar_items': similar_items}
+
+        logging.debug(f"Found item ID: {item_id}")
+        item_url = self.web_utils.format_item_url(item_id)
+        html_content = self.web_utils.get_page_content(item_url, track_validators=True)
+        logging.debug("Retrieved item page content")
+        return self._parse_item_page(item_name, item_id, item_url, html_content, task, emit)
+
+    @debug_log
+    def revalidate(self, item_name, stale_stats, task=None, emit=None):
+        """Re-check an expired item's page, parsing it again only if it changed
+
+        Returns:
+            dict: 'revalidated' with the stale stats when the page is
+                unchanged, otherwise the same result as ``lookup``
+        """
+        item_id = stale_stats.get('ID')
+        item_url = stale_stats.get('URL')
+        if not item_id or not item_url:
+            logging.debug(f"No item page recorded for {item_name}, searching again")
+            return self.lookup(item_name, task, emit)
+
+        html_content = self.web_utils.get_page_if_modified(item_url)
+        if html_content is None:
+            logging.debug(f"Item page unchanged for: {item_name}")
+            return {'status': 'revalidated', 'item_name': item_name, 'stats': stale_stats}
+
+        logging.debug(f"Item page changed for: {item_name}, reparsing")
+        return self._parse_item_page(item_name, item_id, item_url, html_content, task, emit)
+
+    def _parse_item_page(self, item_name, item_id, item_url, html_content, task, emit):
+        """Extract stats from an item page, reporting partial progress"""
+        def cancelled():
+            return task is not None and task.cancelled
+
+        if cancelled():
+            return {'status': 'cancelled', 'item_name': item_name}
+
+        def on_progress(partial_stats):
+            if cancelled():
+                return False
+            if emit:
+                partial_stats['ID'] = item_id
+                partial_stats['URL'] = item_url
+                emit('partial', {'item_name': item_name, 'stats': partial_stats})
+            return True
+
+        stats = self.item_parser.extract_item_stats(html_content, on_progress)
+        if cancelled():
+            return {'status': 'cancelled', 'item_name': item_name}
+        if not stats:
+            logging.error("Failed to extract item stats")
+            return {'status': 'failed', 'item_name': item_name}
+
+        stats['ID'] = item_id
+        stats['URL'] = item_url
+        logging.debug(f"Successfully extracted stats for item: {item_name}")
+        return {'status': 'found', 'item_name': item_name, 'stats': stats}
+
+    # Worker Methods
+    def _run(self, task):
+        """Worker entry point for a submitted search"""
+        try:
+            emit = lambda kind, payload: self._emit(task, kind, payload)
+            if task.stale_stats:
+                result = self.revalidate(task.item_name, task.stale_stats, task, emit)
+            else:
+                result = self.lookup(task.item_name, task, emit)
+            self._emit(task, result['status'], result)
+        except Exception as e:
+            logging.error(f"Search failed for {task.item_name}: {e}", exc_info=True)
+            self._emit(task, 'error', e)
+
+    def _emit(self, task, kind, payload):
+        """Publish an event unless the task has been superseded"""
+        if task.cancelled or kind == 'cancelled':
+            logging.debug(f"Dropping '{kind}' event from cancelled search #{task.task_id}")
+            return
+        self.events.put((task, kind, payload))
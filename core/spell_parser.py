@@ -2,15 +2,28 @@
 from utils.web import WebUtils
 import logging
 import re
-from bs4 import BeautifulSoup
+import threading
 import lxml
 import lxml.etree
 from utils.decorators import debug_log
+from utils.lazy_import import lazy_import
+
+bs4 = lazy_import('bs4')
 
 class SpellParser:
-    def __init__(self):
+    def __init__(self, spell_cache=None):
+        """Initialize spell parser
+
+        Args:
+            spell_cache: Optional CacheManager consulted by spell ID before
+                any spell page is fetched
+        """
         logging.debug("Initializing SpellParser")
         self.web_utils = WebUtils()
+        self.spell_cache = spell_cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._counter_lock = threading.Lock()
         self.debug_var = None
         logging.debug("SpellParser initialization complete")
 
@@ -25,19 +38,23 @@ class SpellParser:
                 response = self.web_utils.get_page_content(search_url)
                 spell_id = self.extract_spell_id(response, spell_name)
                 if not spell_id:
-                    logging.warning(f"No spell ID found for: {spell_name}")
+                    logging.warning("No spell ID found for: %s", spell_name)
                     return None
 
+            cached_details = self.get_cached_spell(spell_id)
+            if cached_details:
+                return cached_details
+
             spell_url = self.web_utils.format_spell_details_url(spell_id)
             response = self.web_utils.get_page_content(spell_url)
-            logging.debug(f"Retrieved spell page for ID: {spell_id}")
+            logging.debug("Retrieved spell page for ID: %s", spell_id)
             
             try:
-                soup = BeautifulSoup(response, 'lxml')
+                soup = bs4.BeautifulSoup(response, 'lxml')
                 logging.debug("Successfully parsed HTML with lxml")
             except lxml.etree.ParserError as e:
-                logging.error(f"LXML parsing error: {e}", exc_info=True)
-                soup = BeautifulSoup(response, 'html.parser')
+                logging.error("LXML parsing error: %s", e, exc_info=True)
+                soup = bs4.BeautifulSoup(response, 'html.parser')
 
             spell_details = {
                 'name': spell_name,
@@ -67,7 +84,7 @@ class SpellParser:
                                     # Format with effect number
                                     formatted_effect = f"{effect_num.group(1)}: {effect_text}"
                                     spell_details['effects'].append(formatted_effect)
-                                    logging.debug(f"Found effect: {formatted_effect}")
+                                    logging.debug("Found effect: %s", formatted_effect)
                     elif current and current.name == 'table':
                         break
 
@@ -78,7 +95,7 @@ class SpellParser:
                 charges_match = re.search(r'Charges:\s*(\w+)', charges_text)
                 if charges_match:
                     spell_details['charges'] = charges_match.group(1)
-                    logging.debug(f"Found charges: {charges_match.group(1)}")
+                    logging.debug("Found charges: %s", charges_match.group(1))
 
             # Look for cast time
             cast_td = soup.find('td', string=lambda x: x and 'Cast Time:' in x)
@@ -87,12 +104,17 @@ class SpellParser:
                 cast_match = re.search(r'Cast Time:\s*([\d.]+\s*\w+)', cast_text)
                 if cast_match:
                     spell_details['cast_time'] = cast_match.group(1)
-                    logging.debug(f"Found cast time: {cast_match.group(1)}")
+                    logging.debug("Found cast time: %s", cast_match.group(1))
+
+            if self.spell_cache is not None:
+                self.spell_cache.set(str(spell_id), spell_details)
+                logging.debug("Cached spell details for ID: %s", spell_id)
 
-            return spell_details
+            # Callers add item-specific details, so never hand out the cached dict
+            return dict(spell_details)
 
         except Exception as e:
-            logging.error(f"Error extracting spell details: {e}", exc_info=True)
+            logging.error("Error extracting spell details: %s", e, exc_info=True)
             return None
 
     # HTML Parsing Methods
@@ -100,17 +122,17 @@ class SpellParser:
     def extract_spell_id(self, html_content, spell_name):
         """Extract spell ID from the search results page"""
         try:
-            logging.debug(f"Attempting to extract spell ID for: {spell_name}")
+            logging.debug("Attempting to extract spell ID for: %s", spell_name)
             try:
-                soup = BeautifulSoup(html_content, 'lxml')
+                soup = bs4.BeautifulSoup(html_content, 'lxml')
                 logging.debug("Successfully parsed HTML with lxml")
             except lxml.etree.ParserError as e:
-                logging.error(f"LXML parsing error in extract_spell_id: {e}", exc_info=True)
+                logging.error("LXML parsing error in extract_spell_id: %s", e, exc_info=True)
                 logging.debug("Falling back to html.parser")
-                soup = BeautifulSoup(html_content, 'html.parser')
+                soup = bs4.BeautifulSoup(html_content, 'html.parser')
             
             tables = soup.find_all('table')
-            logging.debug(f"Found {len(tables)} tables")
+            logging.debug("Found %s tables", len(tables))
             
             # Look for exact match first
             logging.debug("Searching for exact spell name match")
@@ -123,7 +145,7 @@ class SpellParser:
                         if link and cell_text.lower() == spell_name.lower():
                             spell_id = re.search(r'id=(\d+)', link['href'])
                             if spell_id:
-                                logging.debug(f"Found exact match spell ID: {spell_id.group(1)}")
+                                logging.debug("Found exact match spell ID: %s", spell_id.group(1))
                                 return spell_id.group(1)
                 
             # If no exact match, look for partial match
@@ -137,14 +159,14 @@ class SpellParser:
                         if link and spell_name.lower() in cell_text.lower():
                             spell_id = re.search(r'id=(\d+)', link['href'])
                             if spell_id:
-                                logging.debug(f"Found partial match spell ID: {spell_id.group(1)}")
+                                logging.debug("Found partial match spell ID: %s", spell_id.group(1))
                                 return spell_id.group(1)
             
-            logging.warning(f"No spell ID found for: {spell_name}")
+            logging.warning("No spell ID found for: %s", spell_name)
             return None
             
         except Exception as e:
-            logging.error(f"Error extracting spell ID: {e}", exc_info=True)
+            logging.error("Error extracting spell ID: %s", e, exc_info=True)
             return None
 
     @debug_log
@@ -155,7 +177,7 @@ class SpellParser:
             basic_info = {}
             
             rows = info_section.find_all('tr')
-            logging.debug(f"Found {len(rows)} rows in info section")
+            logging.debug("Found %s rows in info section", len(rows))
             
             for row in rows:
                 cells = row.find_all('td')
@@ -163,13 +185,13 @@ class SpellParser:
                     key = cells[0].text.strip().rstrip(':')
                     value = cells[1].text.strip()
                     basic_info[key] = value
-                    logging.debug(f"Extracted {key}: {value}")
+                    logging.debug("Extracted %s: %s", key, value)
                     
-            logging.debug(f"Completed basic info extraction with {len(basic_info)} fields")
+            logging.debug("Completed basic info extraction with %s fields", len(basic_info))
             return basic_info
             
         except Exception as e:
-            logging.error(f"Error extracting basic spell info: {e}", exc_info=True)
+            logging.error("Error extracting basic spell info: %s", e, exc_info=True)
             return {}
         
     # Effect Processing Methods
@@ -196,13 +218,13 @@ class SpellParser:
                                 if effect_num:
                                     formatted_effect = f"{effect_num.group(1)}: {effect_text}"
                                     effects.append(formatted_effect)
-                                    logging.debug(f"Found effect: {formatted_effect}")
+                                    logging.debug("Found effect: %s", formatted_effect)
                     elif current and current.name == 'table':
                         break
                         
             return effects
         except Exception as e:
-            logging.error(f"Error processing spell effects: {e}", exc_info=True)
+            logging.error("Error processing spell effects: %s", e, exc_info=True)
             return []
 
     # Display Formatting Methods
@@ -232,11 +254,44 @@ class SpellParser:
             if 'charges' in effect_details:
                 additional_details += f"\nCharges: {effect_details['charges']}"
                 
-            logging.debug(f"Formatted effect display for: {display_name}")
+            logging.debug("Formatted effect display for: %s", display_name)
             return display_name, additional_details
                 
         except Exception as e:
-            logging.error(f"Error formatting effect display: {e}", exc_info=True)
+            logging.error("Error formatting effect display: %s", e, exc_info=True)
             return "Error formatting effect", ""
 
     # Cache Management Methods
+    @debug_log
+    def get_cached_spell(self, spell_id):
+        """Return a copy of cached spell details and update hit/miss counters"""
+        if self.spell_cache is None:
+            return None
+
+        cached_details = self.spell_cache.get(str(spell_id))
+        with self._counter_lock:
+            if cached_details:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+        if cached_details:
+            logging.debug("Spell cache hit for ID: %s", spell_id)
+            return dict(cached_details)
+        logging.debug("Spell cache miss for ID: %s", spell_id)
+        return None
+
+    def get_cache_counters(self):
+        """Get spell cache hit/miss counters
+
+        Returns:
+            dict: hits (network fetches saved), misses and hit_rate
+        """
+        with self._counter_lock:
+            hits, misses = self.cache_hits, self.cache_misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,158 @@
+# core/spell_table.py
+import ast
+import json
+import logging
+import os
+import threading
+
+from config.constraints import STAT_CATEGORIES
+from config.settings import SPELL_TABLE_FILE
+
+# Saved item columns holding effect details: a spell ID referencing the spell table
+DETAILS_COLUMNS = [f"{effect}_DETAILS" for effect in STAT_CATEGORIES['effects']]
+# Effect details that come from the item page rather than the spell, kept per item
+ITEM_EFFECT_FIELDS = {'cast_time': 'CAST_TIME', 'charges': 'CHARGES'}
+# Effect details that are the same on every item carrying the spell
+SPELL_FIELDS = ('id', 'name', 'url', 'effects')
+
+
+def spell_table_filename(csv_filename):
+    """Spell table shared by the class CSVs in a CSV's directory"""
+    return os.path.join(os.path.dirname(csv_filename), SPELL_TABLE_FILE)
+
+
+def parse_details(value):
+    """Effect details from a saved cell: a dict, or the repr of one saved by older versions
+
+    Returns:
+        dict or None: None for empty cells and spell ID references
+    """
+    if isinstance(value, dict):
+        return value
+    if not isinstance(value, str) or not value.strip().startswith('{'):
+        return None
+    try:
+        details = ast.literal_eval(value.strip())
+    except (ValueError, SyntaxError) as e:
+        logging.error(f"Unreadable effect details {value[:60]!r}: {e}")
+        return None
+    return details if isinstance(details, dict) else None
+
+
+def normalize_effects(item_data):
+    """Replace an item's effect details with references to its spells
+
+    Each *_DETAILS value becomes the spell's ID; cast time and charges,
+    which belong to the item, move to *_CAST_TIME and *_CHARGES. Values
+    that are already references are left alone.
+
+    Returns:
+        tuple: (item dict with references, list of spell records)
+    """
+    row = dict(item_data)
+    spells = []
+    for column in DETAILS_COLUMNS:
+        details = parse_details(row.get(column))
+        if details is None:
+            continue
+        effect = column[:-len('_DETAILS')]
+        for field, suffix in ITEM_EFFECT_FIELDS.items():
+            if details.get(field) and not row.get(f"{effect}_{suffix}"):
+                row[f"{effect}_{suffix}"] = details[field]
+        spell = {field: details[field] for field in SPELL_FIELDS if details.get(field) is not None}
+        if not spell.get('id'):
+            # Details without a spell ID cannot be referenced; keep the name only
+            logging.warning(f"No spell ID for {effect} of {row.get('Name')}")
+            row[column] = ''
+            continue
+        spell['id'] = str(spell['id']).strip()
+        spell.setdefault('effects', [])
+        row[column] = spell['id']
+        spells.append(spell)
+    return row, spells
+
+
+def resolve_effect(row, effect, spells):
+    """Details of one effect of a saved row, joined from a spell map
+
+    Args:
+        row: Saved item row (dict or pandas Series)
+        effect (str): Effect column, e.g. 'FOCUS EFFECT'
+        spells (dict): spell ID -> spell record
+
+    Returns:
+        dict or None: name, id, url, effects and the item's cast time and charges
+    """
+    reference = row.get(f"{effect}_DETAILS")
+    if not isinstance(reference, str) or not reference.strip():
+        return None
+    spell = spells.get(reference.strip())
+    if spell is None:
+        return None
+    details = dict(spell)
+    for field, suffix in ITEM_EFFECT_FIELDS.items():
+        value = row.get(f"{effect}_{suffix}")
+        if isinstance(value, str) and value.strip():
+            details[field] = value.strip()
+    return details
+
+
+class SpellTable:
+    """Effect spells of saved gear, stored once per spell ID
+
+    The table is an append-only log of JSON lines next to the class CSVs,
+    one record per spell (id, name, url, effects). A spell whose details
+    changed on the site is appended again and the last record wins when
+    the log is read.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.spells = {}  # spell ID -> spell record
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.filename):
+            return
+        valid_bytes = 0
+        with open(self.filename, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("incomplete record")
+                    spell = json.loads(line)
+                except ValueError:
+                    logging.warning(f"Dropping partial record at byte {valid_bytes} of {self.filename}")
+                    break
+                valid_bytes += len(line)
+                if not isinstance(spell, dict) or not spell.get('id'):
+                    logging.warning(f"Skipping spell record without an ID in {self.filename}")
+                    continue
+                self.spells[spell['id']] = spell
+
+        # Cut a torn tail so the next append starts on a fresh line
+        if valid_bytes < os.path.getsize(self.filename):
+            with open(self.filename, 'r+b') as f:
+                f.truncate(valid_bytes)
+        logging.debug(f"Loaded {len(self.spells)} spells from {self.filename}")
+
+    def get(self, spell_id):
+        return self.spells.get(spell_id)
+
+    def __len__(self):
+        return len(self.spells)
+
+    def add(self, spells):
+        """Record spells that are new or changed; returns how many were written"""
+        with self._lock:
+            new_spells = [spell for spell in spells if self.spells.get(spell['id']) != spell]
+            new_spells = list({spell['id']: spell for spell in new_spells}.values())
+            if not new_spells:
+                return 0
+            with open(self.filename, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(spell) + '\n' for spell in new_spells)
+            for spell in new_spells:
+                self.spells[spell['id']] = spell
+        logging.debug(f"Added {len(new_spells)} spells to {self.filename}")
+        return len(new_spells)
@@ -0,0 +1,223 @@
+# core/stat_scanner.py
+import logging
+import re
+import threading
+import time
+
+from utils.decorators import debug_log
+
+
+class StatRule:
+    """One stat pattern in the fused scanner
+
+    ``handler`` receives the rule's own groups and returns (key, value)
+    pairs. With ``first_only`` a key keeps the first value found on the
+    page; otherwise later matches overwrite earlier ones.
+    """
+
+    def __init__(self, name, pattern, handler, first_only=False):
+        self.name = name
+        self.pattern = pattern
+        self.handler = handler
+        self.first_only = first_only
+        self.regex = re.compile(pattern, re.IGNORECASE)
+
+
+class StatScanner:
+    """Finds every item stat in one linear pass over the page text
+
+    All rules are fused into a single alternation; ``match.lastgroup``
+    says which rule fired. Rules are listed so that, where two could
+    match at the same spot, the more specific one comes first. Because
+    matches never overlap, text like "Double Attack: 5" or
+    "Make Poison: 5" is no longer also read as ATTACK or POISON.
+
+    Scan time and per-rule match counts/handler time are accumulated for
+    ``get_timings``; ``profile`` times each rule's regex on its own.
+    """
+
+    def __init__(self, normalize_stat_name, clean_stat_value):
+        self.normalize = normalize_stat_name
+        self.clean = clean_stat_value
+        self.rules = self._build_rules()
+
+        # Wrap each rule in a named group; its own groups follow that group
+        parts = []
+        self._group_ranges = {}
+        group_index = 0
+        for rule in self.rules:
+            group_name = f"rule_{rule.name}"
+            parts.append(f"(?P<{group_name}>{rule.pattern})")
+            first = group_index + 2
+            group_index += 1 + rule.regex.groups
+            self._group_ranges[group_name] = (rule, first, group_index + 1)
+        self.regex = re.compile('|'.join(parts), re.IGNORECASE)
+
+        self._timings_lock = threading.Lock()
+        self.reset_timings()
+
+    def _build_rules(self):
+        """Stat rules in priority order"""
+        normalize = self.normalize
+        clean = self.clean
+
+        def named(groups, value_index=1):
+            return [(normalize(groups[0]), clean(groups[value_index]))]
+
+        def upper(groups):
+            return [(groups[0].upper(), groups[1])]
+
+        def heroic(groups):
+            name, base, bonus = groups
+            return [(normalize(name), f"{base} +{bonus}" if bonus else base)]
+
+        def skill_modifier(groups):
+            name = groups[0].upper()
+            return [("BACKSTAB_MOD" if name == "BACKSTAB" else name, f"{groups[1]}%")]
+
+        def bard_skill(groups):
+            name = groups[0].upper().replace("UNKNOWN (50)", "SINGING RESONANCE")
+            return [(f"BARD_{name}", f"{groups[1]}%")]
+
+        def additional(groups):
+            name = re.sub(r'EFFECT\s+EFFECT', 'EFFECT', normalize(groups[0]))
+            return [(name, clean(groups[1]))]
+
+        return [
+            StatRule('type', r'Type:\s*([a-zA-Z0-9\s]+?(?=\s*[A-Z]$|Armor))',
+                     lambda groups: [('Type', groups[0])], first_only=True),
+            StatRule('aug_slot', r'Slot\s+(\d+):\s*Type\s+(\d+)',
+                     lambda groups: [(f'SLOT {groups[0]}', f'Type {groups[1]}')]),
+            StatRule('basic', r'(Armor Class|Health|Mana|Endurance):\s*([-]?\d+)',
+                     named, first_only=True),
+            StatRule('skill_damage',
+                     r'(Bash|Kick|Flying Kick|Backstab|Dragon Punch|Eagle Strike|Round Kick|'
+                     r'Tiger Claw|Frenzy) Damage:\s*(\d+)',
+                     lambda groups: [(f"{groups[0].upper()} DAMAGE", groups[1])], first_only=True),
+            StatRule('skill_modifier',
+                     r'Skill Modifier:\s*'
+                     r'(Backstab|Dragon Punch|Eagle Strike|Flying Kick|Kick|Round Kick|'
+                     r'Tiger Claw|Frenzy|Safe Fall|Pick Lock|Begging|Sneak|Intimidation|'
+                     r'Forage|Tracking)\s*\((\d+)%\)',
+                     skill_modifier),
+            StatRule('bard_skill',
+                     r'Bard Skill:\s*'
+                     r'(Brass Instruments|Strings Instruments|Percussion Instruments|'
+                     r'Wind Instruments|Unknown \(50\)|All Instruments)\s*\((\d+)%\)',
+                     bard_skill),
+            StatRule('specialization',
+                     r'(Specialize (?:Alteration|Conjuration|Abjuration|Evocation|Divination)):\s*(\d+)',
+                     upper),
+            StatRule('tradeskill',
+                     r'(Alchemy|Baking|Blacksmithing|Brewing|Fishing|Fletching|Jewelry Making|'
+                     r'Make Poison|Pottery|Research|Tailoring|Tinkering):\s*(\d+)',
+                     upper),
+            StatRule('attribute',
+                     r'(Strength|Stamina|Agility|Dexterity|Wisdom|Intelligence|Charisma):'
+                     r'\s*([-]?\d+)(?:\s*\+(\d+))?',
+                     heroic),
+            StatRule('resist',
+                     r'(Poison|Magic|Disease|Fire|Cold|Corrupt(?:ion)?):\s*([-]?\d+)(?:\s*\+(\d+))?',
+                     heroic),
+            StatRule('damage_shield', r'(Damage\s+Shield(?:\s+Mitig)?)\s*:\s*([-+]?\d+)', additional),
+            StatRule('damage', r'(?<!\w\s)(Damage)(?!\s+\w):\s*([-+]?\d+)', additional),
+            StatRule('weapon', r'(Backstab|Delay|Bonus|Range):\s*([-+]?\d+)', additional),
+            StatRule('regeneration', r'(HP Regen|Mana Regen|Endurance Regen|Meditate):\s*([-+]?\d+)',
+                     additional),
+            StatRule('combat_ability', r'(Dodge|Parry|Riposte|Triple Attack|Double Attack):\s*([-+]?\d+)',
+                     additional),
+            StatRule('offensive', r'(Attack|Haste|Accuracy|Strikethrough):\s*([-+]?\d+)', additional),
+            StatRule('magic', r'(Spell Damage|Combat Effects):\s*([-+]?\d+)', additional),
+            StatRule('defensive',
+                     r'(Avoidance|Shielding|Spell Shielding|DoT Shielding|Damage Shield Mitig|'
+                     r'Defense|Stun Resist):\s*([-+]?\d+)',
+                     additional),
+            StatRule('weapon_skill',
+                     r'(Hand to Hand|1H Blunt|1H Slashing|2H Blunt|2H Slashing|1H Piercing|'
+                     r'2H Piercing|Throwing):\s*([-+]?\d+)',
+                     additional),
+            StatRule('magic_skill',
+                     r'(Channeling|Abjuration|Conjuration|Divination|Evocation|Alteration):\s*(\d+)',
+                     upper),
+        ]
+
+    # Scanning Methods
+    @debug_log
+    def scan(self, item_details, stats):
+        """Add every stat found in the item text to ``stats``"""
+        start = time.perf_counter()
+        matches = {}
+        handler_seconds = {}
+        first_only_keys = set()
+
+        for match in self.regex.finditer(item_details):
+            rule, first, last = self._group_ranges[match.lastgroup]
+            handler_start = time.perf_counter()
+            try:
+                pairs = rule.handler(match.group(*range(first, last)) if last - first > 1
+                                     else (match.group(first),))
+            except Exception as e:
+                logging.error("Error handling %s stat '%s': %s", rule.name, match.group(), e, exc_info=True)
+                continue
+            for key, value in pairs:
+                if rule.first_only:
+                    if key in first_only_keys:
+                        continue
+                    first_only_keys.add(key)
+                stats[key] = value
+            matches[rule.name] = matches.get(rule.name, 0) + 1
+            handler_seconds[rule.name] = (handler_seconds.get(rule.name, 0.0)
+                                          + time.perf_counter() - handler_start)
+
+        elapsed = time.perf_counter() - start
+        with self._timings_lock:
+            self._scan_count += 1
+            self._scan_seconds += elapsed
+            for name, count in matches.items():
+                rule_timing = self._rule_timings[name]
+                rule_timing['matches'] += count
+                rule_timing['handler_seconds'] += handler_seconds[name]
+        logging.debug("Stat scan found %s stats in %.2fms", sum(matches.values()), elapsed * 1000)
+        return stats
+
+    # Timing Methods
+    def reset_timings(self):
+        """Clear accumulated scan timings"""
+        with self._timings_lock:
+            self._scan_count = 0
+            self._scan_seconds = 0.0
+            self._rule_timings = {rule.name: {'matches': 0, 'handler_seconds': 0.0}
+                                  for rule in self.rules}
+
+    def get_timings(self):
+        """Get accumulated scan timings
+
+        Returns:
+            dict: scans, scan_seconds and per-rule matches/handler_seconds
+        """
+        with self._timings_lock:
+            return {
+                'scans': self._scan_count,
+                'scan_seconds': self._scan_seconds,
+                'rules': {name: dict(timing) for name, timing in self._rule_timings.items()}
+            }
+
+    def profile(self, item_details, repeat=1):
+        """Time the fused scan and each rule's regex on its own over the same text
+
+        Returns:
+            dict: fused seconds plus seconds and matches per rule
+        """
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for _ in self.regex.finditer(item_details):
+                pass
+        fused_seconds = time.perf_counter() - start
+
+        rules = {}
+        for rule in self.rules:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                matches = sum(1 for _ in rule.regex.finditer(item_details))
+            rules[rule.name] = {'seconds': time.perf_counter() - start, 'matches': matches}
+        return {'fused_seconds': fused_seconds, 'rules': rules}
@@ -0,0 +1,2 @@
+# lazgearcompare/__init__.py
+# Headless entry points; nothing here may import tkinter or customtkinter
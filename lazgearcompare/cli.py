@@ -0,0 +1,253 @@
+# lazgearcompare/cli.py
+"""Headless command line for scripts and servers
+
+    python -m lazgearcompare.cli lookup "Item Name" [...]
+    python -m lazgearcompare.cli batch gear.txt --class "Shadow Knight"
+    python -m lazgearcompare.cli export --class "Shadow Knight" [--format json]
+    python -m lazgearcompare.cli import-csv --class "Shadow Knight"
+    python -m lazgearcompare.cli --replay cassettes/ --error-rate 0.1 lookup "Item Name"
+
+Only core, utils and config are imported, never tkinter, customtkinter
+or the ui package, so this runs on machines without a display.
+"""
+import argparse
+import json
+import logging
+import sys
+from contextlib import nullcontext
+
+from config.constraints import CLASSES, SLOTS
+from core.batch import BatchEntry, BatchLookup, format_summary, parse_gear_list, save_batch
+from core.data_manager import DataManager
+from core.search_pipeline import SearchPipeline
+from utils.cassette import Cassette, ReplayPolicy, ReplayServer, ERROR_MODES
+from utils.decorators import debug_log, set_debug_mode
+from utils.logging_config import setup_logging
+from utils.web import WebUtils
+
+# Modules that must never be imported by the headless entry point
+GUI_MODULES = ('tkinter', 'customtkinter', 'CTkMessagebox', 'ui')
+
+
+class HeadlessSession:
+    """Caches, web layer and lookup pipeline shared by the CLI commands"""
+
+    def __init__(self):
+        self.data_manager = DataManager()
+        self.web_utils = WebUtils(validator_cache=self.data_manager.validator_cache_manager)
+        self.search_pipeline = SearchPipeline(self.data_manager.item_parser, self.web_utils)
+        self.batch_lookup = BatchLookup(self.search_pipeline, self.data_manager.cache_manager)
+
+    def close(self):
+        self.search_pipeline.shutdown()
+        self.data_manager.close()
+        WebUtils.close_shared_session()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _read_lines(path):
+    """Read a file, or stdin for '-'"""
+    if path == '-':
+        return sys.stdin.read()
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+# Commands
+@debug_log
+def run_lookup(args):
+    """Print one JSON line per item name: name, status and stats"""
+    names = args.names
+    if names == ['-']:
+        names = [line.strip() for line in sys.stdin if line.strip()]
+    if not names:
+        print("No items to look up", file=sys.stderr)
+        return 1
+
+    # Slots are only needed for saving, which lookup never does
+    entries = [BatchEntry(name) for name in dict.fromkeys(names)]
+    with HeadlessSession() as session:
+        def on_progress(result, done, total):
+            print(json.dumps({
+                'name': result.entry.item_name,
+                'status': result.status,
+                'stats': result.stats,
+                'similar_items': result.similar_items or None,
+                'error': str(result.error) if result.error is not None else None
+            }), flush=True)
+
+        summary = session.batch_lookup.run(entries, on_progress=on_progress)
+
+    logging.info(f"Looked up {len(entries)} items at {summary['items_per_second']:.1f} items/s")
+    return 0 if not summary['failed'] else 1
+
+
+@debug_log
+def run_batch(args):
+    """Resolve a gear list and save it to the class CSV
+
+    Returns:
+        int: 0 when every item was resolved and saved, 1 otherwise
+    """
+    entries, errors = parse_gear_list(_read_lines(args.batch), default_slot=args.slot)
+    for error in errors:
+        print(error, file=sys.stderr)
+    if not entries:
+        print("No items to look up", file=sys.stderr)
+        return 1
+
+    with HeadlessSession() as session:
+        def on_progress(result, done, total):
+            print(f"[{done}/{total}] {result.entry.slot}: {result.entry.item_name} - "
+                  f"{result.status} ({result.seconds:.2f}s)", flush=True)
+
+        summary = session.batch_lookup.run(entries, on_progress=on_progress)
+        saved = (save_batch(session.data_manager, args.class_name, summary['results'])
+                 if summary['resolved'] else None)
+        print(format_summary(summary, saved))
+
+    failed = summary['failed'] or errors or (summary['resolved'] and saved is None)
+    return 1 if failed else 0
+
+
+@debug_log
+def run_export(args):
+    """Write a class's saved gear out as JSON, JSON lines or CSV
+
+    JSON rows carry their effect details inline; a CSV references spells
+    by ID, with the spell table written next to it.
+    """
+    if args.format == 'csv' and not args.output:
+        print("--format csv requires --output", file=sys.stderr)
+        return 1
+    data_manager = DataManager()
+    try:
+        rows = data_manager.load_gear_rows(args.class_name, resolve_effects=args.format != 'csv')
+        if rows is None:
+            print(f"No saved gear for {args.class_name} "
+                  f"({data_manager.gear_location(args.class_name)})", file=sys.stderr)
+            return 1
+        if args.format == 'csv':
+            count = data_manager.export_gear_csv(args.class_name, args.output)
+            logging.info(f"Exported {count} items to {args.output}")
+            return 0
+    finally:
+        data_manager.close()
+
+    rows = [{key: value if isinstance(value, dict) else str(value).strip()
+             for key, value in row.items() if value}
+            for row in rows]
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        if args.format == 'json':
+            json.dump(rows, output, indent=2)
+            output.write('\n')
+        else:
+            for row in rows:
+                output.write(json.dumps(row) + '\n')
+    finally:
+        if args.output:
+            output.close()
+    logging.info(f"Exported {len(rows)} items for {args.class_name}")
+    return 0
+
+
+@debug_log
+def run_import(args):
+    """Copy a class CSV into the gear database"""
+    data_manager = DataManager()
+    try:
+        if data_manager.gear_store is None:
+            print("import-csv needs GEAR_STORE_BACKEND = 'sqlite' in config/settings.py", file=sys.stderr)
+            return 1
+        result = data_manager.import_gear_csv(args.class_name, args.file)
+        print(f"Imported {len(result['saved'])} items into {data_manager.gear_store.db_file}; "
+              f"{len(result['duplicates'])} already present")
+        return 0
+    except FileNotFoundError as e:
+        print(f"Cannot import: {e}", file=sys.stderr)
+        return 1
+    finally:
+        data_manager.close()
+
+
+def configure_cassettes(args):
+    """Apply the --record and --replay options to WebUtils
+
+    Returns:
+        A context manager running the replay server, when one is used
+    """
+    if args.record:
+        WebUtils.set_record_cassette(Cassette(args.record))
+    if not args.replay:
+        return nullcontext()
+
+    policy = ReplayPolicy(args.latency_ms, args.jitter_ms, args.error_rate, args.error_mode, args.seed)
+    cassette = Cassette(args.replay)
+    if not args.replay_server:
+        WebUtils.set_replay(cassette, policy)
+        return nullcontext()
+    server = ReplayServer(cassette, policy).start()
+    WebUtils.set_replay(server_url=server.url)
+    return server
+
+
+def build_parser():
+    """Argument parser for the headless commands"""
+    parser = argparse.ArgumentParser(prog='python -m lazgearcompare.cli',
+                                     description="LazGearCompare without the window")
+    parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    replay_group = parser.add_argument_group('record and replay')
+    replay_group.add_argument('--record', metavar='DIR', help='Save every fetched response to a cassette')
+    replay_group.add_argument('--replay', metavar='DIR', help='Answer requests from a cassette instead of the site')
+    replay_group.add_argument('--replay-server', action='store_true',
+                              help='Replay through a local HTTP server so connection pooling and retries run')
+    replay_group.add_argument('--latency-ms', type=float, default=0.0, help='Replay delay per request')
+    replay_group.add_argument('--jitter-ms', type=float, default=0.0, help='Random extra replay delay')
+    replay_group.add_argument('--error-rate', type=float, default=0.0,
+                              help='Fraction of replayed requests that fail')
+    replay_group.add_argument('--error-mode', choices=ERROR_MODES, default='status',
+                              help='Fail with a 503 or by dropping the connection')
+    replay_group.add_argument('--seed', type=int, help='Seed for replay jitter and errors')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    lookup_parser = subparsers.add_parser('lookup', help='Print item stats as JSON lines')
+    lookup_parser.add_argument('names', nargs='+', help='Item names, or - to read one per line from stdin')
+    lookup_parser.set_defaults(func=run_lookup)
+
+    batch_parser = subparsers.add_parser('batch', help='Look up a gear list and save it to the class CSV')
+    batch_parser.add_argument('batch', metavar='FILE', help='One "Slot: Item Name" per line, - for stdin')
+    batch_parser.add_argument('--class', dest='class_name', choices=CLASSES, required=True)
+    batch_parser.add_argument('--slot', choices=SLOTS, help='Slot for lines that do not name one')
+    batch_parser.set_defaults(func=run_batch)
+
+    export_parser = subparsers.add_parser('export', help="Write a class's saved gear as JSON or CSV")
+    export_parser.add_argument('--class', dest='class_name', choices=CLASSES, required=True)
+    export_parser.add_argument('--format', choices=('jsonl', 'json', 'csv'), default='jsonl')
+    export_parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+    export_parser.set_defaults(func=run_export)
+
+    import_parser = subparsers.add_parser('import-csv', help='Copy a class CSV into the gear database')
+    import_parser.add_argument('--class', dest='class_name', choices=CLASSES, required=True)
+    import_parser.add_argument('file', nargs='?', help='CSV to import (default: the class CSV)')
+    import_parser.set_defaults(func=run_import)
+
+    return parser
+
+
+def main(argv=None):
+    """Run one headless command and return its exit code"""
+    args = build_parser().parse_args(argv)
+    setup_logging(debug_mode=args.debug)
+    set_debug_mode(args.debug)
+    with configure_cassettes(args):
+        return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,63 @@
-import tkinter as tk
-import customtkinter as ctk
+import time
+
+# Taken before any other import so --profile-startup covers all of them
+_STARTED_AT = time.perf_counter()
+
 import logging
 import argparse
+import sys
+import traceback
 
-from CTkMessagebox import CTkMessagebox
-from ui.main_window import MainWindow
 from utils.logging_config import setup_logging
-from utils.decorators import debug_log
+from utils.decorators import debug_log, set_debug_mode
+from utils.startup_profiler import StartupProfiler
+from config.constraints import CLASSES, SLOTS
+from config.settings import STARTUP_BUDGET_MS
 
 
 @debug_log
 def main():
     """Initialize and start the application"""
+    args = None
     try:
         # Set up argument parser
         parser = argparse.ArgumentParser()
         parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+        parser.add_argument('--batch', metavar='FILE',
+                            help='Look up a gear list (one "Slot: Item Name" per line, - for stdin) '
+                                 'and save it to the class CSV without opening the window')
+        parser.add_argument('--class', dest='class_name', choices=CLASSES,
+                            help='Class whose CSV a batch is saved to')
+        parser.add_argument('--slot', choices=SLOTS,
+                            help='Slot for batch lines that do not name one')
+        parser.add_argument('--profile-startup', action='store_true',
+                            help='Report import times and time to first paint, then exit; '
+                                 f'exits 1 if first paint takes over {STARTUP_BUDGET_MS}ms '
+                                 'or a deferred module was imported')
         args = parser.parse_args()
+        if args.batch and not args.class_name:
+            parser.error('--batch requires --class')
+
+        profiler = None
+        if args.profile_startup:
+            profiler = StartupProfiler(start=_STARTED_AT)
+            profiler.install()
 
         # Initialize logging
         setup_logging(debug_mode=args.debug)
+        set_debug_mode(args.debug)
         logging.debug("Logging system initialized")
+
+        if args.batch:
+            from lazgearcompare.cli import run_batch
+            sys.exit(run_batch(args))
+
+        # GUI modules are imported here so --batch never loads them
+        import customtkinter as ctk
+        from ui.main_window import MainWindow
+        from utils.web import WebUtils
+        if profiler:
+            profiler.mark('imports done')
         
         # Create root window with detailed logging
         logging.debug("Starting root window creation")
@@ -41,6 +78,17 @@ def main():
                 if hasattr(app, 'dropdown_checker'):
                     logging.debug("Canceling pending callbacks")
                     root.after_cancel(app.dropdown_checker)
+                if hasattr(app, 'search_pipeline'):
+                    logging.debug("Stopping search pipeline")
+                    app.search_pipeline.shutdown()
+                if hasattr(app, 'save_queue'):
+                    logging.debug("Writing queued saves")
+                    app.save_queue.close()
+                if hasattr(app, 'data_manager'):
+                    logging.debug("Closing caches")
+                    app.data_manager.close()
+                logging.debug("Closing shared HTTP session")
+                WebUtils.close_shared_session()
                 logging.debug("Destroying root window")
                 root.destroy()
             except Exception as e:
@@ -48,6 +96,9 @@ def main():
                 
         root.protocol("WM_DELETE_WINDOW", on_closing)
         logging.debug("Window closing handler setup complete")
+
+        if profiler:
+            sys.exit(report_startup(profiler, root, on_closing))
         
         # Start main loop
         logging.debug("Starting main application loop")
@@ -55,12 +106,45 @@ def main():
         
     except Exception as e:
         logging.error(f"Application startup failed: {e}", exc_info=True)
-        CTkMessagebox(
-            title="Error",
-            message="Application failed to start. Check logs for details.",
-            icon="cancel"
-        )
+        if args is not None and args.batch:
+            # No window in batch mode; report on stderr and fail the command
+            traceback.print_exc(file=sys.stderr)
+            sys.exit(1)
+        try:
+            from CTkMessagebox import CTkMessagebox
+            CTkMessagebox(
+                title="Error",
+                message="Application failed to start. Check logs for details.",
+                icon="cancel"
+            )
+        except Exception:
+            pass
         raise
 
+
+def report_startup(profiler, root, on_closing):
+    """Paint the window, print the startup profile and close the application
+
+    Returns:
+        int: 0 when first paint is within STARTUP_BUDGET_MS and no deferred
+            module was imported before it, 1 otherwise
+    """
+    root.update()
+    profiler.mark('first paint')
+    profiler.uninstall()
+    deferred = profiler.deferred_modules_loaded()
+    print(profiler.report())
+
+    first_paint_ms = profiler.elapsed('first paint') * 1000
+    within_budget = first_paint_ms <= STARTUP_BUDGET_MS
+    print(f"first paint {first_paint_ms:.1f}ms, budget {STARTUP_BUDGET_MS}ms: "
+          f"{'OK' if within_budget else 'OVER BUDGET'}")
+    if deferred:
+        print(f"FAIL: imported before first paint: {', '.join(deferred)}")
+    logging.info(f"Startup profile: first paint in {first_paint_ms:.1f}ms")
+    on_closing()
+    return 0 if within_budget and not deferred else 1
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,278 @@
+import argparse
+import logging
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from core.data_manager import DataManager
+from core.item_parser import ItemParser, PARSER_ENGINES
+from config.settings import PARSER_ENGINE
+from utils.decorators import debug_log, set_debug_mode
+from utils.logging_config import setup_logging
+from utils.page_store import PageStore
+from utils.web import WebUtils
+
+# Stored pages outside a page store are named item_<id>.html / spell_<id>.html
+PAGE_FILENAME_PATTERN = re.compile(r'^(item|spell)_(\d+)\.html?$', re.IGNORECASE)
+REPARSE_CHUNK_SIZE = 16
+
+
+# Page Sources
+class PageStoreSource:
+    """Pages held in a utils.page_store.PageStore directory"""
+
+    def __init__(self, path):
+        self.store = PageStore(path)
+
+    def urls(self):
+        return [(url, record['kind']) for url, record in self.store.entries()]
+
+    def __call__(self, url):
+        return self.store.get(url)
+
+
+class FilenameSource:
+    """Pages named item_<id>.html / spell_<id>.html in a directory or zip"""
+
+    def __init__(self, path):
+        self.path = path
+        self.web_utils = WebUtils()
+        self.is_zip = zipfile.is_zipfile(path)
+        self._zip = None
+        names = (zipfile.ZipFile(path).namelist() if self.is_zip
+                 else os.listdir(path))
+
+        self.pages = {}
+        for name in names:
+            match = PAGE_FILENAME_PATTERN.match(os.path.basename(name))
+            if not match:
+                logging.debug(f"Skipping unrecognised page file: {name}")
+                continue
+            kind, page_id = match.group(1).lower(), match.group(2)
+            url = (self.web_utils.format_item_url(page_id) if kind == 'item'
+                   else self.web_utils.format_spell_details_url(page_id))
+            self.pages[url] = (kind, name)
+
+    def urls(self):
+        return [(url, kind) for url, (kind, _) in self.pages.items()]
+
+    def __call__(self, url):
+        page = self.pages.get(url)
+        if page is None:
+            return None
+        if self.is_zip:
+            # Opened lazily so each worker process gets its own handle
+            if self._zip is None:
+                self._zip = zipfile.ZipFile(self.path)
+            return self._zip.read(page[1]).decode('utf-8', errors='replace')
+        with open(os.path.join(self.path, page[1]), 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+
+
+def open_source(path):
+    """Open a page store, a directory of pages or a zip archive of pages"""
+    if os.path.isdir(path) and os.path.exists(os.path.join(path, 'index.jsonl')):
+        return PageStoreSource(path)
+    if os.path.isdir(path) or zipfile.is_zipfile(path):
+        return FilenameSource(path)
+    raise ValueError(f"Not a page store, directory or zip archive: {path}")
+
+
+# Worker Process
+class _SpellCollector:
+    """In-memory spell cache for a worker that remembers entries to hand back"""
+
+    def __init__(self):
+        self.data = {}
+        self.new = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+        self.new[key] = value
+
+    def drain(self):
+        new, self.new = self.new, {}
+        return new
+
+
+_parser = None
+_spell_collector = None
+
+
+def _init_worker(source_path, engine=PARSER_ENGINE):
+    """Build an offline ItemParser once per worker process"""
+    global _parser, _spell_collector
+    logging.getLogger().setLevel(logging.WARNING)
+    WebUtils.set_offline_source(open_source(source_path))
+    _spell_collector = _SpellCollector()
+    _parser = ItemParser(spell_cache=_spell_collector, engine=engine)
+
+
+def _reparse_item(url):
+    """Parse one stored item page, returning its stats, any new spells and
+    whether the item block had to fall back to the full page"""
+    fallbacks = _parser.get_block_locator_stats()['fallback']
+    try:
+        html_content = _parser.web_utils.get_page_content(url)
+        stats = _parser.extract_item_stats(html_content)
+        if stats:
+            item_id = re.search(r'id=(\d+)', url)
+            stats['ID'] = item_id.group(1) if item_id else None
+            stats['URL'] = url
+    except Exception as e:
+        logging.error(f"Failed to reparse {url}: {e}", exc_info=True)
+        stats = None
+    fell_back = _parser.get_block_locator_stats()['fallback'] > fallbacks
+    return url, stats, _spell_collector.drain(), fell_back
+
+
+def _compare_item(url):
+    """Parse one stored item page with every engine and list differing stats"""
+    scan_seconds = {}
+    results = {}
+    try:
+        html_content = _parser.web_utils.get_page_content(url)
+        for engine in PARSER_ENGINES:
+            _parser.set_engine(engine)
+            start = time.perf_counter()
+            _parser._scan_page(html_content)
+            scan_seconds[engine] = time.perf_counter() - start
+            results[engine] = _parser.extract_item_stats(html_content)
+    except Exception as e:
+        logging.error(f"Failed to compare engines on {url}: {e}", exc_info=True)
+        return url, ['<error>'], scan_seconds
+    finally:
+        _spell_collector.drain()
+
+    baseline = results[PARSER_ENGINES[0]]
+    differences = set()
+    for engine in PARSER_ENGINES[1:]:
+        stats = results[engine]
+        differences.update(key for key in set(baseline) | set(stats)
+                           if baseline.get(key) != stats.get(key))
+    return url, sorted(differences), scan_seconds
+
+
+# Reparse Command
+@debug_log
+def reparse(source_path, workers=None, dry_run=False, engine=PARSER_ENGINE):
+    """Reparse stored item pages in parallel and bulk-load the caches
+
+    Returns:
+        dict: pages, items, spells, failed, block_fallbacks, seconds and
+            pages_per_second
+    """
+    source = open_source(source_path)
+    urls = [url for url, kind in source.urls() if kind == 'item']
+    logging.info(f"Reparsing {len(urls)} item pages from {source_path}")
+
+    items = {}
+    spells = {}
+    failed = 0
+    block_fallbacks = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(source_path, engine)) as executor:
+        for url, stats, new_spells, fell_back in executor.map(_reparse_item, urls,
+                                                              chunksize=REPARSE_CHUNK_SIZE):
+            spells.update(new_spells)
+            block_fallbacks += fell_back
+            if not stats or stats.get('Name') == "Unknown Item":
+                logging.warning(f"No stats extracted from {url}")
+                failed += 1
+                continue
+            items[stats['Name']] = stats
+    elapsed = time.perf_counter() - start
+
+    if not dry_run:
+        data_manager = DataManager()
+        try:
+            data_manager.cache_manager.set_many(items)
+            data_manager.spell_cache_manager.set_many(spells)
+        finally:
+            data_manager.close()
+
+    results = {
+        'pages': len(urls),
+        'items': len(items),
+        'spells': len(spells),
+        'failed': failed,
+        'block_fallbacks': block_fallbacks,
+        'seconds': elapsed,
+        'pages_per_second': len(urls) / elapsed if elapsed else 0.0
+    }
+    logging.info(f"Reparse complete: {results}")
+    return results
+
+
+@debug_log
+def compare_engines(source_path, workers=None):
+    """Check that every parser engine gives the same stats for stored item pages
+
+    Returns:
+        dict: pages, mismatches as (url, differing keys) and total page
+            scan seconds per engine
+    """
+    source = open_source(source_path)
+    urls = [url for url, kind in source.urls() if kind == 'item']
+    logging.info(f"Comparing parser engines on {len(urls)} item pages from {source_path}")
+
+    mismatches = []
+    scan_seconds = dict.fromkeys(PARSER_ENGINES, 0.0)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(source_path,)) as executor:
+        for url, differences, seconds in executor.map(_compare_item, urls, chunksize=REPARSE_CHUNK_SIZE):
+            for engine, elapsed in seconds.items():
+                scan_seconds[engine] += elapsed
+            if differences:
+                logging.warning(f"Engines disagree on {url}: {differences}")
+                mismatches.append((url, differences))
+
+    results = {'pages': len(urls), 'mismatches': mismatches, 'scan_seconds': scan_seconds}
+    logging.info(f"Engine comparison complete: {len(mismatches)} of {len(urls)} pages differ")
+    return results
+
+
+def main():
+    """Parse arguments and run the reparse"""
+    parser = argparse.ArgumentParser(
+        description="Rebuild the item and spell caches from stored Alla pages without fetching"
+    )
+    parser.add_argument('source', help='Page store directory, directory of item_<id>.html / '
+                                       'spell_<id>.html files, or a zip archive of them')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--dry-run', action='store_true', help='Parse without writing the caches')
+    parser.add_argument('--engine', choices=PARSER_ENGINES, default=PARSER_ENGINE,
+                        help='Item page engine used for reparsing')
+    parser.add_argument('--compare-engines', action='store_true',
+                        help='Only check that all engines extract identical stats; exits 1 on any difference')
+    parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    args = parser.parse_args()
+
+    setup_logging(debug_mode=args.debug)
+    set_debug_mode(args.debug)
+    if args.compare_engines:
+        results = compare_engines(args.source, workers=args.workers)
+        for url, differences in results['mismatches']:
+            print(f"MISMATCH {url}: {', '.join(differences)}")
+        timings = ', '.join(f"{engine} {seconds:.2f}s" for engine, seconds in results['scan_seconds'].items())
+        print(f"{results['pages'] - len(results['mismatches'])}/{results['pages']} pages identical "
+              f"across engines (page scan time: {timings})")
+        raise SystemExit(1 if results['mismatches'] else 0)
+
+    results = reparse(args.source, workers=args.workers, dry_run=args.dry_run, engine=args.engine)
+    print(f"Reparsed {results['pages']} item pages in {results['seconds']:.2f}s "
+          f"({results['pages_per_second']:.1f} pages/s)")
+    print(f"Cached {results['items']} items and {results['spells']} spells"
+          f"{' (dry run, caches untouched)' if args.dry_run else ''}; {results['failed']} failed")
+    if results['block_fallbacks']:
+        print(f"Item block not found on {results['block_fallbacks']} pages; the full page was scanned instead")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# tests/test_batch.py
+import os
+import subprocess
+import sys
+
+from core.batch import BatchEntry, BatchLookup, parse_gear_list
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class DictCache:
+    """Item cache holding every item the lookups ask for"""
+
+    def __init__(self, items):
+        self.items = items
+
+    def get(self, key):
+        return self.items.get(key)
+
+    def get_stale(self, key):
+        return None
+
+
+def test_parse_gear_list_reads_slots_and_reports_bad_lines():
+    entries, errors = parse_gear_list("Head: Cap of Flame\n# comment\nBand of Solid Shadows\n"
+                                      "head: cap of flame\nHead:\n", default_slot='Fingers')
+    assert [(entry.slot, entry.item_name) for entry in entries] == [
+        ('Head', 'Cap of Flame'), ('Fingers', 'Band of Solid Shadows')]
+    assert errors == ["Line 4: cap of flame is listed more than once", "Line 5: missing item name"]
+
+
+def test_cached_items_resolve_in_entry_order():
+    cache = DictCache({'Cap of Flame': {'Name': 'Cap of Flame'}, 'Robe': {'Name': 'Robe'}})
+    summary = BatchLookup(None, cache).run([BatchEntry('Robe', 'Chest'), BatchEntry('Cap of Flame', 'Head')])
+    assert [result.entry.item_name for result in summary['results']] == ['Robe', 'Cap of Flame']
+    assert [result.status for result in summary['results']] == ['cached', 'cached']
+
+
+def test_cancel_before_run_is_kept():
+    batch_lookup = BatchLookup(None, DictCache({'Robe': {'Name': 'Robe'}}))
+    batch_lookup.cancel()
+    summary = batch_lookup.run([BatchEntry('Robe', 'Chest')])
+    assert [result.status for result in summary['results']] == ['cancelled']
+    assert summary['resolved'] == 0
+
+
+def test_headless_batch_failure_exits_non_zero_with_traceback(tmp_path):
+    process = subprocess.run(
+        [sys.executable, os.path.join(REPO_ROOT, 'main.py'), '--batch', str(tmp_path / 'missing.txt'),
+         '--class', 'Warrior'],
+        cwd=tmp_path, capture_output=True, text=True, timeout=60
+    )
+    assert process.returncode == 1
+    assert 'FileNotFoundError' in process.stderr
+    assert 'Traceback' in process.stderr
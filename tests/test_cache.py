@@ -0,0 +1,129 @@
+# tests/test_cache.py
+import time
+
+import pytest
+
+import utils.cache
+from utils.cache import CacheManager
+
+# Each entry is 102 bytes; the budget holds two of them
+VALUE = 'x' * 100
+BUDGET_MB = 250 / 1024 / 1024
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(utils.cache.time, 'time', lambda: now[0])
+    return now
+
+
+def make_cache(tmp_path, **options):
+    return CacheManager(str(tmp_path / 'cache.json'), backend='json', sweep_interval=0,
+                        max_size_mb=BUDGET_MB, **options)
+
+
+def test_evicts_least_recently_used_first(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.set('a', VALUE)
+    cache.set('b', VALUE)
+    assert cache.get('a') == VALUE
+    cache.set('c', VALUE)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == VALUE
+    assert cache.get('c') == VALUE
+    assert cache.get_eviction_stats()['evicted'] == 1
+
+
+def test_expired_entries_go_before_fresh_ones_under_pressure(tmp_path, clock):
+    cache = make_cache(tmp_path, cache_duration=10, stale_duration=100)
+    cache.set('stale', VALUE)
+    clock[0] += 4
+    cache.set('fresh', VALUE)
+    clock[0] += 1
+    assert cache.get('stale') == VALUE  # now the most recently used
+    clock[0] += 7
+    cache.set('new', VALUE)
+
+    assert cache.get_stale('stale') is None
+    assert cache.get('fresh') == VALUE
+    assert cache.get('new') == VALUE
+
+
+def test_stale_entries_are_kept_while_under_budget(tmp_path, clock):
+    cache = make_cache(tmp_path, cache_duration=10, stale_duration=100)
+    cache.set('stale', VALUE)
+    clock[0] += 20
+    cache.set('fresh', VALUE)
+
+    assert cache.get('stale') is None
+    assert cache.get_stale('stale') == VALUE
+
+
+def test_touch_keeps_the_size_index_in_step(tmp_path, clock):
+    cache = make_cache(tmp_path, cache_duration=10, stale_duration=100)
+    cache.set('a', VALUE)
+    size_mb, _ = cache.get_item_cache_size()
+    clock[0] += 20
+    assert cache.touch('a')
+    assert cache.get('a') == VALUE
+    assert cache.get_item_cache_size()[0] == size_mb
+
+
+def test_rewritten_key_outlives_its_old_heap_entry(tmp_path, clock):
+    cache = make_cache(tmp_path, cache_duration=10)
+    cache.set('a', VALUE)
+    clock[0] += 8
+    cache.set('a', VALUE)
+    clock[0] += 4
+
+    # The first write's heap pair is past the cutoff, the entry itself is not
+    assert cache.purge_expired() == 0
+    assert cache.get('a') == VALUE
+    assert cache.oldest_timestamp() == 1008.0
+    clock[0] += 10
+    assert cache.purge_expired() == 1
+    assert cache.oldest_timestamp() is None
+
+
+def test_eviction_frees_bytes_not_entries(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    for key in 'abc':
+        cache.set(key, 'x' * 50)
+    cache.set('big', 'x' * 150)
+
+    # 52-byte entries go oldest first until the 152-byte one fits
+    assert [key for key in 'abc' if cache.get(key)] == ['c']
+    assert cache.get('big') == 'x' * 150
+    assert cache.get_item_cache_size()[0] * 1024 * 1024 == 52 + 152
+
+
+def test_purge_keeps_the_stale_window_unless_asked(tmp_path, clock):
+    cache = make_cache(tmp_path, cache_duration=10, stale_duration=100)
+    cache.set('old', VALUE)
+    clock[0] += 50
+    cache.set('stale', VALUE)
+    clock[0] += 70
+
+    assert cache.purge_expired() == 1
+    assert cache.get_stale('old') is None
+    assert cache.get_stale('stale') == VALUE
+    assert cache.purge_expired(keep_stale=False) == 1
+    assert len(cache) == 0
+    assert cache.get_eviction_stats()['expired'] == 2
+
+
+def test_sweeper_purges_in_the_background(tmp_path, clock):
+    cache = CacheManager(str(tmp_path / 'cache.json'), backend='json', cache_duration=10,
+                         sweep_interval=0.01)
+    try:
+        cache.set('a', VALUE)
+        clock[0] += 20
+        deadline = time.monotonic() + 5
+        while len(cache) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(cache) == 0
+    finally:
+        cache.close()
+    assert not cache._sweeper.is_alive()
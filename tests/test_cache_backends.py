@@ -0,0 +1,159 @@
+# tests/test_cache_backends.py
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from utils.cache import CacheManager
+from utils.cache_backends import CacheBackend, JournalCacheBackend, SqliteCacheBackend, create_backend
+
+
+def entry(value, timestamp=1000.0):
+    return {'data': {'value': value}, 'timestamp': timestamp}
+
+
+def test_backend_missing_a_method_fails_when_constructed():
+    class NoFlush(CacheBackend):
+        load = get = put = delete = clear = items = size_bytes = lambda self, *args: None
+
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError, match='flush'):
+        NoFlush('cache.json')
+
+
+@pytest.mark.parametrize('backend', ['json', 'journal', 'sqlite'])
+def test_backends_persist_entries(tmp_path, backend):
+    cache_file = str(tmp_path / 'item_cache.json')
+    store = create_backend(backend, cache_file)
+    store.load()
+    store.put('a', entry(1))
+    store.put_many([('b', entry(2, 2000.0)), ('c', entry(3, 500.0))])
+    store.delete(['b'])
+    store.close()
+
+    reopened = create_backend(backend, cache_file)
+    reopened.load()
+    assert dict(reopened.items()) == {'a': entry(1), 'c': entry(3, 500.0)}
+    assert reopened.oldest_timestamp() == 500.0
+    assert reopened.expired_keys(900.0) == ['c']
+    reopened.close()
+
+
+def test_torn_journal_record_is_dropped_and_truncated(tmp_path):
+    cache_file = str(tmp_path / 'item_cache.json')
+    store = JournalCacheBackend(cache_file)
+    store.load()
+    store.put('a', entry(1))
+    store.delete(['a'])
+    store.put('b', entry(2))
+    # A crash mid-write: no close, and half a record at the end
+    store._close_journal()
+    with open(store.journal_file, 'rb') as f:
+        good = f.read()
+    with open(store.journal_file, 'ab') as f:
+        f.write(b'{"op": "set", "key": "c", "ent')
+
+    reopened = JournalCacheBackend(cache_file)
+    reopened.load()
+    assert reopened.journal_records == 3
+    assert dict(reopened.items()) == {'b': entry(2)}
+    with open(reopened.journal_file, 'rb') as f:
+        assert f.read() == good
+
+    # The next record lands on its own line
+    reopened.put('c', entry(3))
+    reopened._close_journal()
+    again = JournalCacheBackend(cache_file)
+    again.load()
+    assert dict(again.items()) == {'b': entry(2), 'c': entry(3)}
+
+
+def test_journal_is_compacted_into_the_snapshot(tmp_path):
+    cache_file = str(tmp_path / 'item_cache.json')
+    store = JournalCacheBackend(cache_file, compact_threshold=3)
+    store.load()
+    store.put('a', entry(1))
+    store.put('b', entry(2))
+    assert store.journal_records == 2
+    assert not os.path.exists(cache_file)
+
+    store.put('c', entry(3))
+    assert store.journal_records == 0
+    assert os.path.getsize(store.journal_file) == 0
+    with open(cache_file) as f:
+        assert json.load(f) == {'a': entry(1), 'b': entry(2), 'c': entry(3)}
+    store.close()
+
+
+def test_json_caches_are_migrated_into_sqlite_once(tmp_path):
+    item_file = str(tmp_path / 'item_cache.json')
+    spell_file = str(tmp_path / 'spell_cache.json')
+    with open(item_file, 'w') as f:
+        json.dump({'Cap of Flame': entry('cap'), 'Band': entry('band')}, f)
+    with open(spell_file, 'w') as f:
+        json.dump({'2101': entry('heal')}, f)
+    # Changes still in a journal are migrated too
+    with open(f"{spell_file}.journal", 'w') as f:
+        f.write(json.dumps({'op': 'set', 'key': '3202', 'entry': entry('resolve')}) + '\n')
+
+    expected = {item_file: {'Cap of Flame': entry('cap'), 'Band': entry('band')},
+                spell_file: {'2101': entry('heal'), '3202': entry('resolve')}}
+    for cache_file, entries in expected.items():
+        store = SqliteCacheBackend(cache_file)
+        store.load()
+        assert dict(store.items()) == entries
+        assert store.size_bytes() == sum(len(json.dumps(e['data'])) for e in entries.values())
+        store.close()
+
+    assert sorted(os.listdir(tmp_path)) == [
+        'item_cache.db', 'item_cache.json.migrated',
+        'spell_cache.db', 'spell_cache.json.journal.migrated', 'spell_cache.json.migrated']
+
+    # Reopening does not import again
+    store = SqliteCacheBackend(item_file)
+    store.load()
+    assert len(store) == 2
+    store.close()
+
+
+def test_sqlite_is_the_default_backend(tmp_path):
+    cache_file = str(tmp_path / 'item_cache.json')
+    cache = CacheManager(cache_file, sweep_interval=0)
+    assert isinstance(cache.backend, SqliteCacheBackend)
+    cache.set('Cap of Flame', {'AC': '10'})
+    cache.close()
+
+    assert os.listdir(tmp_path) == ['item_cache.db']
+    reopened = CacheManager(cache_file, sweep_interval=0)
+    assert reopened.get('Cap of Flame') == {'AC': '10'}
+    reopened.close()
+
+
+def test_sqlite_rows_hold_size_and_age(tmp_path):
+    store = SqliteCacheBackend(str(tmp_path / 'spell_cache.json'))
+    store.load()
+    store.put_many([('new', entry('abcd', 3000.0)), ('old', entry('abc', 1000.0))])
+    store.put('mid', entry('ab', 2000.0))
+
+    # Sizes are the serialised data's byte counts, listed oldest first
+    assert store.entry_metadata() == [('old', 1000.0, 16), ('mid', 2000.0, 15), ('new', 3000.0, 17)]
+    assert store.size_bytes() == 48
+    assert sorted(store.expired_keys(2500.0)) == ['mid', 'old']
+    store.close()
+
+
+def test_sqlite_cache_is_shared_by_worker_threads(tmp_path):
+    cache = CacheManager(str(tmp_path / 'spell_cache.json'), sweep_interval=0)
+
+    def work(worker):
+        for n in range(20):
+            cache.set(f"{worker}-{n}", {'n': n})
+            assert cache.get(f"{worker}-{n}") == {'n': n}
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(work, range(8)))
+    assert len(cache) == 160
+    cache.close()
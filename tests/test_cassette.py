@@ -0,0 +1,124 @@
+# tests/test_cassette.py
+import os
+
+import pytest
+import requests
+
+from utils.cassette import Cassette, ReplayAdapter, ReplayPolicy, ReplayServer
+from utils.page_store import PageStore
+from utils.web import WebUtils
+
+ITEM_URL = 'https://www.lazaruseq.com/Alla/?a=item&id=1001'
+
+
+def read_page(name):
+    with open(os.path.join(os.path.dirname(__file__), 'fixtures', 'pages', name), encoding='utf-8') as f:
+        return f.read()
+
+
+class FailFirst(ReplayPolicy):
+    """Policy failing the first ``failures`` requests, then serving normally"""
+
+    def __init__(self, failures, **kwargs):
+        super().__init__(error_rate=1.0, **kwargs)
+        self.failures = failures
+
+    def should_fail(self):
+        with self._lock:
+            self.failures -= 1
+            return self.failures >= 0
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    cassette = Cassette(str(tmp_path / 'cassette'))
+    cassette.put(ITEM_URL, read_page('item_1001.html'), headers={
+        'Content-Type': 'text/html', 'ETag': '"v1"', 'Set-Cookie': 'session=1'})
+    return cassette
+
+
+@pytest.fixture
+def web(tmp_path, monkeypatch):
+    # Anything WebUtils writes lands in the working directory
+    monkeypatch.chdir(tmp_path)
+    yield WebUtils()
+    WebUtils.set_replay()
+    WebUtils.set_record_cassette(None)
+
+
+def test_cassette_round_trip(cassette):
+    entry = Cassette(cassette.directory).get(ITEM_URL)
+    assert entry['status'] == 200
+    assert entry['body'] == read_page('item_1001.html')
+    assert entry['headers'] == {'Content-Type': 'text/html', 'ETag': '"v1"'}
+    assert cassette.urls() == [ITEM_URL]
+    assert len(cassette) == 1
+    assert cassette.get(ITEM_URL.replace('1001', '1002')) is None
+
+
+def test_seeded_policies_make_the_same_choices():
+    first, second = (ReplayPolicy(error_rate=0.5, seed=7) for _ in range(2))
+    assert [first.should_fail() for _ in range(50)] == [second.should_fail() for _ in range(50)]
+
+
+def test_policy_rejects_unknown_error_mode():
+    with pytest.raises(ValueError):
+        ReplayPolicy(error_mode='timeout')
+
+
+def test_replay_adapter_serves_recorded_page(cassette, web, tmp_path, monkeypatch):
+    page_store = PageStore(str(tmp_path / 'page_store'))
+    monkeypatch.setattr(WebUtils, '_page_store', page_store)
+    WebUtils.set_replay(cassette)
+    assert web.get_page_content(ITEM_URL) == read_page('item_1001.html')
+    assert WebUtils._shared_session.get_adapter(ITEM_URL).policy.get_stats()['served'] == 1
+    # Replayed pages are not copied into the page store
+    assert len(page_store) == 0
+
+
+def test_replay_adapter_answers_conditional_get(cassette):
+    adapter = ReplayAdapter(cassette)
+    request = requests.Request('GET', ITEM_URL, headers={'If-None-Match': '"v1"'}).prepare()
+    response = adapter.send(request)
+    assert response.status_code == 304
+    assert response.text == ''
+
+
+def test_replay_adapter_reports_missing_pages(cassette):
+    adapter = ReplayAdapter(cassette)
+    response = adapter.send(requests.Request('GET', ITEM_URL.replace('1001', '9999')).prepare())
+    assert response.status_code == 404
+    assert adapter.policy.get_stats()['missing'] == 1
+
+
+def test_replay_adapter_injects_errors(cassette):
+    adapter = ReplayAdapter(cassette, ReplayPolicy(error_rate=1.0, error_mode='reset'))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        adapter.send(requests.Request('GET', ITEM_URL).prepare())
+
+    adapter = ReplayAdapter(cassette, ReplayPolicy(error_rate=1.0))
+    assert adapter.send(requests.Request('GET', ITEM_URL).prepare()).status_code == 503
+
+
+def test_replay_server_errors_are_retried(cassette, web):
+    policy = FailFirst(2)
+    with ReplayServer(cassette, policy) as server:
+        WebUtils.set_replay(server_url=server.url)
+        html = web.get_page_content(ITEM_URL)
+    assert html == read_page('item_1001.html')
+    assert policy.get_stats() == {'requests': 3, 'served': 1, 'not_modified': 0,
+                                  'missing': 0, 'injected_errors': 2}
+
+
+def test_recorded_responses_replay(cassette, web, tmp_path):
+    recorded = Cassette(str(tmp_path / 'recorded'))
+    with ReplayServer(cassette) as server:
+        WebUtils.set_replay(server_url=server.url)
+        WebUtils.set_record_cassette(recorded)
+        web.get_page_content(ITEM_URL)
+    WebUtils.set_record_cassette(None)
+
+    # Responses are recorded under the site URL, not the server's
+    assert recorded.urls() == [ITEM_URL]
+    WebUtils.set_replay(recorded)
+    assert web.get_page_content(ITEM_URL) == read_page('item_1001.html')
@@ -0,0 +1,45 @@
+# tests/test_cli.py
+import json
+import os
+import subprocess
+import sys
+
+from config.settings import CLI_IMPORT_BUDGET_MS
+from lazgearcompare.cli import build_parser
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a fresh interpreter so nothing is already imported
+IMPORT_PROBE = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import lazgearcompare.cli as cli\n"
+    "seconds = time.perf_counter() - start\n"
+    "print(json.dumps({'seconds': seconds, 'modules': sorted(sys.modules)}))\n"
+)
+
+
+def import_cli():
+    output = subprocess.run([sys.executable, '-c', IMPORT_PROBE], cwd=REPO_ROOT, check=True,
+                            capture_output=True, text=True, timeout=60).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_cli_imports_no_gui_modules():
+    from lazgearcompare.cli import GUI_MODULES
+    modules = import_cli()['modules']
+    assert [name for name in modules if name.split('.')[0] in GUI_MODULES] == []
+
+
+def test_cli_import_time_is_within_budget():
+    # Best of three, so one slow run on a busy machine does not fail the test
+    best_ms = min(import_cli()['seconds'] for _ in range(3)) * 1000
+    assert best_ms <= CLI_IMPORT_BUDGET_MS
+
+
+def test_parser_accepts_every_command():
+    parser = build_parser()
+    assert parser.parse_args(['lookup', 'Cap of Flame']).command == 'lookup'
+    args = parser.parse_args(['--replay', 'cassettes', 'batch', 'gear.txt', '--class', 'Warrior'])
+    assert (args.command, args.replay, args.class_name) == ('batch', 'cassettes', 'Warrior')
+    assert parser.parse_args(['export', '--class', 'Bard', '--format', 'csv', '-o', 'b.csv']).format == 'csv'
@@ -0,0 +1,58 @@
+# tests/test_decorators.py
+import logging
+
+import pytest
+
+from utils.decorators import debug_log, is_debug_enabled, set_debug_mode
+
+
+class Parser:
+    @debug_log
+    def decorated(self, value):
+        return value * 2
+
+
+@debug_log
+def module_function(value):
+    return value + 1
+
+
+@pytest.fixture(autouse=True)
+def debug_off():
+    set_debug_mode(False)
+    yield
+    set_debug_mode(False)
+
+
+def test_debug_off_binds_the_bare_function():
+    assert not is_debug_enabled()
+    assert not hasattr(Parser.__dict__['decorated'], '__wrapped__')
+    assert Parser().decorated(3) == 6
+    assert not hasattr(globals()['module_function'], '__wrapped__')
+
+
+def test_set_debug_mode_rebinds_the_wrapper(caplog):
+    set_debug_mode(True)
+    assert Parser.__dict__['decorated'].__wrapped__.__name__ == 'decorated'
+    assert globals()['module_function'].__wrapped__.__name__ == 'module_function'
+
+    with caplog.at_level(logging.DEBUG):
+        assert Parser().decorated(3) == 6
+        assert module_function(1) == 2
+    assert 'decorated completed' in caplog.text
+
+    set_debug_mode(False)
+    assert not hasattr(Parser.__dict__['decorated'], '__wrapped__')
+    assert not hasattr(globals()['module_function'], '__wrapped__')
+
+
+def test_exceptions_pass_through_the_wrapper():
+    class Failing:
+        @debug_log
+        def explode(self):
+            raise ValueError("boom")
+
+    for enabled in (False, True):
+        set_debug_mode(enabled)
+        with pytest.raises(ValueError):
+            Failing().explode()
@@ -0,0 +1,87 @@
+# tests/test_gear_csv.py
+import csv
+
+import pytest
+
+from core.data_manager import DataManager, class_csv_filename
+from core.gear_index import gear_csv_headers
+from utils.csv_viewer import CSVViewer
+
+# Header in an order of its own, as left by a spreadsheet edit
+HEADER = 'Slot,Name,ID,URL,AC'
+EXISTING = ['Chest,Robe of the Fixture,1004,https://x/1004 ,30',
+            'Feet,Boots of the Fixture,1006,https://x/1006 ,12']
+
+
+def item(name, item_id, **stats):
+    return {'Name': name, 'ID': item_id, 'URL': f"https://x/{item_id}", **stats}
+
+
+def read_rows(filename):
+    with open(filename, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def data_manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_manager = DataManager()
+    yield data_manager
+    data_manager.close()
+
+
+@pytest.fixture
+def filename(data_manager):
+    filename = class_csv_filename('Warrior')
+    with open(filename, 'w', newline='') as f:
+        f.write('\r\n'.join([HEADER] + EXISTING) + '\r\n')
+    return filename
+
+
+def test_append_keeps_the_header_and_existing_rows(data_manager, filename):
+    with open(filename, 'rb') as f:
+        before = f.read()
+    assert data_manager.save_item_to_csv(filename, item('Cap of the Fixture', '1001', AC='25'), 'Head')
+
+    with open(filename, 'rb') as f:
+        after = f.read()
+    assert after.startswith(before)
+    assert after[len(before):] == b'Head,Cap of the Fixture,1001,https://x/1001 ,25\r\n'
+
+
+def test_append_to_a_file_without_a_final_newline(data_manager, filename):
+    with open(filename, 'rb+') as f:
+        f.truncate(len(f.read().rstrip(b'\r\n')))
+    data_manager.save_item_to_csv(filename, item('Cap of the Fixture', '1001', AC='25'), 'Head')
+    assert [row['Name'] for row in read_rows(filename)] == [
+        'Robe of the Fixture', 'Boots of the Fixture', 'Cap of the Fixture']
+
+
+def test_new_column_rewrites_the_file(data_manager, filename):
+    data_manager.save_item_to_csv(filename, item('Cap of the Fixture', '1001', AC='25', HP='40'), 'Head')
+
+    with open(filename, newline='') as f:
+        assert next(csv.reader(f)) == gear_csv_headers(['Slot', 'Name', 'ID', 'URL', 'AC', 'HP'])
+    rows = read_rows(filename)
+    assert [(row['Name'], row['AC'], row['HP']) for row in rows] == [
+        ('Robe of the Fixture', '30', ''),
+        ('Boots of the Fixture', '12', ''),
+        ('Cap of the Fixture', '25', '40'),
+    ]
+    # The gear index follows the rewrite
+    assert data_manager.check_duplicate_entry(filename, 'robe of the fixture')
+    assert data_manager.check_duplicate_entry(filename, 'Cap of the Fixture')
+
+
+def test_appended_rows_load_in_slot_order(data_manager, filename):
+    data_manager.save_item_to_csv(filename, item('Cap of the Fixture', '1001', AC='25'), 'Head')
+    data_manager.save_item_to_csv(filename, item('Band of the Fixture', '1005', AC='2'), 'Fingers')
+    expected = ['Cap of the Fixture', 'Band of the Fixture', 'Robe of the Fixture', 'Boots of the Fixture']
+
+    rows = data_manager.load_gear_rows('Warrior')
+    assert [row['Name'] for row in rows] == expected
+    assert rows[0]['AC'] == '25'
+
+    df = CSVViewer().load_csv('Warrior')
+    assert df['Name'].tolist() == expected
+    assert df['Slot'].tolist() == ['Head', 'Fingers', 'Chest', 'Feet']
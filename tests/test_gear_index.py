@@ -0,0 +1,88 @@
+# tests/test_gear_index.py
+import csv
+import json
+import threading
+
+import pytest
+
+from core.data_manager import DataManager
+from core.gear_index import GearIndex
+
+
+def item(name, item_id):
+    return {'Name': name, 'ID': item_id, 'URL': f"https://www.lazaruseq.com/Alla/?a=item&id={item_id}", 'AC': '10'}
+
+
+def read_rows(filename):
+    with open(filename, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def data_manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_manager = DataManager()
+    yield data_manager
+    data_manager.close()
+
+
+@pytest.fixture
+def filename(tmp_path):
+    return str(tmp_path / 'warrior_gear_comparison.csv')
+
+
+def test_batch_duplicates_match_ignoring_case_and_spacing(data_manager, filename):
+    result = data_manager.save_items_to_csv(filename, [
+        (item('New Helm', '1'), 'Head'),
+        (item('new  helm', '2'), 'Head'),
+        (item('Other Helm', ' 1 '), 'Head'),
+        (item('Band', '3'), 'Fingers'),
+    ])
+    assert result == {'saved': ['New Helm', 'Band'], 'duplicates': ['new  helm', 'Other Helm']}
+    assert [row['Name'] for row in read_rows(filename)] == ['New Helm', 'Band']
+
+
+def test_concurrent_batches_save_an_item_once(data_manager, filename):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        data_manager.save_items_to_csv(filename, [(item('New Helm', '1'), 'Head')]))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(len(result['saved']) for result in results) == 1
+    assert len(read_rows(filename)) == 1
+
+
+def test_torn_index_tail_is_truncated(data_manager, filename):
+    data_manager.save_items_to_csv(filename, [(item('New Helm', '1'), 'Head')])
+    index_file = data_manager.get_gear_index(filename).index_file
+    with open(index_file, 'rb') as f:
+        good = f.read()
+    with open(index_file, 'ab') as f:
+        f.write(b'{"name": "Torn')
+
+    gear_index = GearIndex(filename)
+    with open(index_file, 'rb') as f:
+        assert f.read() == good
+    assert gear_index.find('new helm') == ('New Helm', '1', 'Head')
+
+    # The next append lands on its own line
+    data_manager.save_items_to_csv(filename, [(item('Band', '3'), 'Fingers')])
+    with open(index_file, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [record['name'] for record in records if 'name' in record] == ['New Helm', 'Band']
+
+
+def test_index_records_without_name_or_id_are_skipped(filename):
+    with open(filename, 'w', newline='') as f:
+        f.write('Slot,Name,ID\r\nHead,New Helm,1\r\n')
+    gear_index = GearIndex(filename)
+    with open(gear_index.index_file, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    with open(gear_index.index_file, 'w', encoding='utf-8') as f:
+        f.writelines([json.dumps({'slot': 'Head'}) + '\n'] + lines)
+
+    gear_index = GearIndex(filename)
+    assert len(gear_index) == 1
+    assert gear_index.find('New Helm') == ('New Helm', '1', 'Head')
@@ -0,0 +1,69 @@
+# tests/test_gear_store.py
+import csv
+import io
+
+import pytest
+
+from core.data_manager import DataManager, class_csv_filename
+from core.gear_store import SqliteGearStore
+
+
+def item(name, item_id=None, **stats):
+    data = {'Name': name, **stats}
+    if item_id:
+        data['ID'] = item_id
+        data['URL'] = f"https://www.lazaruseq.com/Alla/?a=item&id={item_id}"
+    return data
+
+
+@pytest.fixture
+def gear_store(tmp_path):
+    gear_store = SqliteGearStore(str(tmp_path / 'gear.db'))
+    yield gear_store
+    gear_store.close()
+
+
+@pytest.fixture
+def data_manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_manager = DataManager()
+    yield data_manager
+    data_manager.close()
+
+
+def test_saving_an_item_again_updates_its_stats(gear_store):
+    gear_store.save_items('Warrior', [(item('Cap of Flame', '1', AC='10'), 'Head')])
+    gear_store.save_items('Cleric', [(item('Cap of Flame', '1', AC='12', HP='5'), 'Head')])
+
+    for class_name in ('Warrior', 'Cleric'):
+        row, = gear_store.load_rows(class_name)
+        assert (row['AC'], row['HP']) == ('12', '5')
+    assert gear_store.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+
+
+def test_items_without_an_id_are_updated_by_name(gear_store):
+    gear_store.save_items('Warrior', [(item('Rusty Sword', DMG='5'), 'Primary')])
+    gear_store.save_items('Cleric', [(item('rusty  sword', DMG='6'), 'Primary')])
+
+    assert [row['DMG'] for row in gear_store.load_rows('Warrior')] == ['6']
+    assert gear_store.conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 1
+
+
+def test_export_uses_the_class_csv_header(gear_store, data_manager):
+    items = [(item('Cap of Flame', '1', AC='10', HP='5'), 'Head'),
+             (item('Rusty Sword', DMG='5', DLY='30'), 'Primary')]
+    data_manager.save_gear_items('Warrior', items)
+    gear_store.save_items('Warrior', items)
+
+    with open(class_csv_filename('Warrior'), newline='') as f:
+        csv_header = next(csv.reader(f))
+    buffer = io.StringIO()
+    gear_store.write_csv('Warrior', buffer)
+    buffer.seek(0)
+    assert next(csv.reader(buffer)) == csv_header
+
+
+def test_import_needs_the_gear_store(data_manager):
+    assert data_manager.gear_store is None
+    with pytest.raises(RuntimeError, match='sqlite'):
+        data_manager.import_gear_csv('Warrior')
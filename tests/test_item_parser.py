@@ -0,0 +1,95 @@
+# tests/test_item_parser.py
+import glob
+import os
+import threading
+import time
+
+import pytest
+
+from core.item_parser import ItemParser, PARSER_ENGINES
+
+PAGES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'fixtures', 'pages', 'item_*.html')))
+
+
+def read_page(name):
+    with open(os.path.join(os.path.dirname(__file__), 'fixtures', 'pages', name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def parser():
+    parser = ItemParser()
+    # Effects are reported as found on the page, without fetching spell pages
+    parser._resolve_effect = lambda effect: dict(effect)
+    return parser
+
+
+def parse(parser, html, engine):
+    parser.set_engine(engine)
+    return parser.extract_item_stats(html)
+
+
+@pytest.mark.parametrize('page', PAGES, ids=os.path.basename)
+def test_engines_agree(parser, page):
+    with open(page, encoding='utf-8') as f:
+        html = f.read()
+    results = {engine: parse(parser, html, engine) for engine in PARSER_ENGINES}
+    assert results['soup'] == results['lxml']
+
+
+@pytest.mark.parametrize('engine', PARSER_ENGINES)
+def test_stats_come_from_the_item_block(parser, engine):
+    stats = parse(parser, read_page('item_1001.html'), engine)
+
+    assert stats['Name'] == 'Cloak of the Fallen Knight'
+    # Script and footer text hold other values for these stats
+    assert stats['AC'] == '25'
+    assert stats['ATTACK'] == '20'
+    assert stats['STR'] == '12 +4'
+    assert stats['SLOT 1'] == 'Type 7'
+    assert 'DAMAGE' not in stats
+    assert list(key for key in stats if key.endswith('_DETAILS')) == [
+        'FOCUS EFFECT_DETAILS', 'CLICK EFFECT_DETAILS']
+    click = stats['CLICK EFFECT_DETAILS']
+    assert (click['spell_id'], click['cast_time'], click['charges']) == ('3202', '3.0 sec', 'Unlimited')
+    assert parser.get_block_locator_stats()['fallback'] == 0
+
+
+@pytest.mark.parametrize('engine', PARSER_ENGINES)
+def test_page_without_item_block_falls_back_to_page_text(parser, engine):
+    stats = parse(parser, read_page('item_1002.html'), engine)
+
+    assert stats['Name'] == 'Rusty Bastard Sword'
+    assert stats['DELAY'] == '40'
+    assert 'ATTACK' not in stats
+    assert parser.get_block_locator_stats()['fallback'] == 1
+
+
+def test_effect_spells_are_resolved_concurrently(parser):
+    # Both lookups must be in flight at once to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def resolve(effect):
+        barrier.wait()
+        if effect['label'] == 'Focus Effect':
+            time.sleep(0.05)
+        return {'name': effect['spell_name'], 'id': effect['spell_id']}
+
+    parser._resolve_effect = resolve
+    stats = parser.extract_item_stats(read_page('item_1001.html'))
+
+    # The focus lookup finishes last but is still merged in label order
+    assert [(key, stats[key]['id']) for key in stats if key.endswith('_DETAILS')] == [
+        ('FOCUS EFFECT_DETAILS', '2101'), ('CLICK EFFECT_DETAILS', '3202')]
+
+
+def test_progress_callback_can_stop_effect_resolution(parser):
+    seen = []
+
+    def on_progress(stats):
+        seen.append(sorted(key for key in stats if key.endswith('_DETAILS')))
+        return len(seen) < 2
+
+    stats = parser.extract_item_stats(read_page('item_1001.html'), on_progress=on_progress)
+    assert seen == [[], ['FOCUS EFFECT_DETAILS']]
+    assert 'CLICK EFFECT_DETAILS' not in stats
@@ -0,0 +1,68 @@
+# tests/test_page_store.py
+import json
+import os
+
+from utils.page_store import PageStore, classify_url
+
+ITEM_URL = 'https://www.lazaruseq.com/Alla/?a=item&id=1001'
+SPELL_URL = 'https://www.lazaruseq.com/Alla/?a=spell&id=2101'
+
+
+def test_pages_round_trip(tmp_path):
+    store = PageStore(str(tmp_path))
+    digest = store.put(ITEM_URL, '<html>item</html>')
+    store.put(SPELL_URL, '<html>item</html>')
+
+    reopened = PageStore(str(tmp_path))
+    assert reopened.get(ITEM_URL) == '<html>item</html>'
+    assert reopened.get_by_hash(digest) == '<html>item</html>'
+    assert [url for url, _ in reopened.entries('spell')] == [SPELL_URL]
+    # Identical bodies are stored once
+    assert reopened.stats()['objects'] == 1
+
+
+def test_torn_index_is_truncated_before_the_next_put(tmp_path):
+    store = PageStore(str(tmp_path))
+    store.put(ITEM_URL, '<html>item</html>')
+    with open(store.index_file, 'a', encoding='utf-8') as f:
+        f.write('{"url": "https://www.lazaruseq.com/Alla/?a=spe')
+
+    PageStore(str(tmp_path)).put(SPELL_URL, '<html>spell</html>')
+
+    reopened = PageStore(str(tmp_path))
+    assert reopened.get(ITEM_URL) == '<html>item</html>'
+    assert reopened.get(SPELL_URL) == '<html>spell</html>'
+
+
+def test_records_without_a_url_are_skipped(tmp_path):
+    store = PageStore(str(tmp_path))
+    store.put(ITEM_URL, '<html>item</html>')
+    with open(store.index_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'hash': 'abc'}) + '\n' + json.dumps(['not', 'a', 'record']) + '\n')
+
+    reopened = PageStore(str(tmp_path))
+    assert len(reopened) == 1
+    assert reopened.get(ITEM_URL) == '<html>item</html>'
+
+
+def test_classify_url():
+    assert classify_url(ITEM_URL) == 'item'
+    assert classify_url('https://www.lazaruseq.com/Alla/?a=items&iname=cap') == 'search'
+    assert classify_url(SPELL_URL) == 'spell'
+    assert classify_url('https://www.lazaruseq.com/Alla/?a=spells&name=heal') == 'spell_search'
+
+
+def test_oldest_pages_are_pruned_past_the_size_limit(tmp_path):
+    # Random hex compresses to about 2.3 KB, so the limit holds two pages
+    store = PageStore(str(tmp_path), max_size_mb=6 / 1024)
+    urls = [f"https://www.lazaruseq.com/Alla/?a=item&id={item_id}" for item_id in range(1, 5)]
+    for url in urls:
+        store.put(url, os.urandom(2048).hex())
+
+    reopened = PageStore(str(tmp_path), max_size_mb=None)
+    assert list(reopened.index) == urls[2:]
+    assert reopened.stats()['objects'] == 2
+    assert reopened.stats()['bytes'] <= 6 * 1024
+
+    assert reopened.prune(0) == 2
+    assert PageStore(str(tmp_path)).stats() == {'pages': 0, 'objects': 0, 'bytes': 0}
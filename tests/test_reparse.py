@@ -0,0 +1,145 @@
+# tests/test_reparse.py
+import glob
+import os
+import shutil
+import sys
+import zipfile
+
+import pytest
+
+import reparse
+from core.data_manager import DataManager
+from utils.page_store import PageStore
+from utils.web import WebUtils
+
+PAGES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'fixtures', 'pages', '*.html')))
+ITEM_URL = 'https://www.lazaruseq.com/Alla/?a=item&id=1001'
+SPELL_URL = 'https://www.lazaruseq.com/Alla/?a=spell&id=2101'
+
+
+def read_page(name):
+    with open(os.path.join(os.path.dirname(__file__), 'fixtures', 'pages', name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def page_dir(tmp_path, monkeypatch):
+    # Caches are written to the working directory
+    monkeypatch.chdir(tmp_path)
+    page_dir = tmp_path / 'pages'
+    page_dir.mkdir()
+    for page in PAGES:
+        shutil.copy(page, page_dir)
+    (page_dir / 'notes.txt').write_text('not a page')
+    return str(page_dir)
+
+
+@pytest.fixture
+def page_zip(page_dir, tmp_path):
+    filename = str(tmp_path / 'pages.zip')
+    with zipfile.ZipFile(filename, 'w') as archive:
+        for name in os.listdir(page_dir):
+            archive.write(os.path.join(page_dir, name), f"alla/{name}")
+    return filename
+
+
+@pytest.fixture
+def page_store(page_dir, tmp_path):
+    store = PageStore(str(tmp_path / 'page_store'))
+    source = reparse.FilenameSource(page_dir)
+    for url, kind in source.urls():
+        store.put(url, source(url), kind=kind)
+    return store.root_dir
+
+
+def test_pages_are_found_by_filename(page_dir, page_zip):
+    for path in (page_dir, page_zip):
+        source = reparse.open_source(path)
+        assert isinstance(source, reparse.FilenameSource)
+        assert sorted(source.urls()) == sorted([
+            (ITEM_URL, 'item'), (ITEM_URL.replace('1001', '1002'), 'item'),
+            (ITEM_URL.replace('1001', '1003'), 'item'), (SPELL_URL, 'spell')])
+        assert source(SPELL_URL) == read_page('spell_2101.html')
+        assert source(SPELL_URL.replace('2101', '3202')) is None
+
+
+def test_page_store_is_opened_as_a_source(page_store):
+    source = reparse.open_source(page_store)
+    assert isinstance(source, reparse.PageStoreSource)
+    assert (SPELL_URL, 'spell') in source.urls()
+    assert source(ITEM_URL) == read_page('item_1001.html')
+
+
+def test_other_paths_are_rejected(page_dir):
+    with pytest.raises(ValueError, match='Not a page store'):
+        reparse.open_source(os.path.join(page_dir, 'notes.txt'))
+
+
+@pytest.mark.parametrize('source', ['page_dir', 'page_zip', 'page_store'])
+def test_reparse_rebuilds_the_caches_offline(request, source):
+    results = reparse.reparse(request.getfixturevalue(source), workers=2)
+    assert (results['pages'], results['items'], results['failed']) == (3, 3, 0)
+    # Only the stored spell page can be parsed
+    assert results['spells'] == 1
+    # item_1002 has no item block
+    assert results['block_fallbacks'] == 1
+    assert WebUtils._offline_source is None
+
+    data_manager = DataManager()
+    try:
+        stats = data_manager.cache_manager.get('Cloak of the Fallen Knight')
+        assert (stats['ID'], stats['URL'], stats['AC']) == ('1001', ITEM_URL, '25')
+        assert stats['FOCUS EFFECT_DETAILS']['effects'] == ['1: Increase Healing by 25%',
+                                                            '2: Limit: Max Level (65)']
+        assert len(data_manager.cache_manager) == 3
+        assert data_manager.spell_cache_manager.get('2101')['url'] == SPELL_URL
+    finally:
+        data_manager.close()
+
+
+def test_dry_run_leaves_the_caches_alone(page_dir):
+    assert reparse.reparse(page_dir, workers=1, dry_run=True)['items'] == 3
+    data_manager = DataManager()
+    try:
+        assert len(data_manager.cache_manager) == 0
+        assert len(data_manager.spell_cache_manager) == 0
+    finally:
+        data_manager.close()
+
+
+def test_reparse_command_reports_the_counts(page_dir, monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['reparse.py', page_dir, '--workers', '1'])
+    reparse.main()
+    output = capsys.readouterr().out
+    assert 'Cached 3 items and 1 spells; 0 failed' in output
+    assert 'Item block not found on 1 pages' in output
+
+
+def test_engines_agree_on_the_stored_pages(page_dir):
+    results = reparse.compare_engines(page_dir, workers=2)
+    assert results['pages'] == 3
+    assert results['mismatches'] == []
+    assert set(results['scan_seconds']) == {'soup', 'lxml'}
+
+
+def test_compare_engines_command_passes_when_engines_agree(page_dir, monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'argv', ['reparse.py', page_dir, '--workers', '1', '--compare-engines'])
+    with pytest.raises(SystemExit) as exit_info:
+        reparse.main()
+    assert exit_info.value.code == 0
+    assert '3/3 pages identical across engines' in capsys.readouterr().out
+
+
+def test_compare_engines_command_fails_on_a_difference(page_dir, monkeypatch, capsys):
+    def compare_engines(source_path, workers=None):
+        return {'pages': 3, 'mismatches': [(ITEM_URL, ['AC', 'FIRE'])],
+                'scan_seconds': {'soup': 0.5, 'lxml': 0.1}}
+
+    monkeypatch.setattr(reparse, 'compare_engines', compare_engines)
+    monkeypatch.setattr(sys, 'argv', ['reparse.py', page_dir, '--compare-engines'])
+    with pytest.raises(SystemExit) as exit_info:
+        reparse.main()
+    assert exit_info.value.code == 1
+    output = capsys.readouterr().out
+    assert f"MISMATCH {ITEM_URL}: AC, FIRE" in output
+    assert '2/3 pages identical across engines (page scan time: soup 0.50s, lxml 0.10s)' in output
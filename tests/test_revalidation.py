@@ -0,0 +1,116 @@
+# tests/test_revalidation.py
+import os
+
+import pytest
+
+import utils.cache
+from core.item_parser import ItemParser
+from core.search_pipeline import SearchPipeline
+from utils.cache import CacheManager
+from utils.cassette import Cassette, ReplayPolicy
+from utils.web import WebUtils
+
+ITEM_URL = 'https://www.lazaruseq.com/Alla/?a=item&id=1001'
+LAST_MODIFIED = 'Wed, 01 Jan 2025 00:00:00 GMT'
+
+
+def read_page(name):
+    with open(os.path.join(os.path.dirname(__file__), 'fixtures', 'pages', name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(utils.cache.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    return Cassette(str(tmp_path / 'cassette'))
+
+
+@pytest.fixture
+def policy():
+    return ReplayPolicy()
+
+
+@pytest.fixture
+def web(tmp_path, monkeypatch, cassette, policy, clock):
+    monkeypatch.chdir(tmp_path)
+    validator_cache = CacheManager(str(tmp_path / 'validator_cache.json'), backend='json', sweep_interval=0)
+    WebUtils.set_replay(cassette, policy)
+    yield WebUtils(validator_cache=validator_cache)
+    WebUtils.set_replay()
+    validator_cache.close()
+
+
+def validators(web):
+    # Cache keys are stored lower-cased
+    return web.validator_cache.backend.get(ITEM_URL.lower())
+
+
+@pytest.mark.parametrize('headers, sent', [
+    ({'ETag': '"v1"'}, 'etag'),
+    ({'Last-Modified': LAST_MODIFIED}, 'last_modified'),
+], ids=['etag', 'last-modified'])
+def test_unchanged_page_is_answered_with_304(web, cassette, policy, clock, headers, sent):
+    cassette.put(ITEM_URL, read_page('item_1001.html'), headers=headers)
+    assert web.get_page_content(ITEM_URL, track_validators=True) == read_page('item_1001.html')
+    stored = validators(web)
+    assert stored['data'][sent] == next(iter(headers.values()))
+
+    clock[0] += 60
+    assert web.get_page_if_modified(ITEM_URL) is None
+    assert policy.get_stats()['not_modified'] == 1
+    # The validators are kept and their age reset
+    assert validators(web) == {'data': stored['data'], 'timestamp': 1060.0}
+
+
+def test_changed_page_replaces_the_validators(web, cassette, policy):
+    cassette.put(ITEM_URL, read_page('item_1001.html'), headers={'ETag': '"v1"'})
+    web.get_page_content(ITEM_URL, track_validators=True)
+
+    cassette.put(ITEM_URL, read_page('item_1003.html'), headers={'ETag': '"v2"'})
+    assert web.get_page_if_modified(ITEM_URL) == read_page('item_1003.html')
+    assert validators(web)['data']['etag'] == '"v2"'
+    assert policy.get_stats()['not_modified'] == 0
+
+
+def test_content_hash_stands_in_for_missing_validators(web, cassette, policy, clock):
+    cassette.put(ITEM_URL, read_page('item_1001.html'))
+    web.get_page_content(ITEM_URL, track_validators=True)
+    stored = validators(web)['data']
+    assert (stored['etag'], stored['last_modified']) == (None, None)
+
+    clock[0] += 60
+    assert web.get_page_if_modified(ITEM_URL) is None
+    assert validators(web) == {'data': stored, 'timestamp': 1060.0}
+
+    cassette.put(ITEM_URL, read_page('item_1003.html'))
+    assert web.get_page_if_modified(ITEM_URL) == read_page('item_1003.html')
+    assert validators(web)['data']['content_hash'] != stored['content_hash']
+    assert policy.get_stats()['served'] == 3
+
+
+def test_pipeline_reuses_stale_stats_for_an_unchanged_page(web, cassette):
+    parser = ItemParser()
+    parser._resolve_effect = lambda effect: dict(effect)
+    pipeline = SearchPipeline(parser, web, max_workers=1)
+    try:
+        cassette.put(ITEM_URL, read_page('item_1001.html'), headers={'ETag': '"v1"'})
+        found = pipeline._parse_item_page('Fixture', '1001', ITEM_URL,
+                                          web.get_page_content(ITEM_URL, track_validators=True), None, None)
+        stale_stats = found['stats']
+
+        result = pipeline.revalidate('Fixture', stale_stats)
+        assert result == {'status': 'revalidated', 'item_name': 'Fixture', 'stats': stale_stats}
+
+        cassette.put(ITEM_URL, read_page('item_1003.html'), headers={'ETag': '"v2"'})
+        result = pipeline.revalidate('Fixture', stale_stats)
+        assert result['status'] == 'found'
+        assert result['stats'] != stale_stats
+        assert (result['stats']['ID'], result['stats']['URL']) == ('1001', ITEM_URL)
+    finally:
+        pipeline.shutdown()
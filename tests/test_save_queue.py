@@ -0,0 +1,118 @@
+# tests/test_save_queue.py
+import threading
+import time
+
+import pytest
+
+from core.save_queue import SaveQueue
+
+
+class FakeDataManager:
+    """Records save_gear_items calls; fails the first ``failures`` of them"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+        self.saved = {}  # class name -> item names
+        self.written = threading.Event()
+
+    def save_gear_items(self, class_name, items):
+        self.calls.append((class_name, [item_data['Name'] for item_data, _ in items]))
+        if self.failures:
+            self.failures -= 1
+            return None
+        saved_names = self.saved.setdefault(class_name, [])
+        result = {'saved': [], 'duplicates': []}
+        for item_data, _ in items:
+            name = item_data['Name']
+            (result['duplicates'] if name in saved_names else result['saved']).append(name)
+            if name not in saved_names:
+                saved_names.append(name)
+        self.written.set()
+        return result
+
+
+def item(name):
+    return {'Name': name, 'ID': name.lower()}
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def queues():
+    opened = []
+
+    def make(data_manager, **kwargs):
+        save_queue = SaveQueue(data_manager, **kwargs)
+        opened.append(save_queue)
+        return save_queue
+
+    yield make
+    for save_queue in opened:
+        save_queue.close()
+
+
+def test_saves_in_the_window_are_written_together(queues):
+    data_manager = FakeDataManager()
+    save_queue = queues(data_manager, window_ms=100)
+    save_queue.enqueue('Warrior', item('Helm'), 'Head')
+    save_queue.enqueue('Warrior', item('Band'), 'Fingers')
+    save_queue.enqueue('Cleric', item('Robe'), 'Chest')
+    assert save_queue.contains('Warrior', 'helm')
+
+    assert data_manager.written.wait(5)
+    wait_for(lambda: save_queue.get_stats()['writes'] == 2)
+    assert data_manager.calls == [('Warrior', ['Helm', 'Band']), ('Cleric', ['Robe'])]
+    assert not save_queue.contains('Warrior', 'Helm')
+
+
+def test_duplicates_are_counted_not_saved_twice(queues):
+    data_manager = FakeDataManager()
+    save_queue = queues(data_manager, window_ms=10_000)
+    save_queue.enqueue('Warrior', item('Helm'), 'Head')
+    save_queue.flush()
+    save_queue.enqueue('Warrior', item('Helm'), 'Head')
+    save_queue.flush()
+
+    assert data_manager.saved == {'Warrior': ['Helm']}
+    stats = save_queue.get_stats()
+    assert (stats['flushed'], stats['duplicates'], stats['pending']) == (1, 1, 0)
+
+
+def test_failed_write_is_retried_without_another_save(queues):
+    data_manager = FakeDataManager(failures=2)
+    save_queue = queues(data_manager, window_ms=20)
+    save_queue.enqueue('Warrior', item('Helm'), 'Head')
+
+    assert data_manager.written.wait(5)
+    assert data_manager.calls == [('Warrior', ['Helm'])] * 3
+    wait_for(lambda: save_queue.get_stats()['flushed'] == 1)
+    assert save_queue.get_stats()['failed'] == 2
+    assert save_queue.errors.empty()
+
+
+def test_persistent_failures_are_reported(queues):
+    data_manager = FakeDataManager(failures=10)
+    save_queue = queues(data_manager, window_ms=10, retry_max_ms=20, failures_reported=3)
+    save_queue.enqueue('Warrior', item('Helm'), 'Head')
+
+    assert save_queue.errors.get(timeout=5) == ('Warrior', ['Helm'])
+    # Still queued, and still a duplicate of anything saved meanwhile
+    assert save_queue.contains('Warrior', 'Helm')
+
+
+def test_close_writes_pending_saves(queues):
+    data_manager = FakeDataManager()
+    save_queue = queues(data_manager, window_ms=60_000)
+    save_queue.enqueue('Warrior', item('Helm'), 'Head')
+    assert data_manager.calls == []
+
+    save_queue.close()
+    assert data_manager.saved == {'Warrior': ['Helm']}
+    with pytest.raises(RuntimeError):
+        save_queue.enqueue('Warrior', item('Band'), 'Fingers')
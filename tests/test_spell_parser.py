@@ -0,0 +1,75 @@
+# tests/test_spell_parser.py
+import os
+
+import pytest
+
+from core.data_manager import DataManager
+from core.item_parser import ItemParser
+from utils.cache import CacheManager
+
+SPELL_ID = '2101'
+
+
+def read_page(name):
+    with open(os.path.join(os.path.dirname(__file__), 'fixtures', 'pages', name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def spell_cache(tmp_path):
+    spell_cache = CacheManager(str(tmp_path / 'spell_cache.json'), backend='json', sweep_interval=0)
+    yield spell_cache
+    spell_cache.close()
+
+
+@pytest.fixture
+def item_parser(spell_cache):
+    item_parser = ItemParser(spell_cache=spell_cache)
+    item_parser.fetched = []
+
+    def fetch(url):
+        item_parser.fetched.append(url)
+        return read_page(f"spell_{SPELL_ID}.html")
+
+    item_parser.spell_parser.web_utils.get_page_content = fetch
+    return item_parser
+
+
+def test_spell_page_is_fetched_once(item_parser, spell_cache):
+    spell_parser = item_parser.spell_parser
+    first = spell_parser.extract_spell_details('Improved Healing V', SPELL_ID)
+    assert first['effects'] == ['1: Increase Healing by 25%', '2: Limit: Max Level (65)']
+    assert spell_cache.get(SPELL_ID) == first
+
+    assert spell_parser.extract_spell_details('Improved Healing V', SPELL_ID) == first
+    assert len(item_parser.fetched) == 1
+    assert spell_parser.get_cache_counters() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+
+def test_item_details_stay_out_of_the_cache(item_parser, spell_cache):
+    effect = {'label': 'Click Effect', 'spell_name': 'Improved Healing V', 'spell_id': SPELL_ID,
+              'cast_time': '3.0 sec', 'charges': 'Unlimited'}
+    for _ in range(2):
+        details = item_parser._resolve_effect(effect)
+        assert (details['cast_time'], details['charges']) == ('3.0 sec', 'Unlimited')
+
+    cached = spell_cache.get(SPELL_ID)
+    assert cached['cast_time'] == '0.0 sec'
+    assert 'charges' not in cached
+    assert len(item_parser.fetched) == 1
+
+
+def test_data_manager_parsers_share_its_spell_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_manager = DataManager()
+    try:
+        spell_parser = data_manager.item_parser.spell_parser
+        assert data_manager.spell_parser is spell_parser
+        assert spell_parser.spell_cache is data_manager.spell_cache_manager
+
+        data_manager.spell_cache_manager.set(SPELL_ID, {'name': 'Improved Healing V', 'effects': []})
+        assert spell_parser.get_cached_spell(SPELL_ID) == {'name': 'Improved Healing V', 'effects': []}
+        stats = data_manager.get_cache_stats()
+        assert (stats['spells'], stats['spell_hits'], stats['spell_misses']) == (1, 1, 0)
+    finally:
+        data_manager.close()
@@ -0,0 +1,111 @@
+# tests/test_spell_table.py
+import csv
+import json
+import os
+import shutil
+
+import pytest
+
+from core.data_manager import DataManager, class_csv_filename
+from core.spell_table import SpellTable, normalize_effects, parse_details, resolve_effect, spell_table_filename
+
+LEGACY_CSV = os.path.join(os.path.dirname(__file__), 'fixtures', 'legacy_gear.csv')
+
+
+def read_rows(filename):
+    with open(filename, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def legacy_details(row):
+    """Effect details held in a legacy row's *_DETAILS cells"""
+    return {column[:-len('_DETAILS')]: parse_details(value) for column, value in row.items()
+            if column.endswith('_DETAILS') and value}
+
+
+@pytest.fixture
+def data_manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data_manager = DataManager()
+    yield data_manager
+    data_manager.close()
+
+
+def test_legacy_cells_round_trip_through_the_spell_table(tmp_path):
+    table = SpellTable(str(tmp_path / 'gear_spells.jsonl'))
+    rows = []
+    for legacy_row in read_rows(LEGACY_CSV):
+        row, spells = normalize_effects(legacy_row)
+        table.add(spells)
+        rows.append((legacy_row, row))
+    assert len(table) == 2
+
+    # Only the first add of a spell is written
+    with open(table.filename, encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
+
+    reloaded = SpellTable(table.filename)
+    for legacy_row, row in rows:
+        assert row['FOCUS EFFECT_DETAILS'] == '2101'
+        for effect, details in legacy_details(legacy_row).items():
+            assert resolve_effect(row, effect, reloaded.spells) == details
+
+
+def test_item_fields_move_to_their_own_columns():
+    row, spells = normalize_effects(read_rows(LEGACY_CSV)[0])
+    assert row['CLICK EFFECT_DETAILS'] == '3202'
+    assert (row['CLICK EFFECT_CAST_TIME'], row['CLICK EFFECT_CHARGES']) == ('3.0 sec', 'Unlimited')
+    assert all('cast_time' not in spell and 'charges' not in spell for spell in spells)
+
+    # References are left alone on a second pass
+    assert normalize_effects(row) == (row, [])
+
+
+def test_legacy_csv_is_converted_when_rewritten(data_manager):
+    filename = class_csv_filename('Warrior')
+    shutil.copy(LEGACY_CSV, filename)
+    expected = {row['Name']: legacy_details(row) for row in read_rows(LEGACY_CSV)}
+
+    def loaded_details():
+        return {row['Name']: {column[:-len('_DETAILS')]: row[column] for column in row
+                              if column.endswith('_DETAILS')}
+                for row in data_manager.load_gear_rows('Warrior', resolve_effects=True)}
+
+    assert loaded_details() == expected
+
+    # A new column rewrites the file, moving the old details into the spell table
+    assert data_manager.save_item_to_csv(filename, {'Name': 'Ring of the Fixture', 'ID': '1005',
+                                                    'URL': 'https://x', 'CHA': '5'}, 'Fingers')
+    assert all(not row['FOCUS EFFECT_DETAILS'].startswith('{') for row in read_rows(filename))
+    assert len(SpellTable(spell_table_filename(filename))) == 2
+    expected['Ring of the Fixture'] = {}
+    assert loaded_details() == expected
+
+
+def test_torn_tail_is_truncated_and_records_without_id_skipped(tmp_path):
+    filename = str(tmp_path / 'gear_spells.jsonl')
+    good = json.dumps({'id': '2101', 'name': 'Improved Healing V', 'effects': []}) + '\n'
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'name': 'No ID', 'effects': []}) + '\n' + good + '{"id": "32')
+
+    table = SpellTable(filename)
+    assert list(table.spells) == ['2101']
+    with open(filename, encoding='utf-8') as f:
+        assert f.read().endswith(good)
+
+    # The next append lands on its own line
+    table.add([{'id': '3202', 'name': "Knight's Resolve", 'effects': []}])
+    assert sorted(SpellTable(filename).spells) == ['2101', '3202']
+
+
+def test_export_adds_spells_to_the_open_spell_table(data_manager):
+    shutil.copy(LEGACY_CSV, class_csv_filename('Warrior'))
+    os.makedirs('export')
+    filename = os.path.join('export', 'warrior.csv')
+    spell_table = data_manager.get_spell_table(filename)
+    assert len(spell_table) == 0
+
+    assert data_manager.export_gear_csv('Warrior', filename) == 2
+    assert data_manager.get_spell_table(filename) is spell_table
+    assert sorted(spell_table.spells) == ['2101', '3202']
+    assert len(SpellTable(spell_table_filename(filename))) == 2
@@ -0,0 +1,100 @@
+# tests/test_startup.py
+import json
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+import main
+from config.settings import STARTUP_BUDGET_MS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Everything MainWindow imports and builds before the first paint, minus the Tk widgets
+STARTUP_PROBE = (
+    "import json, sys\n"
+    "import main\n"
+    "import customtkinter\n"
+    "from ui.main_window import MainWindow\n"
+    "from core.data_manager import DataManager\n"
+    "from core.save_queue import SaveQueue\n"
+    "from core.search_pipeline import SearchPipeline\n"
+    "from utils.csv_viewer import CSVViewer\n"
+    "from utils.lazy_import import DEFERRED_MODULES\n"
+    "from utils.web import WebUtils\n"
+    "data_manager = DataManager()\n"
+    "web_utils = WebUtils(validator_cache=data_manager.validator_cache_manager)\n"
+    "CSVViewer(gear_store=data_manager.gear_store)\n"
+    "pipeline = SearchPipeline(data_manager.item_parser, web_utils)\n"
+    "SaveQueue(data_manager).close()\n"
+    "print(json.dumps([name for name in DEFERRED_MODULES if name in sys.modules]))\n"
+    "pipeline.shutdown()\n"
+    "data_manager.close()\n"
+)
+
+
+def has_display():
+    return sys.platform == 'win32' or bool(os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+
+class FakeRoot:
+    """Stands in for the Tk root; painting takes ``paint_seconds``"""
+
+    def __init__(self, clock, paint_seconds):
+        self.clock = clock
+        self.paint_seconds = paint_seconds
+
+    def update(self):
+        self.clock[0] += self.paint_seconds
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(main.time, 'perf_counter', lambda: clock[0])
+    profiler = main.StartupProfiler(start=clock[0])
+    monkeypatch.setattr(profiler, 'deferred_modules_loaded', lambda: [])
+    return profiler, clock
+
+
+def test_startup_path_imports_no_deferred_modules(tmp_path):
+    output = subprocess.run([sys.executable, '-c', STARTUP_PROBE], cwd=tmp_path, check=True,
+                            capture_output=True, text=True, timeout=120,
+                            env=dict(os.environ, PYTHONPATH=REPO_ROOT)).stdout
+    assert json.loads(output.strip().splitlines()[-1]) == []
+
+
+def test_report_startup_passes_within_budget(profiler, capsys):
+    profiler, clock = profiler
+    closed = []
+    paint_seconds = STARTUP_BUDGET_MS / 2 / 1000
+    assert main.report_startup(profiler, FakeRoot(clock, paint_seconds), lambda: closed.append(True)) == 0
+    assert closed == [True]
+    assert 'OK' in capsys.readouterr().out
+
+
+def test_report_startup_fails_over_budget(profiler, capsys):
+    profiler, clock = profiler
+    paint_seconds = (STARTUP_BUDGET_MS + 1) / 1000
+    assert main.report_startup(profiler, FakeRoot(clock, paint_seconds), lambda: None) == 1
+    assert 'OVER BUDGET' in capsys.readouterr().out
+
+
+def test_report_startup_fails_when_a_deferred_module_was_imported(profiler, monkeypatch, capsys):
+    profiler, clock = profiler
+    monkeypatch.setattr(profiler, 'deferred_modules_loaded', lambda: ['pandas'])
+    assert main.report_startup(profiler, FakeRoot(clock, 0.0), lambda: None) == 1
+    assert 'imported before first paint: pandas' in capsys.readouterr().out
+
+
+@pytest.mark.skipif(not has_display(), reason="opening the main window needs a display")
+def test_cold_start_first_paint_is_within_budget(tmp_path):
+    process = subprocess.run([sys.executable, os.path.join(REPO_ROOT, 'main.py'), '--profile-startup'],
+                             cwd=tmp_path, capture_output=True, text=True, timeout=120)
+    match = re.search(r'first paint ([\d.]+)ms', process.stdout)
+    assert match, process.stdout + process.stderr
+    assert float(match.group(1)) <= STARTUP_BUDGET_MS
+    assert 'deferred modules loaded: none' in process.stdout
+    assert process.returncode == 0
@@ -0,0 +1,27 @@
+# tests/test_stat_names.py
+from utils.stat_names import NameTable, normalize_stat_name
+
+
+def test_preloaded_names_and_memo_are_counted():
+    table = NameTable('Test', str.upper, preload=['ac'], max_size=2)
+
+    assert table('ac') == 'AC'
+    assert table('hp') == 'HP'
+    assert table('hp') == 'HP'
+    assert table.get_stats() == {'hits': 2, 'misses': 1, 'hit_rate': 2 / 3,
+                                 'preloaded': 1, 'memoized': 1}
+
+    table.reset_stats()
+    assert table.get_stats()['hits'] == 0
+
+
+def test_memo_is_bounded_least_recently_used():
+    table = NameTable('Test', str.upper, max_size=2)
+    for raw in ('a', 'b', 'a', 'c'):
+        table(raw)
+    assert list(table.memo) == ['a', 'c']
+
+
+def test_normalize_stat_name_uses_stat_replacements():
+    assert normalize_stat_name('Armor Class') == 'AC'
+    assert normalize_stat_name('Strength') == 'STR'
@@ -0,0 +1,102 @@
+# tests/test_stat_scanner.py
+import pytest
+
+from core.item_parser import ItemParser
+
+
+@pytest.fixture(scope='module')
+def scanner():
+    return ItemParser().stat_scanner
+
+
+def scan(scanner, text):
+    return scanner.scan(text, {})
+
+
+# One line per rule: (rule, text, stats found)
+RULE_CASES = [
+    ('type', 'Type: Plate Armor', {'Type': 'Plate '}),
+    ('aug_slot', 'Slot 1: Type 7', {'SLOT 1': 'Type 7'}),
+    ('basic', 'Armor Class: 25', {'AC': '25'}),
+    ('basic', 'Health: 100', {'HP': '100'}),
+    ('basic', 'Mana: -5', {'MANA': '-5'}),
+    ('basic', 'Endurance: 50', {'END': '50'}),
+    ('skill_damage', 'Flying Kick Damage: 20', {'FLYING KICK DAMAGE': '20'}),
+    ('skill_modifier', 'Skill Modifier: Backstab (10%)', {'BACKSTAB_MOD': '10%'}),
+    ('skill_modifier', 'Skill Modifier: Sneak (5%)', {'SNEAK': '5%'}),
+    ('bard_skill', 'Bard Skill: Wind Instruments (20%)', {'BARD_WIND INSTRUMENTS': '20%'}),
+    ('bard_skill', 'Bard Skill: Unknown (50) (15%)', {'BARD_SINGING RESONANCE': '15%'}),
+    ('specialization', 'Specialize Evocation: 5', {'SPECIALIZE EVOCATION': '5'}),
+    ('tradeskill', 'Baking: 3', {'BAKING': '3'}),
+    ('attribute', 'Strength: 10 +5', {'STR': '10 +5'}),
+    ('attribute', 'Agility: -3', {'AGI': '-3'}),
+    ('resist', 'Poison: 10', {'POISON': '10'}),
+    ('resist', 'Corruption: 4 +2', {'CORRUPTION': '4 +2'}),
+    ('damage_shield', 'Damage Shield: 3', {'DAMAGE SHIELD': '3'}),
+    ('damage_shield', 'Damage Shield Mitig: 2', {'DAMAGE SHIELD MITIG': '2'}),
+    ('damage', 'Damage: 12', {'DAMAGE': '12'}),
+    ('weapon', 'Delay: 30', {'DELAY': '30'}),
+    ('weapon', 'Backstab: 40', {'BACKSTAB': '40'}),
+    ('regeneration', 'HP Regen: 2', {'HP REGEN': '2'}),
+    ('regeneration', 'Meditate: 3', {'MEDITATE': '3'}),
+    ('combat_ability', 'Riposte: 2', {'RIPOSTE': '2'}),
+    ('offensive', 'Attack: 20', {'ATTACK': '20'}),
+    ('offensive', 'Haste: 30', {'HASTE': '30'}),
+    ('magic', 'Spell Damage: 10', {'SPELL DAMAGE': '10'}),
+    ('defensive', 'Spell Shielding: 3', {'SPELL SHIELDING': '3'}),
+    ('defensive', 'Stun Resist: 2', {'STUN RESIST': '2'}),
+    ('weapon_skill', '1H Blunt: 5', {'1H BLUNT': '5'}),
+    ('magic_skill', 'Channeling: 5', {'CHANNELING': '5'}),
+]
+
+
+@pytest.mark.parametrize('rule, text, expected', RULE_CASES, ids=[case[1] for case in RULE_CASES])
+def test_rule(scanner, rule, text, expected):
+    scanner.reset_timings()
+    assert scan(scanner, text) == expected
+    assert scanner.get_timings()['rules'][rule]['matches'] == 1
+
+
+def test_every_rule_has_a_case(scanner):
+    assert {rule.name for rule in scanner.rules} == {case[0] for case in RULE_CASES}
+
+
+# Reads that changed when the rules were fused, so no two rules match the same text
+@pytest.mark.parametrize('text, expected', [
+    # Augment slots no longer also produce a junk SLOTSD key
+    ('Slot 1: Type 7 Slot 2: Type 8', {'SLOT 1': 'Type 7', 'SLOT 2': 'Type 8'}),
+    # Double/Triple Attack no longer overwrite ATTACK
+    ('Attack: 20 Double Attack: 5 Triple Attack: 2',
+     {'ATTACK': '20', 'DOUBLE ATTACK': '5', 'TRIPLE ATTACK': '2'}),
+    # Make Poison is a tradeskill, not the poison resist
+    ('Make Poison: 5', {'MAKE POISON': '5'}),
+    ('Poison: 10 Make Poison: 5', {'POISON': '10', 'MAKE POISON': '5'}),
+    # Specialize <school> no longer also sets the bare school skill
+    ('Specialize Evocation: 5', {'SPECIALIZE EVOCATION': '5'}),
+    ('Specialize Evocation: 5 Evocation: 4', {'SPECIALIZE EVOCATION': '5', 'EVOCATION': '4'}),
+    # Every <skill> Damage line is recorded, not only the first
+    ('Kick Damage: 12 Backstab Damage: 30', {'KICK DAMAGE': '12', 'BACKSTAB DAMAGE': '30'}),
+], ids=['aug slots', 'double attack', 'make poison', 'poison and make poison',
+        'specialize', 'specialize and school', 'skill damages'])
+def test_fused_scan_changes(scanner, text, expected):
+    assert scan(scanner, text) == expected
+
+
+@pytest.mark.parametrize('text, expected', [
+    # More specific rules win where two could match at the same spot
+    ('Damage Shield: 3', {'DAMAGE SHIELD': '3'}),
+    ('Spell Damage: 10', {'SPELL DAMAGE': '10'}),
+    ('Backstab Damage: 30 Backstab: 40', {'BACKSTAB DAMAGE': '30', 'BACKSTAB': '40'}),
+    ('Skill Modifier: Kick (5%) Kick Damage: 12', {'KICK': '5%', 'KICK DAMAGE': '12'}),
+    ('Mana Regen: 1 Mana: 50', {'MANA REGEN': '1', 'MANA': '50'}),
+    ('Spell Shielding: 3 Shielding: 5', {'SPELL SHIELDING': '3', 'SHIELDING': '5'}),
+], ids=['damage shield', 'spell damage', 'backstab', 'kick', 'mana regen', 'shielding'])
+def test_specific_rules_win(scanner, text, expected):
+    assert scan(scanner, text) == expected
+
+
+def test_first_only_keys_keep_the_first_value(scanner):
+    stats = scan(scanner, 'Armor Class: 25 Armor Class: 30 Kick Damage: 12 Kick Damage: 14 '
+                          'Delay: 30 Delay: 25')
+    # Basic stats and skill damage keep the first value; other rules the last
+    assert stats == {'AC': '25', 'KICK DAMAGE': '12', 'DELAY': '25'}
@@ -0,0 +1,110 @@
+# tests/test_web.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from config.settings import HTTP_POOL_SIZE, MAX_CONNECTIONS_PER_HOST
+from core.item_parser import ItemParser
+from utils.cassette import Cassette, ReplayPolicy, ReplayServer
+from utils.web import WebUtils
+
+ITEM_URL = 'https://www.lazaruseq.com/Alla/?a=item&id=1001'
+
+
+def read_page(name):
+    with open(os.path.join(os.path.dirname(__file__), 'fixtures', 'pages', name), encoding='utf-8') as f:
+        return f.read()
+
+
+class InFlightPolicy(ReplayPolicy):
+    """Policy holding each request briefly and recording how many overlap"""
+
+    def __init__(self):
+        super().__init__(latency_ms=50)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def delay(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        super().delay()
+        with self._lock:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    cassette = Cassette(str(tmp_path / 'cassette'))
+    cassette.put(ITEM_URL, read_page('item_1001.html'))
+    return cassette
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch, cassette):
+    monkeypatch.chdir(tmp_path)
+    with ReplayServer(cassette) as server:
+        # Count the TCP connections the server accepts
+        server.accepted = []
+        get_request = server.httpd.get_request
+
+        def accept():
+            request = get_request()
+            server.accepted.append(request[1])
+            return request
+
+        server.httpd.get_request = accept
+        WebUtils.set_replay(server_url=server.url)
+        yield server
+    WebUtils.set_replay()
+
+
+@pytest.fixture
+def replay(tmp_path, monkeypatch, cassette):
+    monkeypatch.chdir(tmp_path)
+    policy = InFlightPolicy()
+    WebUtils.set_replay(cassette, policy)
+    yield policy
+    WebUtils.set_replay()
+
+
+def test_instances_share_one_limit_per_host():
+    first, second = WebUtils(), WebUtils()
+    semaphore = first._host_semaphore(ITEM_URL)
+    assert second._host_semaphore(ITEM_URL.replace('1001', '1002')) is semaphore
+    assert first._host_semaphore('https://example.com/') is not semaphore
+
+
+def test_requests_to_a_host_are_bounded(replay):
+    with ThreadPoolExecutor(max_workers=MAX_CONNECTIONS_PER_HOST * 3) as executor:
+        pages = list(executor.map(lambda _: WebUtils().get_page_content(ITEM_URL),
+                                  range(MAX_CONNECTIONS_PER_HOST * 3)))
+
+    assert pages == [read_page('item_1001.html')] * (MAX_CONNECTIONS_PER_HOST * 3)
+    assert 1 < replay.max_in_flight <= MAX_CONNECTIONS_PER_HOST
+
+
+def test_every_instance_uses_one_session():
+    WebUtils.close_shared_session()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        sessions = list(executor.map(lambda _: WebUtils().session, range(8)))
+    assert all(session is sessions[0] for session in sessions)
+
+    adapter = sessions[0].get_adapter(ITEM_URL)
+    assert adapter._pool_maxsize == HTTP_POOL_SIZE
+    assert sessions[0].headers['Connection'] == 'keep-alive'
+
+    # A closed session is replaced on the next request
+    WebUtils.close_shared_session()
+    assert WebUtils().session is not sessions[0]
+    WebUtils.close_shared_session()
+
+
+def test_parsers_reuse_one_keep_alive_connection(server):
+    item_parser = ItemParser()
+    callers = [item_parser.web_utils, item_parser.spell_parser.web_utils, WebUtils()]
+    for web_utils in callers:
+        assert web_utils.get_page_content(ITEM_URL) == read_page('item_1001.html')
+
+    assert len(server.accepted) == 1
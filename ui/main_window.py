@@ -9,19 +9,26 @@ import logging
 import os
 import sys
 import re
+import queue
+import threading
 from datetime import datetime
-from ctypes import windll, byref, sizeof, c_int
+
+if os.name == 'nt':
+    from ctypes import windll, byref, sizeof, c_int
 
 from config.constraints import STAT_CATEGORIES, CLASSES, SLOTS
-from config.settings import DARK_MODE_COLORS, LIGHT_MODE_COLORS
+from config.settings import DARK_MODE_COLORS, LIGHT_MODE_COLORS, SEARCH_POLL_INTERVAL_MS, SAVE_ERROR_POLL_MS
 from ui.tooltip import ToolTip
 from ui.widgets import ContextMenu
 from core.data_manager import DataManager
 from core.item_parser import ItemParser
 from core.spell_parser import SpellParser
+from core.search_pipeline import SearchPipeline
+from core.batch import BatchLookup, parse_gear_list, save_batch, format_summary
+from core.save_queue import SaveQueue
 from utils.web import WebUtils
 from utils.cache import CacheManager
-from utils.decorators import debug_log
+from utils.decorators import debug_log, set_debug_mode
 from utils.csv_viewer import CSVViewer
 from config.constraints import (
     STAT_CATEGORIES, CLASSES, SLOTS, 
@@ -105,23 +112,34 @@ class MainWindow:
     def _init_utilities(self):
         """Initialize utility classes"""
         try:
-            logging.debug("Initializing WebUtils")
-            self.web_utils = WebUtils()
-            
             logging.debug("Initializing DataManager")
             self.data_manager = DataManager()
             self.item_cache = self.data_manager.cache_manager
             self.spell_cache = self.data_manager.spell_cache_manager
             
+            logging.debug("Initializing WebUtils")
+            self.web_utils = WebUtils(validator_cache=self.data_manager.validator_cache_manager)
+            
             logging.debug("Initializing ItemParser")
-            self.item_parser = ItemParser()
+            self.item_parser = self.data_manager.item_parser
             
             logging.debug("Initializing CSVViewer")
-            self.csv_viewer = CSVViewer()
+            self.csv_viewer = CSVViewer(gear_store=self.data_manager.gear_store)
             
             logging.debug("Initializing SpellParser")
-            self.spell_parser = SpellParser()
+            self.spell_parser = self.data_manager.spell_parser
             logging.debug(f"SpellParser methods: {dir(self.spell_parser)}")
+
+            logging.debug("Initializing SearchPipeline")
+            self.search_pipeline = SearchPipeline(self.item_parser, self.web_utils)
+
+            # Each batch gets its own BatchLookup so a cancel only ends that batch
+            self.batch_lookup = None
+
+            logging.debug("Initializing SaveQueue")
+            self.save_queue = SaveQueue(self.data_manager)
+            # Saves are confirmed when queued; failed writes are reported later
+            self.root.after(SAVE_ERROR_POLL_MS, self._poll_save_errors)
             
             logging.debug("All utilities initialized successfully")
         except Exception as e:
@@ -147,6 +165,11 @@ class MainWindow:
         self.current_url = ""
         self.current_item_data = {}
         self.hyperlink_urls = {}
+        self.active_search = None
+        self._search_poll_id = None
+        self.batch_window = None
+        self.batch_events = queue.Queue()
+        self._batch_running = False
 
         # Stat Categories
         self.stat_categories = STAT_CATEGORIES
@@ -323,6 +346,16 @@ class MainWindow:
         )
         self.open_csv_button.grid(row=0, column=0, padx=(25, 25))
 
+        # Create Batch Lookup button
+        self.batch_button = ctk.CTkButton(
+            self.csv_button_frame,
+            text="Batch Lookup",
+            command=self.open_batch_window,
+            **button_colors
+        )
+        self.batch_button.grid(row=1, column=0, columnspan=2, pady=(10, 0))
+        ToolTip(self.batch_button, "Look up a whole gear list and save it to the class CSV")
+
         # Configure grid weights for both button frames
         self.button_frame.grid_columnconfigure(0, weight=1)
         self.button_frame.grid_columnconfigure(1, weight=1)
@@ -433,6 +466,7 @@ class MainWindow:
             cached_item = self.item_cache.get(cache_key)
             if cached_item:
                 logging.debug(f"Cache hit for item: {item_name}")
+                self._cancel_active_search()
                 self.results_text.config(state='normal')
                 self.results_text.delete(1.0, tk.END)
                 self.display_results(cached_item.get('ID'), 
@@ -447,73 +481,104 @@ class MainWindow:
                 self.hide_loading_indicator()
                 return
 
-            # If not in cache, fetch from web
-            logging.debug(f"Cache miss for item: {item_name}, fetching from web")
-            search_url = self.web_utils.format_search_url(item_name)
-            logging.debug(f"Formatted search URL: {search_url}")
-            
-            html_content = self.web_utils.get_page_content(search_url)
-            logging.debug("Retrieved search page content")
-            
-            item_id = self.item_parser.extract_item_id(html_content, item_name)
-            if not item_id:
-                logging.warning(f"No exact item match found for: {item_name}")
-                self._handle_similar_items(html_content)
-                # Don't auto-save when showing similar items
-                return
-
-            logging.debug(f"Found item ID: {item_id}")
-            item_url = self.web_utils.format_item_url(item_id)
-            logging.debug(f"Formatted item URL: {item_url}")
-            
-            html_content = self.web_utils.get_page_content(item_url)
-            logging.debug("Retrieved item page content")
-            
-            stats = self.item_parser.extract_item_stats(html_content)
-            if not stats:
-                logging.error("Failed to extract item stats")
-                self.results_text.insert(tk.END, "Failed to extract item stats. Check debug log for details.\n")
-                self.hide_loading_indicator()
-                return
-            
-            logging.debug(f"Successfully extracted stats for item: {item_name}")
-            
-            # Add ID and URL to stats before caching
-            stats['ID'] = item_id
-            stats['URL'] = item_url
-            
-            # Cache the item data
-            self.item_cache.set(item_name, stats)
-            logging.debug(f"Cached item data for: {item_name}")
-
-            # Cache any spell effects found
-            for effect_type in self.stat_categories['effects']:
-                details_key = f"{effect_type}_DETAILS"
-                if details_key in stats:
-                    effect_details = stats[details_key]
-                    spell_cache_key = f"{effect_details['name']}_{effect_details['id']}"
-                    self.spell_cache.set(spell_cache_key, effect_details)
-                    logging.debug(f"Cached spell data for: {effect_details['name']}")
-            
-            self.display_results(item_id, stats, item_url)
-            logging.info(f"Successfully completed search for: {item_name}")
-            
-            # Auto save if enabled and exact match found
-            if self.auto_save_var.get():
-                self.save_to_csv()
+            # If not in cache, fetch from web in the background, revalidating
+            # an expired entry rather than searching again when one is kept
+            stale_item = self.item_cache.get_stale(cache_key)
+            logging.debug(f"Cache miss for item: {item_name}, fetching from web "
+                          f"({'revalidating' if stale_item else 'full search'})")
+            self.active_search = self.search_pipeline.submit(item_name, stale_item)
+            self._schedule_search_poll()
                 
         except Exception as e:
-            error_msg = self.item_parser._handle_search_error(e)
+            self._cancel_active_search()
+            self.hide_loading_indicator()
             CTkMessagebox(
                 master=None,
                 title="Error",
-                message=error_msg,
+                message=self._handle_search_error(e),
                 icon="cancel"
             )
+
+    def _schedule_search_poll(self):
+        """Start draining search pipeline events if not already polling"""
+        if self._search_poll_id is None:
+            self._search_poll_id = self.root.after(SEARCH_POLL_INTERVAL_MS, self._poll_search_events)
+
+    def _poll_search_events(self):
+        """Apply events published by the search pipeline on the UI thread"""
+        self._search_poll_id = None
+        try:
+            while True:
+                task, kind, payload = self.search_pipeline.events.get_nowait()
+                if task is not self.active_search:
+                    logging.debug(f"Ignoring '{kind}' event from superseded search: {task.item_name}")
+                    continue
+                self._handle_search_event(kind, payload)
+        except queue.Empty:
+            pass
+        except Exception as e:
+            logging.error(f"Error processing search events: {e}", exc_info=True)
+
+        if self.active_search is not None:
+            self._schedule_search_poll()
+
+    @debug_log
+    def _handle_search_event(self, kind, payload):
+        """Update the results area for a single pipeline event"""
+        if kind == 'partial':
+            stats = payload['stats']
+            logging.debug(f"Displaying partial results for: {payload['item_name']}")
+            # Display only; the item becomes saveable once the search completes
+            self.display_results(stats.get('ID'), stats, stats.get('URL'), partial=True)
+            return
+
+        # Every other event ends the search
+        self.active_search = None
+        try:
+            if kind == 'found':
+                self._complete_search(payload['item_name'], payload['stats'])
+            elif kind == 'revalidated':
+                self._complete_search(payload['item_name'], payload['stats'], revalidated=True)
+            elif kind == 'similar':
+                self._handle_similar_items(payload['similar_items'])
+            elif kind == 'failed':
+                self.results_text.insert(tk.END, "Failed to extract item stats. Check debug log for details.\n")
+            elif kind == 'error':
+                CTkMessagebox(
+                    master=None,
+                    title="Error",
+                    message=self._handle_search_error(payload),
+                    icon="cancel"
+                )
         finally:
             self.hide_loading_indicator()
             logging.debug("Loading indicator hidden")
 
+    @debug_log
+    def _complete_search(self, item_name, stats, revalidated=False):
+        """Cache, display and optionally save a fully resolved item"""
+        # Cache the item data (spell effects are cached by SpellParser);
+        # an unchanged page only needs its cache timestamp refreshed
+        if revalidated:
+            self.item_cache.touch(item_name)
+            logging.debug(f"Refreshed cached item data for: {item_name}")
+        else:
+            self.item_cache.set(item_name, stats)
+            logging.debug(f"Cached item data for: {item_name}")
+        
+        self.display_results(stats.get('ID'), stats, stats.get('URL'))
+        logging.info(f"Successfully completed search for: {item_name}")
+        
+        # Auto save if enabled and exact match found
+        if self.auto_save_var.get():
+            self.save_to_csv()
+
+    def _cancel_active_search(self):
+        """Cancel a background search that is still running"""
+        if self.active_search is not None:
+            self.search_pipeline.cancel()
+            self.active_search = None
+
     @debug_log
     def save_to_csv(self):
         """Save current item data to CSV file"""
@@ -523,15 +588,16 @@ class MainWindow:
             logging.warning("Save requirements not met - operation cancelled")
             return
 
-        # Format class name to use underscore instead of space
-        formatted_class = self.class_var.get().lower().replace(' ', '_')
-        filename = f"{formatted_class}_gear_comparison.csv"
-        logging.debug(f"Target CSV file: {filename}")
+        class_name = self.class_var.get()
+        filename = self.data_manager.gear_location(class_name)
+        logging.debug(f"Target gear file: {filename}")
         
         try:
             # Check for duplicate entry
             item_name = self.current_item_data.get('Name')
-            if self.data_manager.check_duplicate_entry(filename, item_name):
+            item_id = self.current_item_data.get('ID')
+            if (self.save_queue.contains(class_name, item_name, item_id) or
+                    self.data_manager.check_duplicate_gear(class_name, item_name, item_id)):
                 logging.warning(f"Duplicate item found: {item_name}")
                 if self.auto_save_var.get():
                     # Show "Entry Already Exists" in search button temporarily
@@ -550,34 +616,23 @@ class MainWindow:
             logging.debug(f"Attempting to save item data for slot: {self.slot_var.get()}")
             logging.debug(f"Current item data: {self.current_item_data.get('Name', 'Unknown')}")
             
-            # Create slot mapping for ordering
-            slot_mapping = {slot: i for i, slot in enumerate(SLOTS)}
-            logging.debug("Created slot mapping for CSV ordering")
-            
-            success = self.data_manager.save_item_to_csv(
-                filename, 
-                self.current_item_data,
-                self.slot_var.get(),
-                slot_mapping
-            )
-            
-            if success:
-                logging.info(f"Successfully saved item data to {filename}")
-                if self.auto_save_var.get():
-                    # Show "Saved!" in search button temporarily
-                    self.root.after(500, lambda: self.search_button.configure(text="Saved!"))
-                    # Reset button text after 3 seconds
-                    self.root.after(3000, lambda: self.search_button.configure(text="Search Item"))
-                else:
-                    CTkMessagebox(
-                        master=None,
-                        title="Success",
-                        message=f"Saved to {filename}",
-                        icon="check"
-                    )
+            # Written in the background together with any saves close behind it,
+            # so the feedback below does not wait for the file
+            self.save_queue.enqueue(class_name, self.current_item_data, self.slot_var.get())
+            logging.info(f"Queued item data for {filename}")
+
+            if self.auto_save_var.get():
+                # Show "Saved!" in search button temporarily
+                self.root.after(500, lambda: self.search_button.configure(text="Saved!"))
+                # Reset button text after 3 seconds
+                self.root.after(3000, lambda: self.search_button.configure(text="Search Item"))
             else:
-                logging.error("Data manager reported save failure")
-                raise Exception("Failed to save data")
+                CTkMessagebox(
+                    master=None,
+                    title="Success",
+                    message=f"Saved to {filename}",
+                    icon="check"
+                )
                 
         except Exception as e:
             logging.error(f"Error during save operation: {e}", exc_info=True)
@@ -627,7 +682,8 @@ class MainWindow:
             logging.debug("Scheduled window focus handling")
             
             # Create CSV viewer instance and display data
-            self.csv_viewer = CSVViewer()
+            self.save_queue.flush()
+            self.csv_viewer = CSVViewer(gear_store=self.data_manager.gear_store)
             self.csv_viewer.set_colorize(self.csv_colorize_var.get())
             
             logging.debug(f"Loading CSV data for class: {self.class_var.get()}")
@@ -664,6 +720,8 @@ class MainWindow:
         """Clear search results and reset fields"""
         try:
             logging.debug("Clearing all results and resetting fields")
+            self._cancel_active_search()
+            self.hide_loading_indicator()
             self.results_text.delete(1.0, tk.END)
             self.item_name.set("")
             self.current_item_data.clear()
@@ -673,10 +731,160 @@ class MainWindow:
         except Exception as e:
             logging.error(f"Error clearing results: {e}", exc_info=True)
 
+    # Batch Lookup Methods
+    @debug_log
+    def open_batch_window(self):
+        """Open the batch lookup window with a multi-line gear list entry"""
+        try:
+            if self.batch_window is not None and self.batch_window.winfo_exists():
+                self.batch_window.focus()
+                return
+
+            self.batch_window = ctk.CTkToplevel(self.root)
+            self.batch_window.title("Batch Lookup")
+            self.batch_window.geometry("520x640")
+            self.batch_window.protocol("WM_DELETE_WINDOW", self._close_batch_window)
+            self.batch_window.grid_columnconfigure(0, weight=1)
+            self.batch_window.grid_rowconfigure(1, weight=1)
+            self.batch_window.grid_rowconfigure(4, weight=1)
+
+            ctk.CTkLabel(
+                self.batch_window,
+                text="One item per line, as \"Slot: Item Name\" or just \"Item Name\"\n"
+                     "(saved under the selected slot). Saved to the selected class CSV.",
+                justify="left"
+            ).grid(row=0, column=0, sticky='w', padx=10, pady=(10, 5))
+
+            self.batch_text = ctk.CTkTextbox(self.batch_window, height=200, wrap='none')
+            self.batch_text.grid(row=1, column=0, sticky='nsew', padx=10)
+
+            self.batch_run_button = ctk.CTkButton(
+                self.batch_window,
+                text="Look Up and Save",
+                command=self.run_batch,
+                **self.get_button_colors()
+            )
+            self.batch_run_button.grid(row=2, column=0, pady=10)
+
+            self.batch_progress = ctk.CTkProgressBar(self.batch_window)
+            self.batch_progress.set(0)
+            self.batch_progress.grid(row=3, column=0, sticky='ew', padx=10)
+
+            self.batch_log = tk.Text(
+                self.batch_window,
+                height=12,
+                wrap=tk.WORD,
+                **self.get_text_colors()
+            )
+            self.batch_log.grid(row=4, column=0, sticky='nsew', padx=10, pady=10)
+            self.batch_log.bind("<Key>", lambda e: "break")
+            logging.debug("Batch lookup window opened")
+        except Exception as e:
+            logging.error(f"Failed to open batch lookup window: {e}", exc_info=True)
+
+    @debug_log
+    def run_batch(self):
+        """Parse the gear list and resolve it in the background"""
+        if self._batch_running:
+            return
+        if not self.class_var.get():
+            CTkMessagebox(
+                master=None,
+                title="Warning",
+                message="Please select a class first",
+                icon="warning"
+            )
+            return
+
+        entries, errors = parse_gear_list(self.batch_text.get("1.0", tk.END),
+                                          default_slot=self.slot_var.get() or None)
+        self.batch_log.delete(1.0, tk.END)
+        for error in errors:
+            self.batch_log.insert(tk.END, f"{error}\n")
+        if not entries:
+            self.batch_log.insert(tk.END, "No items to look up\n")
+            return
+
+        logging.info(f"Starting batch lookup of {len(entries)} items")
+        self._batch_running = True
+        self.batch_run_button.configure(text="Looking Up...", state="disabled")
+        self.batch_progress.set(0)
+        class_name = self.class_var.get()
+        # Created before the worker starts so closing the window at once still cancels it
+        batch_lookup = self.batch_lookup = BatchLookup(self.search_pipeline, self.item_cache)
+
+        def worker():
+            try:
+                summary = batch_lookup.run(
+                    entries,
+                    on_progress=lambda result, done, total: self.batch_events.put(('progress', (result, done, total)))
+                )
+                saved = (save_batch(self.data_manager, class_name, summary['results'])
+                         if summary['resolved'] else None)
+                self.batch_events.put(('done', (summary, saved)))
+            except Exception as e:
+                logging.error(f"Batch lookup failed: {e}", exc_info=True)
+                self.batch_events.put(('error', e))
+
+        threading.Thread(target=worker, name='batch-runner', daemon=True).start()
+        self.root.after(SEARCH_POLL_INTERVAL_MS, self._poll_batch_events)
+
+    def _poll_batch_events(self):
+        """Apply batch progress events on the UI thread"""
+        try:
+            while True:
+                kind, payload = self.batch_events.get_nowait()
+                self._handle_batch_event(kind, payload)
+        except queue.Empty:
+            pass
+        except Exception as e:
+            logging.error(f"Error processing batch events: {e}", exc_info=True)
+
+        if self._batch_running:
+            self.root.after(SEARCH_POLL_INTERVAL_MS, self._poll_batch_events)
+
+    def _handle_batch_event(self, kind, payload):
+        """Update the batch window for a single event"""
+        window_open = self.batch_window is not None and self.batch_window.winfo_exists()
+        if kind == 'progress':
+            result, done, total = payload
+            if window_open:
+                self.batch_progress.set(done / total)
+                self.batch_log.insert(tk.END, f"[{done}/{total}] {result.entry.slot}: "
+                                              f"{result.entry.item_name} - {result.status}\n")
+                self.batch_log.see(tk.END)
+            return
+
+        # 'done' and 'error' end the run
+        self._batch_running = False
+        if kind == 'done':
+            summary, saved = payload
+            message = format_summary(summary, saved)
+            if summary['resolved'] and saved is None:
+                message += "\nFailed to save to CSV. Check debug log for details."
+        else:
+            message = self._handle_search_error(payload)
+        logging.info(f"Batch lookup finished: {message.splitlines()[0]}")
+        if window_open:
+            self.batch_log.insert(tk.END, f"\n{message}\n")
+            self.batch_log.see(tk.END)
+            self.batch_run_button.configure(text="Look Up and Save", state="normal")
+
+    def _close_batch_window(self):
+        """Stop a running batch and close its window"""
+        if self._batch_running:
+            self.batch_lookup.cancel()
+        self.batch_window.destroy()
+        self.batch_window = None
+
     # Display Methods
     @debug_log
-    def display_results(self, item_id, stats, url):
-        """Format and display the results"""
+    def display_results(self, item_id, stats, url, partial=False):
+        """Format and display the results
+
+        Partial results of a running search are shown without replacing
+        the current item data that Save writes.
+        """
         try:
             logging.debug(f"Starting to display results for item ID: {item_id}")
             
@@ -688,6 +896,8 @@ class MainWindow:
             self._display_sections(stats)
             logging.debug("Completed displaying all sections")
             
+            if partial:
+                return
             self.current_url = url
             self.current_item_data = stats.copy()
             logging.debug(f"Updated current item data for: {stats.get('Name', 'Unknown')}")
@@ -989,9 +1199,11 @@ class MainWindow:
         """Toggle debug logging based on checkbox state"""
         if self.debug_var.get():
             logging.getLogger().setLevel(logging.DEBUG)
+            set_debug_mode(True)
             logging.debug("Debug mode enabled")
         else:
             logging.getLogger().setLevel(logging.INFO)
+            set_debug_mode(False)
             logging.info("Debug mode disabled")
 
     @debug_log
@@ -1401,7 +1613,10 @@ class MainWindow:
                     f"Are you sure you want to clear all caches?\n\n"
                     f"Items in cache: {stats['items']}\n"
                     f"Spells in cache: {stats['spells']}\n"
-                    f"Total entries: {stats['total']}"
+                    f"Total entries: {stats['total']}\n\n"
+                    f"Spell fetches saved this session: {stats['spell_hits']}\n"
+                    f"Entries evicted to stay under the size limit: "
+                    f"{stats['evictions']['items']['evicted'] + stats['evictions']['spells']['evicted']}"
                 )
             else:
                 count, age = self.data_manager.get_cache_stats(cache_type)
@@ -1536,10 +1751,9 @@ class MainWindow:
             )
 
     @debug_log
-    def _handle_similar_items(self, html_content):
+    def _handle_similar_items(self, similar_items):
         """Handle case when no exact item match is found"""
         try:
-            similar_items = self.item_parser.process_similar_items(html_content)
             if similar_items and len(similar_items) > 0:
                 self.display_similar_items(similar_items)
             else:
@@ -1560,6 +1774,16 @@ class MainWindow:
         try:
             logging.debug("Validating save requirements")
             
+            if self.active_search is not None:
+                logging.warning("Save attempted while a search is still running")
+                CTkMessagebox(
+                    master=None,
+                    title="Warning",
+                    message="Please wait for the search to finish",
+                    icon="warning"
+                )
+                return False
+
             if not self.current_item_data:
                 logging.warning("Save attempted without item data")
                 CTkMessagebox(
@@ -1587,6 +1811,21 @@ class MainWindow:
             logging.error(f"Error validating save requirements: {e}", exc_info=True)
             return False
 
+    def _poll_save_errors(self):
+        """Tell the user about queued saves that keep failing to write"""
+        try:
+            while True:
+                class_name, item_names = self.save_queue.errors.get_nowait()
+                self._handle_save_error(
+                    f"{', '.join(item_names)} could not be written to "
+                    f"{self.data_manager.gear_location(class_name)}. Retrying in the background."
+                )
+        except queue.Empty:
+            pass
+        except Exception as e:
+            logging.error(f"Error checking for failed saves: {e}", exc_info=True)
+        self.root.after(SAVE_ERROR_POLL_MS, self._poll_save_errors)
+
     @debug_log
     def _show_save_success(self, filename):
         """Show success message after saving"""
@@ -1611,6 +1850,16 @@ class MainWindow:
             logging.error(f"Error showing save success message: {e}", exc_info=True)
 
     # Error Handling Methods
+    @debug_log
+    def _handle_search_error(self, error):
+        """Log a search error and return the message to show the user"""
+        try:
+            logging.error(f"Search failed: {error}", exc_info=error)
+            return f"Search failed: {str(error)}"
+        except Exception as e:
+            logging.error(f"Error handling search error: {e}", exc_info=True)
+            return "Search failed. Check logs for details."
+
     @debug_log
     def _handle_save_error(self, error):
         """Handle save-related errors"""
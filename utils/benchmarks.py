@@ -0,0 +1,519 @@
+# utils/benchmarks.py
+"""Performance checks run from the command line
+
+    python -m utils.benchmarks <name> [options]
+
+Each benchmark prints its measurements and exits non-zero when a
+configured budget is exceeded.
+"""
+import argparse
+import glob
+import logging
+import json
+import os
+import re
+import subprocess
+import sys
+import timeit
+
+BENCHMARKS = {}
+
+
+def benchmark(name, help_text):
+    """Register a benchmark taking parsed arguments and returning an exit code"""
+    def register(func):
+        BENCHMARKS[name] = (func, help_text)
+        return func
+    return register
+
+
+def _read_pages(paths):
+    """Read HTML pages from files and directories of *.html files"""
+    pages = []
+    for path in paths:
+        files = (sorted(glob.glob(os.path.join(path, '*.htm*'))) if os.path.isdir(path)
+                 else [path])
+        for file_path in files:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                pages.append(f.read())
+    return pages
+
+
+# Benchmarks
+@benchmark('stat-scanner', 'Time the fused stat scan and each stat rule on its own')
+def bench_stat_scanner(args):
+    import re
+    from core.item_parser import ItemParser
+    from utils.stat_names import stat_name_table
+
+    pages = _read_pages(args.pages)
+    if not pages:
+        print("No pages given")
+        return 2
+
+    parser = ItemParser()
+    texts = [re.sub(r'Value:\s*[-+]?\d+', '', parser._scan_page(page)[1]) for page in pages]
+
+    fused_seconds = 0.0
+    rules = {}
+    for text in texts:
+        profile = parser.stat_scanner.profile(text, repeat=args.repeat)
+        fused_seconds += profile['fused_seconds']
+        for name, timing in profile['rules'].items():
+            rule = rules.setdefault(name, {'seconds': 0.0, 'matches': 0})
+            rule['seconds'] += timing['seconds']
+            rule['matches'] += timing['matches']
+
+    scans = len(texts) * args.repeat
+    separate_seconds = sum(rule['seconds'] for rule in rules.values())
+    print(f"{len(texts)} pages x {args.repeat} repeats")
+    print(f"{'rule':<16}{'us/page':>10}{'matches':>9}")
+    for name, rule in sorted(rules.items(), key=lambda item: -item[1]['seconds']):
+        print(f"{name:<16}{rule['seconds'] / scans * 1e6:>10.1f}{rule['matches']:>9}")
+    print(f"{'separate total':<16}{separate_seconds / scans * 1e6:>10.1f}")
+    print(f"{'fused scan':<16}{fused_seconds / scans * 1e6:>10.1f}")
+
+    stat_name_table.reset_stats()
+    for text in texts:
+        parser.stat_scanner.scan(text, {})
+    names = stat_name_table.get_stats()
+    print(f"stat name table: {names['hit_rate']:.1%} hits "
+          f"({names['preloaded']} preloaded, {names['memoized']} memoized)")
+
+    if args.budget_us is not None and fused_seconds / scans * 1e6 > args.budget_us:
+        print(f"FAIL: fused scan exceeds {args.budget_us}us per page")
+        return 1
+    return 0
+
+
+@benchmark('debug-log', 'Per-call overhead of @debug_log with debug mode off and on')
+def bench_debug_log(args):
+    from utils import decorators
+
+    def probing_log(func):
+        # The wrapper every call went through before debug mode was global
+        def wrapper(*args, **kwargs):
+            debug_enabled = False
+            try:
+                if args and hasattr(args[0], 'debug_var'):
+                    debug_enabled = args[0].debug_var.get()
+                if 'debug' in kwargs:
+                    debug_enabled = debug_enabled or kwargs['debug']
+            except (AttributeError, TypeError):
+                debug_enabled = False
+            is_periodic = func.__name__ in ['dropdown_checker']
+            if debug_enabled and not is_periodic:
+                logging.debug("%s completed", func.__name__)
+            return func(*args, **kwargs)
+        return wrapper
+
+    class Probe:
+        def __init__(self):
+            # Parsers carry debug_var = None, as ItemParser and SpellParser do
+            self.debug_var = None
+
+        def baseline(self, value):
+            return value
+
+        @probing_log
+        def probing(self, value):
+            return value
+
+        @decorators.debug_log
+        def decorated(self, value):
+            return value
+
+    probe = Probe()
+    was_enabled = decorators.is_debug_enabled()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    def per_call_ns(method):
+        seconds = min(timeit.repeat(lambda: method(1), number=args.calls, repeat=5))
+        return seconds / args.calls * 1e9
+
+    try:
+        decorators.set_debug_mode(False)
+        timings = [
+            ('undecorated', per_call_ns(probe.baseline)),
+            ('flag probing', per_call_ns(probe.probing)),
+            ('debug off', per_call_ns(probe.decorated)),
+        ]
+        decorators.set_debug_mode(True)
+        timings.append(('debug on', per_call_ns(probe.decorated)))
+    finally:
+        decorators.set_debug_mode(was_enabled)
+
+    baseline_ns = timings[0][1]
+    print(f"{args.calls} calls, best of 5")
+    print(f"{'variant':<14}{'ns/call':>9}{'overhead':>10}")
+    for name, ns in timings:
+        print(f"{name:<14}{ns:>9.1f}{ns - baseline_ns:>10.1f}")
+
+    overhead_ns = timings[2][1] - baseline_ns
+    if args.budget_ns is not None and overhead_ns > args.budget_ns:
+        print(f"FAIL: debug-off overhead exceeds {args.budget_ns}ns per call")
+        return 1
+    return 0
+
+
+@benchmark('cli-import', 'Import time of the headless CLI and a check that it loads no GUI modules')
+def bench_cli_import(args):
+    # Each run gets a fresh interpreter so nothing is already imported
+    probe = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import lazgearcompare.cli as cli\n"
+        "seconds = time.perf_counter() - start\n"
+        "gui = sorted(name for name in sys.modules\n"
+        "             if name.split('.')[0] in cli.GUI_MODULES)\n"
+        "print(json.dumps({'seconds': seconds, 'gui': gui, 'modules': len(sys.modules)}))\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    runs = []
+    for _ in range(args.repeat):
+        output = subprocess.run([sys.executable, '-c', probe], cwd=root, check=True,
+                                capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    best_ms = min(run['seconds'] for run in runs) * 1000
+    gui = runs[0]['gui']
+    print(f"import lazgearcompare.cli: best {best_ms:.1f}ms of {args.repeat}, "
+          f"{runs[0]['modules']} modules loaded")
+
+    if gui:
+        print(f"FAIL: GUI modules imported: {', '.join(gui)}")
+        return 1
+    if args.budget_ms is not None and best_ms > args.budget_ms:
+        print(f"FAIL: import exceeds {args.budget_ms}ms")
+        return 1
+    return 0
+
+
+@benchmark('startup', 'Cold start to first paint of the main window, against STARTUP_BUDGET_MS')
+def bench_startup(args):
+    from config.settings import STARTUP_BUDGET_MS
+
+    budget_ms = args.budget_ms if args.budget_ms is not None else STARTUP_BUDGET_MS
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    paints = []
+    for run in range(args.repeat):
+        process = subprocess.run([sys.executable, 'main.py', '--profile-startup'], cwd=root,
+                                 capture_output=True, text=True)
+        if 'TclError' in process.stderr and 'display' in process.stderr:
+            print("SKIP: no display available to open the main window")
+            return 0
+        match = re.search(r'first paint ([\d.]+)ms', process.stdout)
+        if not match:
+            print(process.stdout + process.stderr)
+            print("FAIL: main.py --profile-startup did not report a first paint")
+            return 1
+        paints.append(float(match.group(1)))
+        if run == 0 and args.verbose:
+            print(process.stdout)
+
+    print(f"first paint: first run {paints[0]:.1f}ms, best {min(paints):.1f}ms "
+          f"of {len(paints)}, budget {budget_ms}ms")
+    # The first run is the cold start the budget is about
+    if paints[0] > budget_ms:
+        print(f"FAIL: cold start first paint exceeds {budget_ms}ms")
+        return 1
+    return 0
+
+
+@benchmark('fetch', 'Load-test concurrent page fetches against a replayed cassette')
+def bench_fetch(args):
+    import statistics
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+    from utils.cassette import Cassette, ReplayPolicy, ReplayServer
+    from utils.web import WebUtils
+
+    cassette = Cassette(args.cassette)
+    bodies = {url: cassette.get(url)['body'] for url in cassette.urls()}
+    if not bodies:
+        print(f"No recorded responses in {args.cassette}")
+        return 2
+    urls = list(bodies) * args.repeat
+
+    policy = ReplayPolicy(args.latency_ms, args.jitter_ms, args.error_rate, args.error_mode, args.seed)
+    server = None
+    if args.in_process:
+        WebUtils.set_replay(cassette, policy)
+    else:
+        server = ReplayServer(cassette, policy).start()
+        WebUtils.set_replay(server_url=server.url)
+
+    web_utils = WebUtils()
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+
+    def fetch(url):
+        start = time.perf_counter()
+        try:
+            ok = web_utils.get_page_content(url) == bodies[url]
+            error = None if ok else 'unexpected response'
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        with lock:
+            latencies.append(time.perf_counter() - start)
+            if error:
+                failures.append((url, error))
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            list(executor.map(fetch, urls))
+        elapsed = time.perf_counter() - start
+    finally:
+        WebUtils.set_replay()
+        if server:
+            server.stop()
+
+    stats = policy.get_stats()
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    mode = 'in-process' if args.in_process else 'replay server'
+    print(f"{len(urls)} fetches ({mode}, {args.workers} workers) in {elapsed:.2f}s: "
+          f"{len(urls) / elapsed:.1f} pages/s")
+    print(f"latency: median {statistics.median(latencies) * 1000:.1f}ms, p95 {p95 * 1000:.1f}ms")
+    print(f"requests sent {stats['requests']}, injected errors {stats['injected_errors']}, "
+          f"retries {stats['requests'] - len(urls)}, failed fetches {len(failures)}")
+    for url, error in failures[:5]:
+        print(f"  {url}: {error}")
+
+    if args.max_failures is not None and len(failures) > args.max_failures:
+        print(f"FAIL: more than {args.max_failures} fetches failed")
+        return 1
+    return 0
+
+
+@benchmark('csv-save', 'Latency of saving and duplicate-checking one item against class CSV size')
+def bench_csv_save(args):
+    import csv
+    import random
+    import tempfile
+    import time
+    from config.constraints import SLOTS, SLOT_ORDER, STAT_CATEGORIES
+    from core.data_manager import DataManager
+    from core.gear_store import SqliteGearStore
+
+    def legacy_save(filename, item_data, slot):
+        # The read, sort and rewrite every save did before rows were appended
+        with open(filename, 'r', newline='') as file:
+            reader = csv.DictReader(file)
+            headers = set(reader.fieldnames)
+            existing_data = list(reader)
+        headers.add('Slot')
+        headers.update(item_data.keys())
+        ordered_headers = ['Slot'] + sorted(headers - {'Slot'})
+        new_row = {'Slot': slot}
+        new_row.update(item_data)
+        existing_data.append(new_row)
+        existing_data.sort(key=lambda x: SLOT_ORDER.get(x['Slot'], float('inf')))
+        with open(filename, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=ordered_headers, quoting=csv.QUOTE_MINIMAL)
+            writer.writeheader()
+            writer.writerows(existing_data)
+
+    def legacy_duplicate_check(filename, item_name):
+        # The row-by-row scan each duplicate check did before the gear index
+        with open(filename, 'r', newline='') as file:
+            return any(row.get('Name') == item_name for row in csv.DictReader(file))
+
+    def check_ms(check, filename):
+        seconds = min(timeit.repeat(lambda: check(filename, 'Not Saved'), number=5, repeat=3))
+        return seconds / 5 * 1000
+
+    rng = random.Random(0)
+    stat_columns = [stat for stats in STAT_CATEGORIES.values() for stat in stats
+                    if stat not in ('Name', 'ID', 'URL')]
+    counter = iter(range(1, 10 ** 9))
+
+    def make_item():
+        item_id = next(counter)
+        item = {'Name': f"Item {item_id}", 'ID': str(item_id),
+                'URL': f"https://www.lazaruseq.com/Alla/?a=item&id={item_id}"}
+        item.update({stat: str(rng.randint(1, 50)) for stat in stat_columns})
+        return item
+
+    def time_saves(save, filename):
+        timings = []
+        for _ in range(args.saves):
+            item = make_item()
+            start = time.perf_counter()
+            save(filename, item, rng.choice(SLOTS))
+            timings.append(time.perf_counter() - start)
+        return sorted(timings)[len(timings) // 2] * 1000
+
+    previous_cwd = os.getcwd()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        # DataManager opens its caches in the working directory
+        os.chdir(directory)
+        try:
+            data_manager = DataManager()
+            for rows in args.rows:
+                filename = os.path.join(directory, f"bench_{rows}.csv")
+                data_manager.save_items_to_csv(filename, [(make_item(), rng.choice(SLOTS))
+                                                          for _ in range(rows)])
+                size_kb = os.path.getsize(filename) / 1024
+                append_ms = time_saves(data_manager.save_item_to_csv, filename)
+                legacy_ms = time_saves(legacy_save, filename)
+                index_check_ms = check_ms(data_manager.check_duplicate_entry, filename)
+                scan_check_ms = check_ms(legacy_duplicate_check, filename)
+
+                new_column_item = make_item()
+                new_column_item[f"NEW COLUMN {rows}"] = '1'
+                start = time.perf_counter()
+                data_manager.save_item_to_csv(filename, new_column_item, 'Charm')
+                rewrite_ms = (time.perf_counter() - start) * 1000
+
+                gear_store = SqliteGearStore(os.path.join(directory, f"bench_{rows}.db"))
+                gear_store.save_items('Bench', [(make_item(), rng.choice(SLOTS)) for _ in range(rows)])
+                sqlite_ms = time_saves(lambda _, item, slot: gear_store.save_items('Bench', [(item, slot)]),
+                                       None)
+                sqlite_check_ms = check_ms(lambda _, name: gear_store.find('Bench', name), None)
+                gear_store.close()
+
+                results.append((rows, size_kb, append_ms, legacy_ms, rewrite_ms, index_check_ms,
+                                scan_check_ms, sqlite_ms, sqlite_check_ms))
+            data_manager.close()
+        finally:
+            os.chdir(previous_cwd)
+
+    print(f"median of {args.saves} saves per file size, {len(stat_columns) + 4} columns")
+    print(f"{'rows':>6}{'size KB':>9}{'append ms':>11}{'legacy ms':>11}{'new column ms':>15}"
+          f"{'dup check ms':>14}{'dup scan ms':>13}{'sqlite ms':>11}{'sqlite dup ms':>15}")
+    for (rows, size_kb, append_ms, legacy_ms, rewrite_ms, index_check_ms, scan_check_ms,
+         sqlite_ms, sqlite_check_ms) in results:
+        print(f"{rows:>6}{size_kb:>9.0f}{append_ms:>11.2f}{legacy_ms:>11.2f}{rewrite_ms:>15.2f}"
+              f"{index_check_ms:>14.3f}{scan_check_ms:>13.2f}{sqlite_ms:>11.2f}{sqlite_check_ms:>15.3f}")
+
+    largest_append_ms = results[-1][2]
+    if args.budget_ms is not None and largest_append_ms > args.budget_ms:
+        print(f"FAIL: saving to a {results[-1][0]} row file exceeds {args.budget_ms}ms")
+        return 1
+    return 0
+
+
+@benchmark('effect-cells', 'Resolving effect cells: spell table lookups against parsing stored dicts')
+def bench_effect_cells(args):
+    import ast
+    import io
+    import random
+    from config.constraints import STAT_CATEGORIES
+    from core.spell_table import normalize_effects
+
+    rng = random.Random(0)
+    spells = [{'name': f"Spell {spell_id}", 'id': str(spell_id),
+               'url': f"https://www.lazaruseq.com/Alla/?a=spell&id={spell_id}",
+               'effects': [f"{effect}: Increase Hitpoints by {rng.randint(1, 50)}" for effect in range(1, 5)]}
+              for spell_id in range(1000, 1000 + args.spells)]
+    effects = STAT_CATEGORIES['effects']
+    legacy_cells = []
+    rows = []
+    spell_map = {}
+    for _ in range(args.rows):
+        item = {f"{effect}_DETAILS": dict(rng.choice(spells), charges='Unlimited')
+                for effect in effects if rng.random() < 0.5}
+        legacy_cells.extend(repr(details) for details in item.values())
+        row, row_spells = normalize_effects(item)
+        rows.append(row)
+        spell_map.update((spell['id'], spell) for spell in row_spells)
+    reference_cells = [row[column] for row in rows for column in row if column.endswith('_DETAILS')]
+
+    def parse_cells():
+        # What every render of the viewer did for each effect cell before the spell table
+        return [ast.literal_eval(cell)['name'] for cell in legacy_cells]
+
+    def lookup_cells():
+        return [spell_map[cell]['name'] for cell in reference_cells]
+
+    def per_cell_us(func):
+        seconds = min(timeit.repeat(func, number=args.repeat, repeat=3))
+        return seconds / args.repeat / len(legacy_cells) * 1e6
+
+    parse_us = per_cell_us(parse_cells)
+    lookup_us = per_cell_us(lookup_cells)
+    legacy_kb = len(''.join(legacy_cells).encode()) / 1024
+    table = io.StringIO()
+    table.writelines(json.dumps(spell) + '\n' for spell in spell_map.values())
+    reference_kb = (len(''.join(reference_cells).encode()) + len(table.getvalue().encode())) / 1024
+
+    print(f"{len(legacy_cells)} effect cells on {args.rows} rows, {len(spell_map)} distinct spells")
+    print(f"{'':>22}{'us per cell':>13}{'stored KB':>11}")
+    print(f"{'stored dicts':>22}{parse_us:>13.2f}{legacy_kb:>11.1f}")
+    print(f"{'spell ID + table':>22}{lookup_us:>13.3f}{reference_kb:>11.1f}")
+
+    if args.budget_us is not None and lookup_us > args.budget_us:
+        print(f"FAIL: resolving an effect cell exceeds {args.budget_us}us")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    """Run one benchmark by name"""
+    parser = argparse.ArgumentParser(prog='python -m utils.benchmarks')
+    subparsers = parser.add_subparsers(dest='name', required=True)
+
+    stat_parser = subparsers.add_parser('stat-scanner', help=BENCHMARKS['stat-scanner'][1])
+    stat_parser.add_argument('pages', nargs='+', help='Item page HTML files or directories')
+    stat_parser.add_argument('--repeat', type=int, default=20)
+    stat_parser.add_argument('--budget-us', type=float, default=None,
+                             help='Fail when the fused scan takes longer per page')
+
+    debug_parser = subparsers.add_parser('debug-log', help=BENCHMARKS['debug-log'][1])
+    debug_parser.add_argument('--calls', type=int, default=200000)
+    debug_parser.add_argument('--budget-ns', type=float, default=None,
+                              help='Fail when debug-off overhead per call is larger')
+
+    cli_parser = subparsers.add_parser('cli-import', help=BENCHMARKS['cli-import'][1])
+    cli_parser.add_argument('--repeat', type=int, default=5)
+    cli_parser.add_argument('--budget-ms', type=float, default=None,
+                            help='Fail when importing the CLI takes longer')
+
+    startup_parser = subparsers.add_parser('startup', help=BENCHMARKS['startup'][1])
+    startup_parser.add_argument('--repeat', type=int, default=3)
+    startup_parser.add_argument('--budget-ms', type=float, default=None,
+                                help='Override STARTUP_BUDGET_MS')
+    startup_parser.add_argument('--verbose', action='store_true',
+                                help='Print the import profile of the first run')
+
+    fetch_parser = subparsers.add_parser('fetch', help=BENCHMARKS['fetch'][1])
+    fetch_parser.add_argument('cassette', help='Cassette directory recorded with --record')
+    fetch_parser.add_argument('--workers', type=int, default=8)
+    fetch_parser.add_argument('--repeat', type=int, default=1, help='Fetch every recorded URL this many times')
+    fetch_parser.add_argument('--in-process', action='store_true',
+                              help='Replay without sockets; the session retry policy does not run')
+    fetch_parser.add_argument('--latency-ms', type=float, default=0.0)
+    fetch_parser.add_argument('--jitter-ms', type=float, default=0.0)
+    fetch_parser.add_argument('--error-rate', type=float, default=0.0)
+    fetch_parser.add_argument('--error-mode', choices=('status', 'reset'), default='status')
+    fetch_parser.add_argument('--seed', type=int, default=None)
+    fetch_parser.add_argument('--max-failures', type=int, default=None,
+                              help='Fail when more fetches than this fail after retries')
+
+    save_parser = subparsers.add_parser('csv-save', help=BENCHMARKS['csv-save'][1])
+    save_parser.add_argument('--rows', type=int, nargs='+', default=[100, 500, 2000],
+                             help='Existing rows in the CSV before timing saves')
+    save_parser.add_argument('--saves', type=int, default=20)
+    save_parser.add_argument('--budget-ms', type=float, default=None,
+                             help='Fail when a save to the largest file takes longer')
+
+    effect_parser = subparsers.add_parser('effect-cells', help=BENCHMARKS['effect-cells'][1])
+    effect_parser.add_argument('--rows', type=int, default=2000)
+    effect_parser.add_argument('--spells', type=int, default=50, help='Distinct effect spells')
+    effect_parser.add_argument('--repeat', type=int, default=5)
+    effect_parser.add_argument('--budget-us', type=float, default=None,
+                               help='Fail when resolving an effect cell takes longer')
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    func, _ = BENCHMARKS[args.name]
+    return func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,157 +1,356 @@
 # utils/cache.py
-import json
-import os
+import heapq
 import logging
 import time
-from typing import Dict, Any, Optional, Tuple
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from utils.decorators import debug_log
-from CTkMessagebox import CTkMessagebox
+from utils.cache_backends import create_backend
+from config.settings import CACHE_BACKEND, CACHE_COMPACT_THRESHOLD, CACHE_SWEEP_INTERVAL
 
 class CacheManager:
-    """Manages caching operations with size limits and duration controls"""
-    
+    """Manages caching operations with size limits and duration controls
+
+    The cache is kept under ``max_size_mb`` by evicting entries
+    automatically: expired entries go first, then the least recently used
+    ones. Entry sizes are tracked in memory, so no file stat is needed.
+
+    Timestamps are indexed in a min-heap with lazy deletion, so the oldest
+    entry is found without scanning the cache. A daemon thread purges
+    expired entries every ``sweep_interval`` seconds in a single backend
+    write; pass ``sweep_interval=0`` to disable it.
+
+    With a ``stale_duration``, expired entries are kept that much longer
+    so callers can revalidate them with ``get_stale`` and ``touch``
+    instead of fetching them again.
+    """
+
     def __init__(self, cache_file: str, cache_duration: int = 24 * 60 * 60,
-                is_item_cache: bool = False, max_size_mb: float = 100.0):
-        logging.debug(f"Initializing CacheManager for {cache_file}")
+                is_item_cache: bool = False, max_size_mb: float = 100.0,
+                backend: str = CACHE_BACKEND,
+                sweep_interval: float = CACHE_SWEEP_INTERVAL,
+                stale_duration: int = 0):
+        logging.debug(f"Initializing CacheManager for {cache_file} ({backend} backend)")
         self.cache_file = cache_file
         self.cache_duration = cache_duration
-        self.cache_data: Dict[str, Any] = {}
+        self.stale_duration = stale_duration
+        self.backend = create_backend(
+            backend, cache_file,
+            **({'compact_threshold': CACHE_COMPACT_THRESHOLD} if backend == 'journal' else {})
+        )
         self.is_item_cache = is_item_cache
-        if is_item_cache:
-            self.max_size_bytes = max_size_mb * 1024 * 1024
-            logging.debug(f"Item cache initialized with {max_size_mb}MB limit")
-        
-        # Ensure cache file exists
-        if not os.path.exists(self.cache_file):
-            logging.debug(f"Creating new cache file: {self.cache_file}")
-            self.save_cache()  # This will create the file with empty cache
-        else:
-            self.load_cache()
-        
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        logging.debug(f"Cache initialized with {max_size_mb}MB limit")
+
+        # Spell lookups run on worker threads, so guard all cache access
+        self._lock = threading.RLock()
+
+        # Entry sizes in least-recently-used-first order
+        self._entry_sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self.eviction_stats = {'expired': 0, 'evicted': 0}
+
+        # Expiry index: (timestamp, key) heap; stale pairs are skipped on pop
+        self._timestamps: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+
+        self.load_cache()
+
+        self.sweep_interval = sweep_interval
+        self._stop_sweeper = threading.Event()
+        self._sweeper = None
+        if sweep_interval > 0:
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop,
+                name=f"cache-sweeper-{cache_file}",
+                daemon=True
+            )
+            self._sweeper.start()
+
         logging.debug("CacheManager initialization complete")
 
     # Cache Size Management
     @debug_log
     def get_item_cache_size(self) -> Optional[Tuple[float, bool]]:
         """Get current cache size and check if it exceeds limit"""
-        if not self.is_item_cache:
-            logging.debug("Size check skipped - not an item cache")
-            return None
-            
-        try:
-            if os.path.exists(self.cache_file):
-                size_bytes = os.path.getsize(self.cache_file)
-                size_mb = size_bytes / (1024 * 1024)
-                is_exceeded = size_bytes > self.max_size_bytes
-                logging.debug(f"Cache size: {size_mb:.2f}MB, Limit exceeded: {is_exceeded}")
-                return size_mb, is_exceeded
-            logging.debug("Cache file does not exist")
-            return 0.0, False
-        except Exception as e:
-            logging.error(f"Error getting cache size: {e}", exc_info=True)
-            return 0.0, False
+        with self._lock:
+            size_bytes = self._total_bytes
+        size_mb = size_bytes / (1024 * 1024)
+        is_exceeded = size_bytes > self.max_size_bytes
+        logging.debug(f"Cache size: {size_mb:.2f}MB, Limit exceeded: {is_exceeded}")
+        return size_mb, is_exceeded
 
     @debug_log
-    def check_item_cache_size(self) -> bool:
-        """Check cache size and show warning if exceeded"""
-        if not self.is_item_cache:
-            return False
-            
-        size_info = self.get_item_cache_size()
-        if size_info and size_info[1]:
-            logging.warning(f"Cache size ({size_info[0]:.2f}MB) exceeds limit ({self.max_size_bytes/1024/1024:.2f}MB)")
-            msg = (f"Item cache size ({size_info[0]:.2f}MB) exceeds "
-                  f"recommended limit ({self.max_size_bytes/1024/1024:.2f}MB).")
-            response = CTkMessagebox(
-                title="Cache Size Warning",
-                message=f"{msg}\nWould you like to clear it?",
-                icon="warning",
-                option_1="Yes",
-                option_2="No"
-            ).get()
-            logging.debug(f"User response to cache clear prompt: {response}")
-            return response == "Yes"
-        return False
+    def get_eviction_stats(self) -> Dict[str, int]:
+        """Get counts of entries removed by expiry and by the size budget"""
+        with self._lock:
+            return dict(self.eviction_stats)
+
+    def _enforce_size_limit(self) -> None:
+        """Evict expired, then least recently used, entries until under budget
+
+        Entries kept for revalidation past their cache duration only stay
+        while the cache fits; under pressure they go before any fresh entry.
+        """
+        if self._total_bytes <= self.max_size_bytes:
+            return
+
+        logging.info(f"Cache size ({self._total_bytes / 1024 / 1024:.2f}MB) exceeds limit "
+                     f"({self.max_size_bytes / 1024 / 1024:.2f}MB), evicting entries")
+        expired = self._purge_expired_locked()
+        if self._total_bytes > self.max_size_bytes and self.stale_duration:
+            expired += self._purge_expired_locked(keep_stale=False)
+
+        evicted = []
+        remaining = self._total_bytes
+        # Never evict the most recently used entry, which is the one just set
+        for key in list(self._entry_sizes)[:-1]:
+            if remaining <= self.max_size_bytes:
+                break
+            evicted.append(key)
+            remaining -= self._entry_sizes[key]
+        if evicted:
+            self._remove(evicted)
+            self.eviction_stats['evicted'] += len(evicted)
+
+        logging.info(f"Evicted {expired} expired and {len(evicted)} least recently used entries "
+                     f"from {self.cache_file}")
+
+    def _remove(self, keys: Iterable[str]) -> None:
+        """Delete entries from the backend and the size index in one write"""
+        keys = list(keys)
+        self.backend.delete(keys)
+        for key in keys:
+            self._total_bytes -= self._entry_sizes.pop(key, 0)
+            self._timestamps.pop(key, None)
+
+    # Expiry Index Methods
+    def _index_timestamp(self, key: str, timestamp: float) -> None:
+        """Record an entry's timestamp, leaving any older heap pair stale"""
+        self._timestamps[key] = timestamp
+        heapq.heappush(self._expiry_heap, (timestamp, key))
+        # Rebuild once stale pairs dominate so the heap stays proportional
+        if len(self._expiry_heap) > 2 * len(self._timestamps) + 64:
+            self._rebuild_expiry_index()
+
+    def _rebuild_expiry_index(self) -> None:
+        self._expiry_heap = [(timestamp, key) for key, timestamp in self._timestamps.items()]
+        heapq.heapify(self._expiry_heap)
+
+    def _drop_stale_heap_head(self) -> None:
+        """Pop heap pairs for entries that were removed or rewritten"""
+        heap = self._expiry_heap
+        while heap and self._timestamps.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _purge_expired_locked(self, keep_stale: bool = True) -> int:
+        """Remove entries past the cache and stale durations; caller holds the lock
+
+        With ``keep_stale=False`` every entry past the cache duration goes.
+        """
+        cutoff = time.time() - self.cache_duration - (self.stale_duration if keep_stale else 0)
+        expired = []
+        heap = self._expiry_heap
+        self._drop_stale_heap_head()
+        while heap and heap[0][0] < cutoff:
+            _, key = heapq.heappop(heap)
+            expired.append(key)
+            self._drop_stale_heap_head()
+        if expired:
+            self._remove(expired)
+            self.eviction_stats['expired'] += len(expired)
+        return len(expired)
 
     # Cache Operations
     @debug_log
     def get(self, key: str) -> Any:
         """Get item from cache with expiration check"""
         key = key.lower()
-        if key in self.cache_data:
-            cached_item = self.cache_data[key]
-            current_time = time.time()
-            age = current_time - cached_item['timestamp']
-            
-            if age < self.cache_duration:
-                logging.debug(f"Cache hit for: {key} (age: {age:.1f}s)")
-                return cached_item['data']
+        with self._lock:
+            cached_item = self.backend.get(key)
+            if cached_item is not None:
+                current_time = time.time()
+                age = current_time - cached_item['timestamp']
+
+                if age < self.cache_duration:
+                    logging.debug(f"Cache hit for: {key} (age: {age:.1f}s)")
+                    if key in self._entry_sizes:
+                        self._entry_sizes.move_to_end(key)
+                    return cached_item['data']
+                elif age < self.cache_duration + self.stale_duration:
+                    logging.debug(f"Cache stale for: {key} (age: {age:.1f}s)")
+                else:
+                    logging.debug(f"Cache expired for: {key} (age: {age:.1f}s)")
+                    self._remove([key])
+                    self.eviction_stats['expired'] += 1
             else:
-                logging.debug(f"Cache expired for: {key} (age: {age:.1f}s)")
-                del self.cache_data[key]
-        else:
-            logging.debug(f"Cache miss for: {key}")
+                logging.debug(f"Cache miss for: {key}")
         return None
 
     @debug_log
     def set(self, key: str, value: Any) -> None:
-        """Set cache value and check size limits"""
+        """Set cache value and evict entries beyond the size limit"""
         key = key.lower()
         logging.debug(f"Caching item: {key}")
-        self.cache_data[key] = {
-            'data': value,
-            'timestamp': time.time()
-        }
-        self.save_cache()
-        
-        if self.is_item_cache:
-            if self.check_item_cache_size():
-                logging.info("Cache size limit exceeded, clearing cache")
-                self.clear()
+        try:
+            with self._lock:
+                timestamp = time.time()
+                size = self.backend.put(key, {
+                    'data': value,
+                    'timestamp': timestamp
+                })
+                self._total_bytes += size - self._entry_sizes.pop(key, 0)
+                self._entry_sizes[key] = size
+                self._index_timestamp(key, timestamp)
+                self._enforce_size_limit()
+        except Exception as e:
+            logging.error(f"Error saving cache entry: {e}", exc_info=True)
+
+    @debug_log
+    def get_stale(self, key: str) -> Any:
+        """Get item from cache regardless of age, for revalidation"""
+        key = key.lower()
+        with self._lock:
+            cached_item = self.backend.get(key)
+            return cached_item['data'] if cached_item is not None else None
+
+    @debug_log
+    def touch(self, key: str) -> bool:
+        """Reset an entry's timestamp without changing its data"""
+        key = key.lower()
+        try:
+            with self._lock:
+                cached_item = self.backend.get(key)
+                if cached_item is None:
+                    return False
+                logging.debug(f"Refreshing cache timestamp for: {key}")
+                timestamp = time.time()
+                size = self.backend.put(key, {
+                    'data': cached_item['data'],
+                    'timestamp': timestamp
+                })
+                self._total_bytes += size - self._entry_sizes.pop(key, 0)
+                self._entry_sizes[key] = size
+                self._index_timestamp(key, timestamp)
+                self._enforce_size_limit()
+                return True
+        except Exception as e:
+            logging.error(f"Error refreshing cache entry: {e}", exc_info=True)
+            return False
+
+    @debug_log
+    def set_many(self, items: Dict[str, Any]) -> int:
+        """Set several cache values in one backend write"""
+        try:
+            with self._lock:
+                timestamp = time.time()
+                entries = [(key.lower(), {'data': value, 'timestamp': timestamp})
+                           for key, value in items.items()]
+                sizes = self.backend.put_many(entries)
+                for (key, _), size in zip(entries, sizes):
+                    self._total_bytes += size - self._entry_sizes.pop(key, 0)
+                    self._entry_sizes[key] = size
+                    self._index_timestamp(key, timestamp)
+                self._enforce_size_limit()
+            logging.debug(f"Cached {len(entries)} entries in {self.cache_file}")
+            return len(entries)
+        except Exception as e:
+            logging.error(f"Error saving cache entries: {e}", exc_info=True)
+            return 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.backend)
+
+    @debug_log
+    def oldest_timestamp(self) -> Optional[float]:
+        """Get the timestamp of the oldest entry, or None when empty"""
+        with self._lock:
+            self._drop_stale_heap_head()
+            return self._expiry_heap[0][0] if self._expiry_heap else None
+
+    @debug_log
+    def purge_expired(self, keep_stale: bool = True) -> int:
+        """Delete expired entries in one write
+
+        Entries past the cache duration but inside the stale window are kept
+        for revalidation unless ``keep_stale`` is False.
+        """
+        try:
+            with self._lock:
+                purged = self._purge_expired_locked(keep_stale)
+            logging.debug(f"Purged {purged} expired entries from {self.cache_file}")
+            return purged
+        except Exception as e:
+            logging.error(f"Error purging expired entries: {e}", exc_info=True)
+            return 0
 
     # Cache File Operations
     @debug_log
     def clear(self) -> int:
-        """Clear cache and remove cache file"""
-        cache_size = len(self.cache_data)
-        logging.info(f"Clearing cache containing {cache_size} items")
-        
+        """Clear cache and reset the cache file"""
         try:
-            # Clear the cache data
-            self.cache_data.clear()
-            
-            # Create empty cache file
-            self.save_cache()
+            with self._lock:
+                cache_size = len(self.backend)
+                logging.info(f"Clearing cache containing {cache_size} items")
+                self.backend.clear()
+                self._entry_sizes.clear()
+                self._total_bytes = 0
+                self._timestamps.clear()
+                self._expiry_heap.clear()
             logging.info("Cache cleared and empty file created")
-                
+
             return cache_size
-            
+
         except Exception as e:
             logging.error(f"Error clearing cache: {e}", exc_info=True)
             return 0
 
     @debug_log
     def load_cache(self) -> None:
-        """Load cache from file"""
+        """Load cache from file and rebuild the size index"""
         try:
-            if os.path.exists(self.cache_file):
-                logging.debug(f"Loading cache from: {self.cache_file}")
-                with open(self.cache_file, 'r') as f:
-                    self.cache_data = json.load(f)
-                logging.info(f"Successfully loaded {len(self.cache_data)} cached items")
-            else:
-                logging.debug("No cache file found, initializing empty cache")
-                self.cache_data = {}
+            with self._lock:
+                self.backend.load()
+                self._entry_sizes.clear()
+                self._timestamps.clear()
+                for key, timestamp, size in self.backend.entry_metadata():
+                    self._entry_sizes[key] = size
+                    self._timestamps[key] = timestamp
+                self._total_bytes = sum(self._entry_sizes.values())
+                self._rebuild_expiry_index()
+                logging.debug(f"Indexed {len(self._entry_sizes)} entries "
+                              f"({self._total_bytes / 1024 / 1024:.2f}MB)")
+                self._enforce_size_limit()
         except Exception as e:
             logging.error(f"Error loading cache: {e}", exc_info=True)
-            self.cache_data = {}
 
     def save_cache(self) -> None:
-        """Save cache to file"""
+        """Write the whole cache to disk (compacts the journal backend)"""
         try:
-            logging.debug(f"Saving {len(self.cache_data)} items to cache file")
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.cache_data, f)
-            logging.info(f"Successfully saved {len(self.cache_data)} items to cache")
+            with self._lock:
+                self.backend.flush()
         except Exception as e:
-            logging.error(f"Error saving cache: {e}", exc_info=True)
\ No newline at end of file
+            logging.error(f"Error saving cache: {e}", exc_info=True)
+
+    def close(self) -> None:
+        """Persist outstanding changes and release file handles"""
+        try:
+            logging.debug(f"Closing cache: {self.cache_file}")
+            self._stop_sweeper.set()
+            if self._sweeper is not None:
+                self._sweeper.join(timeout=5)
+            with self._lock:
+                self.backend.close()
+        except Exception as e:
+            logging.error(f"Error closing cache: {e}", exc_info=True)
+
+    # Background Sweep Methods
+    def _sweep_loop(self) -> None:
+        """Periodically purge expired entries until the cache is closed"""
+        logging.debug(f"Cache sweeper started for {self.cache_file} "
+                      f"(every {self.sweep_interval}s)")
+        while not self._stop_sweeper.wait(self.sweep_interval):
+            self.purge_expired()
+        logging.debug(f"Cache sweeper stopped for {self.cache_file}")
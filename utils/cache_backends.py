@@ -0,0 +1,416 @@
+# utils/cache_backends.py
+import json
+import os
+import logging
+import sqlite3
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
+
+
+def entry_size(entry: Dict[str, Any]) -> int:
+    """Byte size of an entry's serialised data"""
+    return len(json.dumps(entry['data']).encode('utf-8'))
+
+
+class CacheBackend(ABC):
+    """Storage interface used by CacheManager
+
+    Entries are dicts with 'data' and 'timestamp' keys. Backends are not
+    thread-safe on their own; CacheManager serialises access. A backend
+    missing one of the abstract methods fails when it is constructed.
+    """
+
+    def __init__(self, cache_file: str):
+        self.cache_file = cache_file
+
+    @abstractmethod
+    def load(self) -> None:
+        """Load persisted entries"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, key: str, entry: Dict[str, Any]) -> int:
+        """Store an entry and return its byte size"""
+        raise NotImplementedError
+
+    def put_many(self, entries: Iterable[Tuple[str, Dict[str, Any]]]) -> list:
+        """Store several entries and return their byte sizes"""
+        return [self.put(key, entry) for key, entry in entries]
+
+    @abstractmethod
+    def delete(self, keys: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def size_bytes(self) -> int:
+        """Bytes used on disk"""
+        raise NotImplementedError
+
+    def oldest_timestamp(self) -> Optional[float]:
+        return min((entry['timestamp'] for _, entry in self.items()), default=None)
+
+    def expired_keys(self, cutoff: float) -> list:
+        """Keys of entries stored before the cutoff timestamp"""
+        return [key for key, entry in self.items() if entry['timestamp'] < cutoff]
+
+    def entry_metadata(self) -> list:
+        """(key, timestamp, size) for every entry, oldest first"""
+        return sorted(((key, entry['timestamp'], entry_size(entry)) for key, entry in self.items()),
+                      key=lambda meta: meta[1])
+
+    @abstractmethod
+    def flush(self) -> None:
+        """Write everything to disk in one go"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Persist outstanding state and release file handles"""
+        self.flush()
+
+
+class JsonCacheBackend(CacheBackend):
+    """Whole-file JSON storage, rewritten on every change"""
+
+    def __init__(self, cache_file: str):
+        super().__init__(cache_file)
+        self.data: Dict[str, Dict[str, Any]] = {}
+
+    def load(self) -> None:
+        self.data = self._read_snapshot()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.data.get(key)
+
+    def put(self, key: str, entry: Dict[str, Any]) -> int:
+        self.data[key] = entry
+        self.flush()
+        return entry_size(entry)
+
+    def put_many(self, entries: Iterable[Tuple[str, Dict[str, Any]]]) -> list:
+        entries = list(entries)
+        self.data.update(entries)
+        self.flush()
+        return [entry_size(entry) for _, entry in entries]
+
+    def delete(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+        self.flush()
+
+    def clear(self) -> None:
+        self.data.clear()
+        self.flush()
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        return iter(list(self.data.items()))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def size_bytes(self) -> int:
+        return os.path.getsize(self.cache_file) if os.path.exists(self.cache_file) else 0
+
+    def flush(self) -> None:
+        logging.debug(f"Saving {len(self.data)} items to cache file")
+        with open(self.cache_file, 'w') as f:
+            json.dump(self.data, f)
+        logging.info(f"Successfully saved {len(self.data)} items to cache")
+
+    def _read_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Read the JSON snapshot, returning an empty dict when missing or corrupt"""
+        if not os.path.exists(self.cache_file):
+            logging.debug("No cache file found, initializing empty cache")
+            return {}
+        try:
+            logging.debug(f"Loading cache from: {self.cache_file}")
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            logging.info(f"Successfully loaded {len(data)} cached items")
+            return data
+        except (OSError, ValueError) as e:
+            logging.error(f"Error loading cache: {e}", exc_info=True)
+            return {}
+
+
+class JournalCacheBackend(JsonCacheBackend):
+    """JSON snapshot plus an append-only journal of changes
+
+    Each change appends one JSON line to ``<cache_file>.journal``. Loading
+    replays the journal over the snapshot; a torn final line from a crash
+    is dropped and truncated away. Once the journal holds
+    ``compact_threshold`` records, or when the backend is closed, the
+    snapshot is rewritten atomically and the journal emptied.
+    """
+
+    def __init__(self, cache_file: str, compact_threshold: int = 500):
+        super().__init__(cache_file)
+        self.journal_file = f"{cache_file}.journal"
+        self.compact_threshold = compact_threshold
+        self.journal_records = 0
+        self._journal = None
+
+    def load(self) -> None:
+        self.data = self._read_snapshot()
+        self.journal_records = self._replay_journal()
+        if self.journal_records:
+            logging.info(f"Replayed {self.journal_records} journal records from {self.journal_file}")
+
+    def put(self, key: str, entry: Dict[str, Any]) -> int:
+        self.data[key] = entry
+        self._append({'op': 'set', 'key': key, 'entry': entry})
+        return entry_size(entry)
+
+    def put_many(self, entries: Iterable[Tuple[str, Dict[str, Any]]]) -> list:
+        entries = list(entries)
+        self.data.update(entries)
+        self._append(*({'op': 'set', 'key': key, 'entry': entry} for key, entry in entries))
+        return [entry_size(entry) for _, entry in entries]
+
+    def delete(self, keys: Iterable[str]) -> None:
+        keys = [key for key in keys if key in self.data]
+        if not keys:
+            return
+        for key in keys:
+            del self.data[key]
+        self._append({'op': 'del', 'keys': keys})
+
+    def clear(self) -> None:
+        self.data.clear()
+        self.flush()
+
+    def size_bytes(self) -> int:
+        size = super().size_bytes()
+        if os.path.exists(self.journal_file):
+            size += os.path.getsize(self.journal_file)
+        return size
+
+    def flush(self) -> None:
+        """Compact: atomically rewrite the snapshot, then empty the journal"""
+        logging.debug(f"Compacting {self.journal_records} journal records into {self.cache_file}")
+        temp_file = f"{self.cache_file}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(self.data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.cache_file)
+
+        # Replaying a stale journal over the new snapshot is harmless, so a
+        # crash between the replace and the truncate loses nothing
+        self._close_journal()
+        with open(self.journal_file, 'w'):
+            pass
+        self.journal_records = 0
+        logging.info(f"Successfully saved {len(self.data)} items to cache")
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._close_journal()
+
+    def _append(self, *records: Dict[str, Any]) -> None:
+        """Append records to the journal with one fsync and compact when it grows too long"""
+        if self._journal is None:
+            self._journal = open(self.journal_file, 'a', encoding='utf-8')
+        for record in records:
+            self._journal.write(json.dumps(record) + '\n')
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self.journal_records += len(records)
+
+        if self.journal_records >= self.compact_threshold:
+            self.flush()
+
+    def _close_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _replay_journal(self) -> int:
+        """Apply journal records to the loaded snapshot"""
+        if not os.path.exists(self.journal_file):
+            return 0
+
+        records = 0
+        valid_bytes = 0
+        with open(self.journal_file, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("incomplete record")
+                    record = json.loads(line)
+                except ValueError:
+                    logging.warning(f"Dropping partial record at byte {valid_bytes} of {self.journal_file}")
+                    break
+                self._apply(record)
+                records += 1
+                valid_bytes += len(line)
+
+        if valid_bytes < os.path.getsize(self.journal_file):
+            with open(self.journal_file, 'r+b') as f:
+                f.truncate(valid_bytes)
+        return records
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        op = record.get('op')
+        if op == 'set':
+            self.data[record['key']] = record['entry']
+        elif op == 'del':
+            for key in record['keys']:
+                self.data.pop(key, None)
+        else:
+            logging.warning(f"Skipping unknown journal record: {op}")
+
+
+class SqliteCacheBackend(CacheBackend):
+    """SQLite storage with one row per entry
+
+    Entries live in ``<cache name>.db`` next to the JSON cache file. Keys
+    are the primary key and timestamps are indexed, so lookups and TTL
+    queries never load the whole cache. Each row records the byte size of
+    its serialised data. An existing JSON snapshot (and journal) is
+    imported on first run and renamed to ``*.migrated``.
+    """
+
+    def __init__(self, cache_file: str):
+        super().__init__(cache_file)
+        self.db_file = f"{os.path.splitext(cache_file)[0]}.db"
+        self.conn = None
+
+    def load(self) -> None:
+        logging.debug(f"Opening cache database: {self.db_file}")
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, "
+                "data TEXT NOT NULL, "
+                "timestamp REAL NOT NULL, "
+                "size INTEGER NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_entries_timestamp "
+                "ON cache_entries (timestamp)"
+            )
+        self._migrate_json()
+        logging.info(f"Cache database {self.db_file} holds {len(self)} entries")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT data, timestamp FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'data': json.loads(row[0]), 'timestamp': row[1]}
+
+    def put(self, key: str, entry: Dict[str, Any]) -> int:
+        row = self._row(key, entry)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, data, timestamp, size) "
+                "VALUES (?, ?, ?, ?)",
+                row
+            )
+        return row[3]
+
+    def put_many(self, entries: Iterable[Tuple[str, Dict[str, Any]]]) -> list:
+        rows = [self._row(key, entry) for key, entry in entries]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO cache_entries (key, data, timestamp, size) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+        return [row[3] for row in rows]
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM cache_entries WHERE key = ?",
+                ((key,) for key in keys)
+            )
+
+    def clear(self) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM cache_entries")
+
+    def items(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        rows = self.conn.execute("SELECT key, data, timestamp FROM cache_entries").fetchall()
+        return ((key, {'data': json.loads(data), 'timestamp': timestamp})
+                for key, data, timestamp in rows)
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def size_bytes(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+
+    def oldest_timestamp(self) -> Optional[float]:
+        return self.conn.execute("SELECT MIN(timestamp) FROM cache_entries").fetchone()[0]
+
+    def expired_keys(self, cutoff: float) -> list:
+        rows = self.conn.execute(
+            "SELECT key FROM cache_entries WHERE timestamp < ?", (cutoff,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def entry_metadata(self) -> list:
+        return self.conn.execute(
+            "SELECT key, timestamp, size FROM cache_entries ORDER BY timestamp"
+        ).fetchall()
+
+    def flush(self) -> None:
+        # Every change is committed as it is made
+        pass
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _row(self, key: str, entry: Dict[str, Any]) -> Tuple[str, str, float, int]:
+        data = json.dumps(entry['data'])
+        return key, data, entry['timestamp'], len(data.encode('utf-8'))
+
+    def _migrate_json(self) -> None:
+        """Import a JSON cache left by the json/journal backends"""
+        legacy = JournalCacheBackend(self.cache_file)
+        if not (os.path.exists(legacy.cache_file) or os.path.exists(legacy.journal_file)):
+            return
+
+        logging.info(f"Migrating {self.cache_file} into {self.db_file}")
+        legacy.load()
+        self.put_many(legacy.data.items())
+        for path in (legacy.cache_file, legacy.journal_file):
+            if os.path.exists(path):
+                os.replace(path, f"{path}.migrated")
+        logging.info(f"Migrated {len(legacy.data)} entries from {self.cache_file}")
+
+
+def create_backend(backend: str, cache_file: str, **options) -> CacheBackend:
+    """Build the cache backend named in settings"""
+    if backend == 'json':
+        return JsonCacheBackend(cache_file)
+    if backend == 'journal':
+        return JournalCacheBackend(cache_file, **options)
+    if backend == 'sqlite':
+        return SqliteCacheBackend(cache_file)
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -0,0 +1,292 @@
+# utils/cassette.py
+"""Record and replay of Alla HTTP responses for offline tests and load tests
+
+A cassette is a directory holding one JSON file per URL. Responses are
+recorded by ``WebUtils.set_record_cassette`` and served back either
+in-process by ``ReplayAdapter`` or over HTTP by ``ReplayServer``, which
+stands in for the site so urllib3's retry policy is exercised as well:
+
+    python -m utils.cassette serve cassettes/ --latency-ms 50 --error-rate 0.1
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.lazy_import import lazy_import
+
+requests = lazy_import('requests')
+
+# Response headers worth keeping; the rest vary per request
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+ERROR_MODES = ('status', 'reset')
+
+
+class Cassette:
+    """Directory of recorded responses keyed by URL"""
+
+    def __init__(self, directory):
+        logging.debug(f"Opening cassette in {directory}")
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def put(self, url, body, status=200, headers=None):
+        """Store a response, replacing any earlier one for the URL"""
+        entry = {
+            'url': url,
+            'status': status,
+            'headers': {name: value for name, value in (headers or {}).items()
+                        if name in RECORDED_HEADERS and value is not None},
+            'body': body,
+            'recorded_at': time.time()
+        }
+        path = self._path(url)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(temp_path, path)
+
+    def record(self, url, response):
+        """Store a requests response under the URL it was fetched for"""
+        headers = {name: response.headers.get(name) for name in RECORDED_HEADERS}
+        self.put(url, response.text, response.status_code, headers)
+
+    def get(self, url):
+        """Get the recorded entry for a URL, or None"""
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def urls(self):
+        """Every recorded URL"""
+        urls = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith('.json'):
+                with open(os.path.join(self.directory, name), 'r', encoding='utf-8') as f:
+                    urls.append(json.load(f)['url'])
+        return urls
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.directory) if name.endswith('.json'))
+
+
+class ReplayPolicy:
+    """Latency and error injection applied to every replayed request
+
+    Args:
+        latency_ms: Delay before each response
+        jitter_ms: Up to this much extra random delay
+        error_rate: Fraction of requests that fail (0.0 - 1.0)
+        error_mode: 'status' answers 503, which the session retries;
+            'reset' drops the connection without a response
+        seed: Seed for the random choices, for repeatable runs
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, error_mode='status', seed=None):
+        if error_mode not in ERROR_MODES:
+            raise ValueError(f"Unknown error mode: {error_mode}")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_mode = error_mode
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'served': 0, 'not_modified': 0, 'missing': 0, 'injected_errors': 0}
+
+    def delay(self):
+        """Sleep for the configured latency"""
+        with self._lock:
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+        seconds = (self.latency_ms + jitter) / 1000
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def should_fail(self):
+        """Decide whether this request gets an injected error"""
+        with self._lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats)
+
+
+def _replay_response(cassette, policy, url, request_headers):
+    """Pick the status, headers and body to send for a replayed request
+
+    Returns:
+        tuple: (status, headers, body), or None to drop the connection
+    """
+    policy.count('requests')
+    policy.delay()
+    if policy.should_fail():
+        policy.count('injected_errors')
+        if policy.error_mode == 'reset':
+            return None
+        return 503, {'Content-Type': 'text/plain'}, 'Injected error'
+
+    entry = cassette.get(url)
+    if entry is None:
+        policy.count('missing')
+        return 404, {'Content-Type': 'text/plain'}, f"Not recorded: {url}"
+
+    headers = entry['headers']
+    etag = headers.get('ETag')
+    last_modified = headers.get('Last-Modified')
+    if ((etag and request_headers.get('If-None-Match') == etag) or
+            (last_modified and request_headers.get('If-Modified-Since') == last_modified)):
+        policy.count('not_modified')
+        return 304, {name: value for name, value in headers.items() if name != 'Content-Type'}, ''
+
+    policy.count('served')
+    return entry['status'], headers, entry['body']
+
+
+# In-process Replay
+class ReplayAdapter:
+    """requests transport adapter answering from a cassette without sockets
+
+    Mounted on the shared session by ``WebUtils.set_replay``. Because no
+    connection pool is involved, urllib3's retries do not run; use
+    ReplayServer to exercise them.
+    """
+
+    def __init__(self, cassette, policy=None):
+        self.cassette = cassette
+        self.policy = policy or ReplayPolicy()
+
+    def send(self, request, **kwargs):
+        result = _replay_response(self.cassette, self.policy, request.url, request.headers)
+        if result is None:
+            raise requests.exceptions.ConnectionError(f"Injected connection reset: {request.url}",
+                                                      request=request)
+        status, headers, body = result
+        response = requests.models.Response()
+        response.status_code = status
+        response.headers = requests.structures.CaseInsensitiveDict(headers)
+        response._content = body.encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.reason = 'OK' if status < 400 else 'Error'
+        return response
+
+    def close(self):
+        pass
+
+
+# Replay Server
+class ReplayServer:
+    """Local HTTP server standing in for the site, serving a cassette
+
+    Requests for ``<server>/<path>?<query>`` are answered with the entry
+    recorded for ``<origin>/<path>?<query>``. Runs on a daemon thread.
+    """
+
+    def __init__(self, cassette, policy=None, origin='https://www.lazaruseq.com', host='127.0.0.1', port=0):
+        self.cassette = cassette
+        self.policy = policy or ReplayPolicy()
+        self.origin = origin.rstrip('/')
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = server.origin + self.path
+                result = _replay_response(server.cassette, server.policy, url, self.headers)
+                if result is None:
+                    self.close_connection = True
+                    self.connection.close()
+                    return
+                status, headers, body = result
+                payload = body.encode('utf-8')
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                if status != 304:
+                    self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logging.debug("Replay server: " + format, *args)
+
+        return Handler
+
+    def start(self):
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        logging.info(f"Replay server for {self.cassette.directory} listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    """Serve a cassette over HTTP until interrupted"""
+    parser = argparse.ArgumentParser(prog='python -m utils.cassette')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help='Serve a cassette as a stand-in for the site')
+    serve_parser.add_argument('cassette', help='Cassette directory')
+    serve_parser.add_argument('--port', type=int, default=8000)
+    serve_parser.add_argument('--latency-ms', type=float, default=0.0)
+    serve_parser.add_argument('--jitter-ms', type=float, default=0.0)
+    serve_parser.add_argument('--error-rate', type=float, default=0.0)
+    serve_parser.add_argument('--error-mode', choices=ERROR_MODES, default='status')
+    serve_parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    policy = ReplayPolicy(args.latency_ms, args.jitter_ms, args.error_rate, args.error_mode, args.seed)
+    cassette = Cassette(args.cassette)
+    server = ReplayServer(cassette, policy, port=args.port)
+    print(f"Serving {len(cassette)} recorded responses on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Requests: {policy.get_stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,20 +1,25 @@
 # utils/csv_viewer.py
 
 # Imports section
-import pandas as pd
 import logging
 import webbrowser
-import ast
 import customtkinter as ctk
+import io
 import os
 from datetime import datetime
 
 from config.settings import DARK_MODE_COLORS, LIGHT_MODE_COLORS, DARK_CSV_CATEGORY_COLORS, LIGHT_CSV_CATEGORY_COLORS
-from config.constraints import STAT_CATEGORIES, DISPLAY_ORGANIZATION
+from config.constraints import STAT_CATEGORIES, DISPLAY_ORGANIZATION, SLOT_ORDER
+from core.spell_table import DETAILS_COLUMNS, SpellTable, normalize_effects, spell_table_filename
 from utils.decorators import debug_log
+from utils.lazy_import import lazy_import
+from utils.stat_names import format_header_text
 from ui.tooltip import ToolTip
 from ui.CTkXYFrame.CTkXYFrame import CTkXYFrame
 
+# pandas is only needed once a CSV is opened
+pd = lazy_import('pandas')
+
 class CSVViewer:
     """Class for handling CSV viewing functionality"""
 
@@ -22,7 +27,10 @@ class CSVViewer:
     # -----------------------------
     # __init__, set_colorize, load_csv
     @debug_log
-    def __init__(self):
+    def __init__(self, gear_store=None):
+        # SqliteGearStore read in place of the class CSVs when it is enabled
+        self.gear_store = gear_store
+        self.current_class = None
         self.stat_categories = STAT_CATEGORIES
         self.category_headers = []
         self.column_headers = []
@@ -30,6 +38,7 @@ class CSVViewer:
         self.data_rows = []
         self.tooltips = {}
         self._effect_details_cols = []
+        self.spells = {}  # spell ID -> spell record, for the effect cells
         self.viewer = None
         self.df = None
         self.colorize = False
@@ -51,6 +60,17 @@ class CSVViewer:
             formatted_class = class_name.lower().replace(' ', '_')
             filename = f"{formatted_class}_gear_comparison.csv"
             self.current_file = filename
+            self.current_class = class_name
+            source = filename
+            if self.gear_store is not None:
+                # One indexed query for the class; the database file is watched for changes
+                buffer = io.StringIO()
+                if not self.gear_store.write_csv(class_name, buffer):
+                    logging.debug(f"No saved gear for {class_name} in {self.gear_store.db_file}")
+                    return None
+                buffer.seek(0)
+                source = buffer
+                self.current_file = self.gear_store.db_file
             # Only load columns we need
             needed_cols = ['Slot']  # Add Slot column
             for category in self.stat_categories.values():
@@ -61,25 +81,53 @@ class CSVViewer:
                 for skill in self.stat_categories['bard_skills']:
                     needed_cols.append(f"BARD_{skill}")
             
-            df = pd.read_csv(filename, 
+            df = pd.read_csv(source, 
                             usecols=lambda x: x in needed_cols or 
                                             x.endswith('_DETAILS') or 
                                             x.startswith('BARD_'),
+                            dtype={col: str for col in DETAILS_COLUMNS},
                             na_filter=False,
-                            memory_map=True,
+                            memory_map=source is filename,
                             low_memory=False,
                             engine='c')
             
+            # Rows are stored in save order; list them by slot here
+            df = df.sort_values('Slot', key=lambda slots: slots.map(SLOT_ORDER).fillna(len(SLOT_ORDER)),
+                                kind='stable', ignore_index=True)
+
+            # Effect cells hold spell IDs; rendering looks them up in this map
+            self.spells = (self.gear_store.load_spells() if self.gear_store is not None
+                           else dict(SpellTable(spell_table_filename(filename)).spells))
+            self._convert_legacy_details(df)
+
             logging.debug(f"Successfully loaded CSV for {class_name}")
             logging.debug(f"Loaded columns: {df.columns.tolist()}")
 
             # Store initial file state for change detection
-            self.last_modified = os.path.getmtime(filename)
+            self.last_modified = os.path.getmtime(self.current_file)
             return df
         except Exception as e:
             logging.error(f"Failed to load CSV: {e}")
             return None
         
+    @debug_log
+    def _convert_legacy_details(self, df):
+        """Replace effect details saved before the spell table with spell IDs
+
+        Each distinct cell is parsed once here, so rendering never parses.
+        """
+        for col in [col for col in df.columns if col.endswith('_DETAILS')]:
+            legacy = df[col].str.startswith('{', na=False)
+            if not legacy.any():
+                continue
+            references = {}
+            for value in df.loc[legacy, col].unique():
+                row, spells = normalize_effects({col: value})
+                references[value] = row[col]
+                self.spells.update((spell['id'], spell) for spell in spells)
+            df.loc[legacy, col] = df.loc[legacy, col].map(references)
+            logging.debug(f"Converted {legacy.sum()} saved {col} cells to spell IDs")
+
     @debug_log
     def start_file_monitor(self, viewer):
         """Start monitoring CSV file for changes"""
@@ -115,8 +163,7 @@ class CSVViewer:
         try:
             if self.viewer and self.current_file:
                 # Reload the data
-                class_name = os.path.basename(self.current_file).split('_')[0]
-                new_df = self.load_csv(class_name)
+                new_df = self.load_csv(self.current_class)
                 
                 if new_df is not None:
                     self.df = new_df
@@ -180,21 +227,7 @@ class CSVViewer:
     @debug_log
     def format_header_text(self, text):
         """Format header text to split double words and ensure uppercase"""
-        text = text.upper()
-        
-        if text.startswith('BARD_'):
-            skill_name = text.replace('BARD_', '')
-            skill_name = skill_name.split(' ')[0]
-            return skill_name
-        elif '_' in text:
-            words = text.split('_')
-            return '\n'.join(words)
-        elif ' ' in text:
-            words = text.split(' ')
-            return '\n'.join(words)
-        elif text == 'ENDURANCE':
-            return 'END'
-        return text
+        return format_header_text(text)
 
     @debug_log
     def _format_aug_slots(self, row_data):
@@ -362,10 +395,9 @@ class CSVViewer:
                     self._effect_details_cols.append(details_col)
                     # Create virtual effect column from details
                     cols_present.append(col)
-                    # Add the effect name from the details column to the DataFrame
-                    effect_data = df[details_col].apply(lambda x: 
-                        ast.literal_eval(x)['name'] if x and not pd.isna(x) else '')
-                    df[col] = effect_data
+                    # Add the effect name from the spell map to the DataFrame
+                    spell_names = {spell_id: spell.get('name', '') for spell_id, spell in self.spells.items()}
+                    df[col] = df[details_col].map(spell_names).fillna('')
         else:
             # Normal column handling
             for col in cols:
@@ -504,8 +536,8 @@ class CSVViewer:
         try:
             base_colors = DARK_MODE_COLORS if ctk.get_appearance_mode() == "Dark" else LIGHT_MODE_COLORS
             
-            details_value = row_data.get(f"{col}_DETAILS")
-            if pd.isna(details_value) or details_value == '':
+            spell = self.spells.get(row_data.get(f"{col}_DETAILS"))
+            if spell is None:
                 cell = self._create_cell(
                     scroll_frame,
                     ' ',
@@ -516,9 +548,8 @@ class CSVViewer:
                 )
                 return cell
 
-            effect_dict = ast.literal_eval(details_value)
-            display_text = effect_dict.get('name', ' ')
-            effects_list = effect_dict.get('effects', [])
+            display_text = spell.get('name', ' ')
+            effects_list = spell.get('effects', [])
             
             cell = self._create_cell(
                 scroll_frame,
@@ -606,14 +637,14 @@ class CSVViewer:
 
     @debug_log
     def _process_effect_details(self, details_value):
-        """Process effect details from JSON-like string"""
+        """Process effect details from a spell ID reference"""
         try:
-            if pd.isna(details_value) or details_value == '':
+            spell = self.spells.get(details_value)
+            if spell is None:
                 return ' ', None
                 
-            effect_dict = ast.literal_eval(details_value)
-            display_text = effect_dict.get('name', ' ')
-            tooltip_text = '\n'.join(effect_dict.get('effects', []))
+            display_text = spell.get('name', ' ')
+            tooltip_text = '\n'.join(spell.get('effects', []))
             
             return display_text, tooltip_text if tooltip_text else None
         except:
@@ -759,7 +790,7 @@ class CSVViewer:
         colors_set = DARK_CSV_CATEGORY_COLORS if dark_mode else LIGHT_CSV_CATEGORY_COLORS
         current_row = 3  # Start after headers
 
-        for slot_name, slot_group in df.groupby('Slot'):
+        for slot_name, slot_group in df.groupby('Slot', sort=False):
             # Create slot label
             self._create_slot_label(scroll_frame, slot_name, slot_group, current_row, 
                                 colors_set, colors, colorize)
@@ -1,35 +1,92 @@
 # utils/decorators.py
 
 import logging
+import threading
 from functools import wraps
 
 _logged_functions = set()
 _component_states = {}
 _initialized_components = set()
 
+# Debug mode is process-wide. While it is off every decorated function is
+# bound as the bare function, so debug_log costs nothing per call.
+_debug_enabled = False
+_registry = []
+_registry_lock = threading.Lock()
+
+
+class _DebugLogged:
+    """Placeholder returned by debug_log for methods
+
+    ``__set_name__`` runs when the class body finishes and replaces the
+    placeholder on the class with either the bare function or the logging
+    wrapper, then records where it lives so set_debug_mode can rebind it.
+    """
+
+    def __init__(self, func, wrapper):
+        self.func = func
+        self.wrapper = wrapper
+        wraps(func)(self)
+
+    def __set_name__(self, owner, name):
+        _register(owner, name, self.func, self.wrapper)
+
+    def __get__(self, instance, owner=None):
+        # Only reached if the placeholder was never bound to a class
+        return self.func.__get__(instance, owner)
+
+    def __call__(self, *args, **kwargs):
+        return (self.wrapper if _debug_enabled else self.func)(*args, **kwargs)
+
+
+def _bind(target, name, func):
+    if isinstance(target, dict):
+        target[name] = func
+    else:
+        setattr(target, name, func)
+
+
+def _register(target, name, func, wrapper):
+    with _registry_lock:
+        _registry.append((target, name, func, wrapper))
+        _bind(target, name, wrapper if _debug_enabled else func)
+
+
+def set_debug_mode(enabled):
+    """Turn debug_log tracing on or off for every decorated function"""
+    global _debug_enabled
+    enabled = bool(enabled)
+    with _registry_lock:
+        if enabled == _debug_enabled:
+            return
+        _debug_enabled = enabled
+        for target, name, func, wrapper in _registry:
+            _bind(target, name, wrapper if enabled else func)
+    logging.debug("debug_log tracing %s for %d functions",
+                  'enabled' if enabled else 'disabled', len(_registry))
+
+
+def is_debug_enabled():
+    return _debug_enabled
+
+
 def debug_log(func):
-    """Decorator to log function entry/exit when debug mode is enabled"""
+    """Decorator to log function entry/exit when debug mode is enabled
+
+    With debug mode off the decorated name is bound to ``func`` itself;
+    set_debug_mode swaps the logging wrapper in and out.
+    """
     @wraps(func)
     def wrapper(*args, **kwargs):
-        debug_enabled = False
-        
-        try:
-            if args and hasattr(args[0], 'debug_var'):
-                debug_enabled = args[0].debug_var.get()
-            if 'debug' in kwargs:
-                debug_enabled = debug_enabled or kwargs['debug']
-        except (AttributeError, TypeError):
-            debug_enabled = False
-            
         # Skip detailed logging for periodic checks
         is_periodic = func.__name__ in ['dropdown_checker']
-        
-        if debug_enabled and not is_periodic:
+
+        if not is_periodic:
             func_name = func.__name__
-            
+
             try:
                 result = func(*args, **kwargs)
-                
+
                 # Handle component initialization
                 if 'initialize' in func_name:
                     # Skip redundant WebUtils logs
@@ -38,7 +95,7 @@ def debug_log(func):
                             _initialized_components.add(func_name)
                             logging.debug("WebUtils initialization started")
                         return result
-                    
+
                     # Handle tooltip initialization
                     elif 'tooltip' in func_name.lower():
                         tooltip_text = args[1] if len(args) > 1 else ''
@@ -46,35 +103,42 @@ def debug_log(func):
                             _logged_functions.add(tooltip_text)
                             if len(tooltip_text) > 50:
                                 tooltip_text = f"{tooltip_text[:47]}..."
-                            logging.debug(f"Tooltip created: {tooltip_text}")
+                            logging.debug("Tooltip created: %s", tooltip_text)
                         return result
-                    
+
                     # Handle other component initialization
                     else:
                         component = func_name.replace('initialize_', '').split('_')[0].capitalize()
                         init_key = f"{component}_{func_name}"
-                        
+
                         if component and init_key not in _initialized_components:
                             _initialized_components.add(init_key)
                             if component not in _component_states:
                                 _component_states[component] = True
-                                logging.debug(f"{component} initialization started")
+                                logging.debug("%s initialization started", component)
                             elif 'complete' in str(args) or func_name.endswith('complete'):
-                                logging.debug(f"{component} initialization complete")
+                                logging.debug("%s initialization complete", component)
                                 _component_states.pop(component, None)
-                
+
                 # Log only significant state changes
-                elif (func_name.endswith('complete') or 
-                      (not any(x in func_name.lower() for x in 
+                elif (func_name.endswith('complete') or
+                      (not any(x in func_name.lower() for x in
                              ['set_', 'get_', 'display_', 'create', 'setup', 'initialize']) and
                        func_name not in _logged_functions)):
                     _logged_functions.add(func_name)
-                    logging.debug(f"{func_name} completed")
-                
+                    logging.debug("%s completed", func_name)
+
                 return result
             except Exception as e:
-                logging.debug(f"Exception in {func_name}: {str(e)}")
+                logging.debug("Exception in %s: %s", func_name, str(e))
                 raise
         else:
             return func(*args, **kwargs)
-    return wrapper
\ No newline at end of file
+
+    if '.' in func.__qualname__:
+        # Methods are bound onto their class by _DebugLogged.__set_name__
+        return _DebugLogged(func, wrapper)
+
+    # Module-level functions are rebound in their module's globals
+    _register(func.__globals__, func.__name__, func, wrapper)
+    return wrapper if _debug_enabled else func
@@ -0,0 +1,49 @@
+# utils/lazy_import.py
+import sys
+import threading
+import types
+
+# Modules kept off the startup path; the startup profiler reports any
+# of them that are loaded before the first window paints
+DEFERRED_MODULES = ('pandas', 'bs4', 'requests', 'urllib3')
+
+_load_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a module that is imported on first attribute access
+
+    After the import the real module's attributes are copied in, so later
+    lookups are plain attribute hits on this object.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_loaded'] = False
+
+    def _load(self):
+        with _load_lock:
+            if not self._loaded:
+                # __import__ rather than importlib so the startup profiler sees it
+                __import__(self.__name__)
+                module = sys.modules[self.__name__]
+                self.__dict__.update(module.__dict__)
+                self.__dict__['_loaded'] = True
+
+    def __getattr__(self, attr):
+        if not self.__dict__['_loaded']:
+            self._load()
+        # Also finds submodules imported after the copy was taken
+        return getattr(sys.modules[self.__name__], attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._loaded else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name):
+    """Return ``name`` if it is already imported, otherwise a LazyModule for it"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
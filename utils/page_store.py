@@ -0,0 +1,200 @@
+# utils/page_store.py
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+
+from config.settings import PAGE_STORE_DIR, PAGE_STORE_MAX_MB
+
+
+def classify_url(url: str) -> str:
+    """Classify an Alla URL as an item, search, spell or spell_search page"""
+    if 'a=items' in url:
+        return 'search'
+    if 'a=item' in url:
+        return 'item'
+    if 'a=spells' in url:
+        return 'spell_search'
+    if 'a=spell' in url:
+        return 'spell'
+    return 'other'
+
+
+class PageStore:
+    """Compressed, content-addressed store of raw HTML pages
+
+    Page bodies are zlib-compressed into ``objects/<hh>/<sha256>.zz`` so
+    identical pages are stored once. ``index.jsonl`` is an append-only log
+    mapping each URL to the hash of its latest body; replaying it on load
+    gives the current index, and a torn final line is cut off. When the
+    objects grow past ``max_size_mb`` the least recently stored pages are
+    pruned.
+    """
+
+    # Pruning stops at this fraction of the size limit, so it does not run on every put
+    PRUNE_TARGET = 0.9
+
+    def __init__(self, root_dir: str = PAGE_STORE_DIR, compress_level: int = 6,
+                 max_size_mb: Optional[float] = PAGE_STORE_MAX_MB):
+        logging.debug(f"Initializing PageStore in {root_dir}")
+        self.root_dir = root_dir
+        self.objects_dir = os.path.join(root_dir, 'objects')
+        self.index_file = os.path.join(root_dir, 'index.jsonl')
+        self.compress_level = compress_level
+        self.max_bytes = int(max_size_mb * 1024 * 1024) if max_size_mb else None
+        self.index: Dict[str, Dict] = {}
+        self._object_sizes: Dict[str, int] = {}  # content hash -> compressed bytes on disk
+        self._lock = threading.Lock()
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._load_index()
+        self._load_object_sizes()
+
+    # Index Methods
+    def _load_index(self) -> None:
+        """Replay the index log into memory"""
+        if not os.path.exists(self.index_file):
+            return
+        valid_bytes = 0
+        with open(self.index_file, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("incomplete record")
+                    record = json.loads(line)
+                except ValueError:
+                    logging.warning(f"Dropping partial record at byte {valid_bytes} of {self.index_file}")
+                    break
+                valid_bytes += len(line)
+                if not isinstance(record, dict) or not record.get('url') or not record.get('hash'):
+                    logging.warning(f"Skipping page record without a URL in {self.index_file}")
+                    continue
+                self.index[record['url']] = record
+
+        # Cut a torn tail so the next append starts on a fresh line
+        if valid_bytes < os.path.getsize(self.index_file):
+            with open(self.index_file, 'r+b') as f:
+                f.truncate(valid_bytes)
+        logging.debug(f"Loaded page store index with {len(self.index)} pages")
+
+    def _load_object_sizes(self) -> None:
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            for name in filenames:
+                if name.endswith('.zz'):
+                    self._object_sizes[name[:-len('.zz')]] = os.path.getsize(os.path.join(dirpath, name))
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.zz")
+
+    # Page Methods
+    def put(self, url: str, html: str, kind: Optional[str] = None) -> str:
+        """Store a page body, returning its content hash"""
+        raw = html.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        path = self._object_path(digest)
+
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                temp_file = f"{path}.tmp"
+                compressed = zlib.compress(raw, self.compress_level)
+                with open(temp_file, 'wb') as f:
+                    f.write(compressed)
+                os.replace(temp_file, path)
+                self._object_sizes[digest] = len(compressed)
+                logging.debug(f"Stored new page object {digest[:12]} for {url}")
+
+            current = self.index.get(url)
+            if current is None or current['hash'] != digest:
+                record = {
+                    'url': url,
+                    'hash': digest,
+                    'kind': kind or classify_url(url),
+                    'timestamp': time.time()
+                }
+                with open(self.index_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+                self.index[url] = record
+
+            if self.max_bytes and sum(self._object_sizes.values()) > self.max_bytes:
+                self._prune_locked(int(self.max_bytes * self.PRUNE_TARGET))
+        return digest
+
+    def prune(self, max_bytes: int) -> int:
+        """Drop the least recently stored pages until the objects fit in ``max_bytes``
+
+        Returns:
+            int: Number of pages dropped
+        """
+        with self._lock:
+            return self._prune_locked(max_bytes)
+
+    def _prune_locked(self, max_bytes: int) -> int:
+        references: Dict[str, int] = {}
+        for record in self.index.values():
+            references[record['hash']] = references.get(record['hash'], 0) + 1
+        # Objects no URL points to any more are deleted whatever the size
+        size = sum(self._object_sizes.get(digest, 0) for digest in references)
+
+        dropped = 0
+        for record in sorted(self.index.values(), key=lambda record: record.get('timestamp', 0)):
+            if size <= max_bytes:
+                break
+            del self.index[record['url']]
+            references[record['hash']] -= 1
+            if not references[record['hash']]:
+                del references[record['hash']]
+                size -= self._object_sizes.get(record['hash'], 0)
+            dropped += 1
+
+        for digest in [digest for digest in self._object_sizes if digest not in references]:
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+            del self._object_sizes[digest]
+
+        # Rewrite the index without the dropped pages
+        temp_file = f"{self.index_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(record) + '\n' for record in self.index.values())
+        os.replace(temp_file, self.index_file)
+        logging.info(f"Pruned {dropped} pages from {self.root_dir}; {size} bytes of objects kept")
+        return dropped
+
+    def get(self, url: str) -> Optional[str]:
+        """Get the latest stored body for a URL"""
+        record = self.index.get(url)
+        return self.get_by_hash(record['hash']) if record else None
+
+    def get_by_hash(self, digest: str) -> Optional[str]:
+        """Get a stored body by its content hash"""
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return zlib.decompress(f.read()).decode('utf-8')
+
+    def entries(self, kind: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+        """Iterate (url, record) pairs, optionally only pages of one kind"""
+        for url, record in list(self.index.items()):
+            if kind is None or record.get('kind') == kind:
+                yield url, record
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def stats(self) -> Dict[str, int]:
+        """Page, unique object and on-disk byte counts"""
+        objects = 0
+        size = 0
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            for name in filenames:
+                if name.endswith('.zz'):
+                    objects += 1
+                    size += os.path.getsize(os.path.join(dirpath, name))
+        return {'pages': len(self.index), 'objects': objects, 'bytes': size}
@@ -0,0 +1,99 @@
+# utils/startup_profiler.py
+import builtins
+import importlib.util
+import sys
+import threading
+import time
+
+from utils.lazy_import import DEFERRED_MODULES
+
+
+class StartupProfiler:
+    """Times first-time imports on the main thread, like ``python -X importtime``
+
+    Install it before the application's imports run. ``mark`` records
+    named points such as the first paint, measured from ``start`` (a
+    time.perf_counter() value, default now).
+    """
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.imports = []  # (name, self_seconds, cumulative_seconds, depth)
+        self.marks = []    # (label, seconds since start)
+        self._child_seconds = []
+        self._original_import = None
+        self._main_thread = threading.main_thread()
+
+    def install(self):
+        """Start timing imports"""
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._import
+
+    def uninstall(self):
+        """Stop timing imports"""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if threading.current_thread() is not self._main_thread:
+            return original(name, globals, locals, fromlist, level)
+
+        full_name = name
+        if level:
+            try:
+                full_name = importlib.util.resolve_name('.' * level + name, (globals or {}).get('__package__'))
+            except (ImportError, ValueError):
+                pass
+        if full_name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+
+        self._child_seconds.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._child_seconds.pop()
+            if self._child_seconds:
+                self._child_seconds[-1] += elapsed
+            self.imports.append((full_name, elapsed - children, elapsed, len(self._child_seconds)))
+
+    def mark(self, label):
+        """Record a named point in startup"""
+        self.marks.append((label, time.perf_counter() - self.start))
+
+    def elapsed(self, label):
+        """Seconds from start to a recorded mark, or None"""
+        for mark_label, seconds in self.marks:
+            if mark_label == label:
+                return seconds
+        return None
+
+    def deferred_modules_loaded(self):
+        """Deferred heavy modules that have been imported so far"""
+        return [name for name in DEFERRED_MODULES if name in sys.modules]
+
+    def report(self, top=25):
+        """Format the slowest imports and the startup marks
+
+        Returns:
+            str: An ``-X importtime`` style table followed by the marks
+        """
+        lines = ["import time: self [us] | cumulative | imported package"]
+        slowest = sorted(self.imports, key=lambda entry: -entry[2])[:top]
+        # Show the slowest imports in the order they ran, indented by depth
+        for name, self_seconds, cumulative, depth in self.imports:
+            if (name, self_seconds, cumulative, depth) in slowest:
+                lines.append(f"import time: {self_seconds * 1e6:>9.0f} | {cumulative * 1e6:>10.0f} | "
+                             f"{'  ' * depth}{name}")
+        total = sum(entry[1] for entry in self.imports)
+        lines.append(f"{len(self.imports)} modules imported in {total * 1000:.1f}ms")
+
+        for label, seconds in self.marks:
+            lines.append(f"{label}: {seconds * 1000:.1f}ms")
+        deferred = self.deferred_modules_loaded()
+        lines.append(f"deferred modules loaded: {', '.join(deferred) if deferred else 'none'}")
+        return '\n'.join(lines)
@@ -0,0 +1,145 @@
+# utils/stat_names.py
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+from config.constraints import STAT_CATEGORIES, STAT_REPLACEMENTS, DISPLAY_ORGANIZATION
+from config.settings import STAT_NAME_MEMO_SIZE
+
+
+class NameTable:
+    """Precomputed name lookups with a bounded memo for names not seen up front
+
+    ``preload`` names are transformed once at import time. Anything else is
+    transformed on first use and kept in an LRU memo of ``max_size``
+    entries, so lookups on the closed stat vocabulary are a dict hit.
+    """
+
+    def __init__(self, name, transform, preload=(), max_size=STAT_NAME_MEMO_SIZE):
+        self.name = name
+        self.transform = transform
+        self.max_size = max_size
+        self.table = {raw: transform(raw) for raw in preload}
+        self.memo = OrderedDict()
+        # Table hits are counted without the lock; concurrent lookups may
+        # drop a count, which only skews the hit-rate stats
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, raw):
+        value = self.table.get(raw)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        with self._lock:
+            value = self.memo.get(raw)
+            if value is not None:
+                self.memo.move_to_end(raw)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = self.transform(raw)
+        with self._lock:
+            self.memo[raw] = value
+            if len(self.memo) > self.max_size:
+                self.memo.popitem(last=False)
+        logging.debug("%s table miss: '%s' -> '%s'", self.name, raw, value)
+        return value
+
+    def get_stats(self):
+        """Get lookup counters
+
+        Returns:
+            dict: hits, misses, hit_rate, preloaded and memoized entry counts
+        """
+        with self._lock:
+            hits, misses, memoized = self.hits, self.misses, len(self.memo)
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'preloaded': len(self.table),
+            'memoized': memoized
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+# Transforms
+def _normalize(stat_name):
+    """Normalize a raw stat label from an item page to its column name"""
+    stat_name = re.sub(r'[^a-zA-Z0-9\s]', '', stat_name).strip().upper()
+    return STAT_REPLACEMENTS.get(stat_name, stat_name)
+
+
+def _format_header(text):
+    """Format header text to split double words and ensure uppercase"""
+    text = text.upper()
+
+    if text.startswith('BARD_'):
+        skill_name = text.replace('BARD_', '')
+        skill_name = skill_name.split(' ')[0]
+        return skill_name
+    elif '_' in text:
+        words = text.split('_')
+        return '\n'.join(words)
+    elif ' ' in text:
+        words = text.split(' ')
+        return '\n'.join(words)
+    elif text == 'ENDURANCE':
+        return 'END'
+    return text
+
+
+# Vocabularies
+def _stat_labels():
+    """Raw labels as they appear on item pages, in the usual casings"""
+    names = set(STAT_REPLACEMENTS)
+    for stats in STAT_CATEGORIES.values():
+        names.update(stats)
+    labels = set()
+    for name in names:
+        labels.update((name, name.upper(), name.title()))
+    return labels
+
+
+def _header_labels():
+    """Column, category and section names the CSV viewer formats"""
+    labels = set()
+    for category, stats in STAT_CATEGORIES.items():
+        labels.add(category)
+        labels.add(category.upper().replace('_', ' '))
+        labels.update(stats)
+    for section in DISPLAY_ORGANIZATION.values():
+        labels.add(section['display_name'])
+    return labels
+
+
+stat_name_table = NameTable('Stat name', _normalize, _stat_labels())
+header_text_table = NameTable('Header text', _format_header, _header_labels())
+
+
+def normalize_stat_name(stat_name):
+    """Normalize a raw stat label, e.g. 'Armor Class' -> 'AC'"""
+    return stat_name_table(stat_name)
+
+
+def format_header_text(text):
+    """Format a column or category name for a CSV viewer header"""
+    return header_text_table(text)
+
+
+def get_table_stats():
+    """Get hit-rate stats for the stat name and header text tables"""
+    return {
+        'stat_names': stat_name_table.get_stats(),
+        'header_text': header_text_table.get_stats()
+    }
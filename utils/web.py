@@ -1,49 +1,170 @@
 # utils/web.py
-import requests
 import logging
-import urllib3
 import urllib.parse
-from bs4 import BeautifulSoup
 import lxml
 import lxml.etree
 import re
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import hashlib
+import threading
 from utils.decorators import debug_log
+from utils.lazy_import import lazy_import
+from utils.page_store import PageStore
+from config.settings import MAX_CONNECTIONS_PER_HOST, HTTP_POOL_SIZE, HTTP_KEEP_ALIVE, PAGE_STORE_ENABLED
+
+# HTTP and HTML libraries load when the first page is fetched or parsed
+requests = lazy_import('requests')
+urllib3 = lazy_import('urllib3')
+bs4 = lazy_import('bs4')
+
+
+class OfflinePageError(IOError):
+    """Raised in offline mode when a page is not available locally"""
 
-# Disable SSL warning
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 class WebUtils:
+    # Per-host request limits shared by every WebUtils instance
+    _host_semaphores = {}
+    _host_semaphores_lock = threading.Lock()
+
+    # Process-wide session so every lookup reuses the same keep-alive pool
+    _shared_session = None
+    _shared_session_lock = threading.Lock()
+
+    # Raw pages are kept for offline reparsing when the store is enabled
+    _page_store = None
+    _page_store_lock = threading.Lock()
+
+    # Offline mode serves pages from a local source instead of the network
+    _offline_source = None
+
+    # Record/replay: responses are saved to or served from a cassette
+    _record_cassette = None
+    _replay_adapter = None
+    _replay_server_url = None
+
     # Initialization
-    def __init__(self):
+    def __init__(self, validator_cache=None):
         logging.debug("Initializing WebUtils")
-        self.session = self.create_session()
+        # CacheManager holding ETag/Last-Modified/content hash per URL
+        self.validator_cache = validator_cache
         self.debug_var = None
         logging.debug("WebUtils initialized successfully")
 
     # Session Management Methods
-    @debug_log
-    def create_session(self):
-        """Create requests session with retries"""
+    @property
+    def session(self):
+        """The shared session, created on the first request"""
+        return WebUtils._shared_session or self.get_shared_session()
+
+    @classmethod
+    def get_shared_session(cls):
+        """Get the session shared by all WebUtils instances, creating it once"""
+        with cls._shared_session_lock:
+            if cls._shared_session is None:
+                cls._shared_session = cls.create_session()
+            return cls._shared_session
+
+    @classmethod
+    def close_shared_session(cls):
+        """Close the shared session and its pooled connections"""
+        with cls._shared_session_lock:
+            if cls._shared_session is not None:
+                logging.debug("Closing shared requests session")
+                cls._shared_session.close()
+                cls._shared_session = None
+
+    @classmethod
+    def get_page_store(cls):
+        """Get the shared page store, or None when it is disabled"""
+        if not PAGE_STORE_ENABLED:
+            return None
+        with cls._page_store_lock:
+            if cls._page_store is None:
+                cls._page_store = PageStore()
+            return cls._page_store
+
+    @classmethod
+    def set_offline_source(cls, source):
+        """Serve every page from ``source(url)`` instead of the network
+
+        ``source`` returns the stored HTML or None when it has no copy of
+        the page. Pass None to go back online.
+        """
+        logging.debug(f"WebUtils offline mode {'enabled' if source else 'disabled'}")
+        cls._offline_source = source
+
+    @classmethod
+    def set_record_cassette(cls, cassette):
+        """Save every response fetched from now on to ``cassette``
+
+        Pass None to stop recording.
+        """
+        logging.debug(f"WebUtils recording {'enabled' if cassette else 'disabled'}")
+        cls._record_cassette = cassette
+
+    @classmethod
+    def set_replay(cls, cassette=None, policy=None, server_url=None):
+        """Answer requests from a recorded cassette instead of the site
+
+        With ``server_url`` requests are sent to a ReplayServer, so the
+        session's retry policy and connection pool are exercised. Otherwise
+        the cassette is answered in-process and retries do not run.
+        ``policy`` is a ReplayPolicy adding latency and errors in-process.
+        Call with no arguments to go back to the site.
+        """
+        logging.debug(f"WebUtils replay {'enabled' if cassette or server_url else 'disabled'}")
+        cls._replay_server_url = server_url.rstrip('/') if server_url else None
+        cls._replay_adapter = None
+        if cassette is not None and server_url is None:
+            from utils.cassette import ReplayAdapter
+            cls._replay_adapter = ReplayAdapter(cassette, policy)
+        # The next request builds a session with or without the replay adapter
+        cls.close_shared_session()
+
+    @staticmethod
+    def create_session():
+        """Create requests session with retries and a pooled adapter"""
         try:
             logging.debug("Creating requests session with retry configuration")
+            # Requests are sent with verify=False, so silence the per-request warning
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
             session = requests.Session()
-            retries = Retry(
+            retries = urllib3.util.Retry(
                 total=3,
                 backoff_factor=0.5,
                 status_forcelist=[500, 502, 503, 504]
             )
             logging.debug(f"Retry configuration: total=3, backoff=0.5, status_forcelist={[500, 502, 503, 504]}")
             
-            session.mount('http://', HTTPAdapter(max_retries=retries))
-            session.mount('https://', HTTPAdapter(max_retries=retries))
-            logging.debug("Session created with retry configuration")
+            adapter = requests.adapters.HTTPAdapter(
+                max_retries=retries,
+                pool_connections=HTTP_POOL_SIZE,
+                pool_maxsize=HTTP_POOL_SIZE
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            if WebUtils._replay_adapter is not None:
+                logging.debug("Mounting in-process replay adapter")
+                session.mount('http://', WebUtils._replay_adapter)
+                session.mount('https://', WebUtils._replay_adapter)
+            session.headers['Connection'] = 'keep-alive' if HTTP_KEEP_ALIVE else 'close'
+            logging.debug(f"Session created with pool size {HTTP_POOL_SIZE}, keep-alive={HTTP_KEEP_ALIVE}")
             return session
         except Exception as e:
             logging.error(f"Failed to create session: {e}", exc_info=True)
             raise
 
+    def _host_semaphore(self, url):
+        """Get the semaphore limiting concurrent requests to the URL's host"""
+        host = urllib.parse.urlparse(url).netloc
+        with WebUtils._host_semaphores_lock:
+            semaphore = WebUtils._host_semaphores.get(host)
+            if semaphore is None:
+                logging.debug(f"Creating request limit of {MAX_CONNECTIONS_PER_HOST} for host: {host}")
+                semaphore = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+                WebUtils._host_semaphores[host] = semaphore
+        return semaphore
+
     # URL Formatting Methods
     @debug_log
     def format_search_url(self, item_name):
@@ -104,22 +225,91 @@ class WebUtils:
 
     # Content Retrieval Methods
     @debug_log
-    def get_page_content(self, url):
-        """Get page content with specific headers and SSL verification disabled"""
+    def get_page_content(self, url, track_validators=False):
+        """Get page content with specific headers and SSL verification disabled
+
+        With ``track_validators`` the response's ETag, Last-Modified and
+        content hash are stored so the page can be revalidated later.
+        """
+        if WebUtils._offline_source is not None:
+            return self._get_offline_page(url)
+
+        response = self._request(url)
+        if response.status_code != 200:
+            logging.warning(f"Unexpected status code: {response.status_code}")
+            return response.text
+
+        self._store_page(url, response.text)
+        if track_validators:
+            self._store_validators(url, response)
+        return response.text
+
+    @debug_log
+    def get_page_if_modified(self, url):
+        """Revalidate a previously fetched page with a conditional GET
+
+        Returns:
+            str: New page content, or None when the page is unchanged
+        """
+        if WebUtils._offline_source is not None:
+            return self._get_offline_page(url)
+
+        validators = self.validator_cache.get(url) if self.validator_cache else None
+        if not validators:
+            logging.debug(f"No validators stored for {url}, fetching in full")
+            return self.get_page_content(url, track_validators=True)
+
+        headers = {}
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        response = self._request(url, headers)
+        if response.status_code == 304:
+            logging.debug(f"Not modified (304): {url}")
+            self.validator_cache.touch(url)
+            return None
+        if response.status_code != 200:
+            logging.warning(f"Unexpected status code: {response.status_code}")
+            return response.text
+
+        # Servers without validators still let us skip the reparse
+        if not headers and validators.get('content_hash') == self._content_hash(response.text):
+            logging.debug(f"Content hash unchanged: {url}")
+            self.validator_cache.touch(url)
+            return None
+
+        self._store_page(url, response.text)
+        self._store_validators(url, response)
+        return response.text
+
+    def _get_offline_page(self, url):
+        """Get a page from the offline source"""
+        html_content = WebUtils._offline_source(url)
+        if html_content is None:
+            logging.warning(f"Page not available offline: {url}")
+            raise OfflinePageError(f"Page not available offline: {url}")
+        logging.debug(f"Served offline page: {url}")
+        return html_content
+
+    def _request(self, url, extra_headers=None):
+        """Issue a GET through the shared session and per-host limit"""
         try:
             logging.debug(f"Fetching content from URL: {url}")
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
+            if extra_headers:
+                headers.update(extra_headers)
             logging.debug("Making request with headers and SSL verification disabled")
             
-            response = self.session.get(url, headers=headers, verify=False)
+            with self._host_semaphore(url):
+                response = self.session.get(self._replay_url(url), headers=headers, verify=False)
             logging.debug(f"Response status code: {response.status_code}")
-            
-            if response.status_code != 200:
-                logging.warning(f"Unexpected status code: {response.status_code}")
-                
-            return response.text
+            if WebUtils._record_cassette is not None and response.status_code != 304:
+                self._record_response(url, response)
+            return response
         except requests.exceptions.ConnectionError as e:
             logging.error(f"Connection error: {e}", exc_info=True)
             raise
@@ -127,16 +317,58 @@ class WebUtils:
             logging.error(f"Request failed: {e}", exc_info=True)
             raise
 
+    @staticmethod
+    def _replay_url(url):
+        """Point a site URL at the replay server, when one is set"""
+        if WebUtils._replay_server_url is None:
+            return url
+        parts = urllib.parse.urlsplit(url)
+        query = f"?{parts.query}" if parts.query else ''
+        return f"{WebUtils._replay_server_url}{parts.path}{query}"
+
+    def _record_response(self, url, response):
+        """Save a response to the record cassette; failures never fail the fetch"""
+        try:
+            WebUtils._record_cassette.record(url, response)
+        except Exception as e:
+            logging.error(f"Failed to record {url}: {e}", exc_info=True)
+
+    def _store_page(self, url, html_content):
+        """Keep a compressed copy of a fetched page; failures never fail the fetch"""
+        if WebUtils._replay_adapter is not None or WebUtils._replay_server_url is not None:
+            # Replayed pages are already in the cassette
+            return
+        try:
+            page_store = self.get_page_store()
+            if page_store is not None:
+                page_store.put(url, html_content)
+        except Exception as e:
+            logging.error(f"Failed to store page {url}: {e}", exc_info=True)
+
+    def _store_validators(self, url, response):
+        """Remember the validators needed to revalidate a page"""
+        if self.validator_cache is None:
+            return
+        self.validator_cache.set(url, {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': self._content_hash(response.text)
+        })
+
+    @staticmethod
+    def _content_hash(text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
     @debug_log
     def parse_html(self, html_content):
         """Parse HTML content with fallback to html.parser if lxml fails"""
         try:
             logging.debug("Attempting to parse HTML content with lxml")
-            return BeautifulSoup(html_content, 'lxml')
+            return bs4.BeautifulSoup(html_content, 'lxml')
         except lxml.etree.ParserError as e:
             logging.error(f"LXML parsing error: {e}", exc_info=True)
             logging.debug("Falling back to html.parser")
-            return BeautifulSoup(html_content, 'html.parser')
+            return bs4.BeautifulSoup(html_content, 'html.parser')
         except Exception as e:
             logging.error(f"HTML parsing error: {e}", exc_info=True)
             raise